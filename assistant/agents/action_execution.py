@@ -1,4 +1,5 @@
 # assistant/agents/action_execution.py
+import re
 import shlex
 import subprocess, shutil
 import time
@@ -10,11 +11,17 @@ from assistant.agents.intent_recognition import Intent
 from assistant.utils.logger import get_logger
 from assistant.utils.search import first_search_result, check_network
 from assistant.agents.gui_agent import GUIAgent
+from assistant.config.settings import settings
+from assistant.utils.output_capture import CommandResult, CommandStream
+from assistant.utils.shell_pool import get_shell_pool
+from assistant.utils.sysinfo import render_df, render_free, speak_disk, speak_memory
 from assistant.memory.task_memory import TaskMemory   # ✅ Layer 3
 
 log = get_logger(__name__)
 gui = GUIAgent()
 
+_SUDO = re.compile(r"(?:^|[\s;&|(])sudo\s")
+
 class ActionExecutionAgent:
     def __init__(self, confirm_callable):
         """
@@ -25,19 +32,23 @@ class ActionExecutionAgent:
         self.mon = ProcessMonitorAgent()
         self.ask_confirm = confirm_callable
         self.task_memory = TaskMemory()   # ✅ Layer 3
+        self.shell = get_shell_pool() if settings.SHELL_POOL_SIZE > 0 else None
 
     def run(self, intent: Intent) -> str:
 
         # System Info
+        # the full table goes to the console, a one-sentence summary is spoken
         if intent.name == "check_disk":
-            out = self.mon.disk_usage()
+            mounts = self.mon.disk_report()
+            print(render_df(mounts))
             self.task_memory.update(intent.description, "Checked disk usage")
-            return out
+            return speak_disk(mounts)
 
         if intent.name == "check_memory":
-            out = self.mon.memory()
+            mem = self.mon.memory_report()
+            print(render_free(mem))
             self.task_memory.update(intent.description, "Checked memory usage")
-            return out
+            return speak_memory(mem)
 
         # Process Monitor
         if intent.name == "top_processes":
@@ -51,17 +62,16 @@ class ActionExecutionAgent:
             return out
 
         if intent.name == "kill_name" and intent.extra:
-            p = subprocess.run(["pgrep", "-f", intent.extra], text=True, stdout=subprocess.PIPE)
-            pids = [int(x) for x in p.stdout.split() if x.isdigit()]
+            pids = self.mon.pids_matching(intent.extra)
             if not pids:
                 return f"No processes matching {intent.extra}."
 
-            outs = [self.mon.kill_pid(pid) for pid in pids]
+            outcomes = self.mon.kill_pids(pids)
             self.task_memory.update(
                 intent.description,
                 f"Killed processes: {pids}"
             )
-            return "\n".join(outs)
+            return self.mon.summarize_kills(outcomes, intent.extra)
 
         # Package Manager
         if intent.name == "check_installed" and intent.package:
@@ -77,11 +87,18 @@ class ActionExecutionAgent:
         if intent.name == "install_package" and intent.package:
             pkg = intent.package
 
-            if self.pkg.is_installed(pkg):
+            # one index lookup answers both "installed?" and "installable?"
+            pol = self.pkg.policy(pkg)
+            if pol is None or pol.candidate is None:
+                alts = self.pkg.suggest(pkg)
+                if alts and self.ask_confirm(f"There is no package {pkg}. Did you mean {alts[0]}?"):
+                    pkg, pol = alts[0], self.pkg.policy(alts[0])
+
+            if pol is not None and pol.installed:
                 self.task_memory.update(intent.description, f"{pkg} already installed")
                 return f"{pkg} is already installed."
 
-            if self.pkg.apt_exists(pkg):
+            if pol is not None and pol.candidate:
                 out = "\n".join(self.pkg.install(pkg, update_first=True))
                 self.task_memory.update(
                     intent.description,
@@ -101,23 +118,35 @@ class ActionExecutionAgent:
         # Service Controls
         if intent.name.startswith("svc_") and intent.service:
             verb = intent.name.split("_", 1)[1]
-            argv = ["systemctl", verb, intent.service]
-            r = subprocess.run(
-                ["sudo"] + argv if self.safety.is_admin_action(argv) else argv,
-                text=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT
-            )
+            units = self.mon.units
+            unit, exact = units.resolve_match(intent.service)
+            if unit is None:
+                return f"I couldn't find a service called {intent.service}."
+            # a guessed name is fine for a status answer, not for changing a service
+            if not exact and verb != "status" and not self.ask_confirm(f"Did you mean {unit}?"):
+                return f"Okay, not touching {unit}."
+
+            if verb == "status":
+                # answered from the unit index while it is fresh
+                info = units.status(unit)
+                out = info.summary() if info else f"No status for {unit}."
+            else:
+                argv = ["systemctl", verb, unit]
+                r = self._shell(shlex.join(["sudo"] + argv if self.safety.is_admin_action(argv) else argv))
+                units.invalidate(unit)
+                info = units.status(unit)
+                out = r.output.strip() or (info.summary() if info else "(no output)")
             self.task_memory.update(
                 intent.description,
-                f"Service {intent.service}: {verb}"
+                f"Service {unit}: {verb}"
             )
-            return r.stdout or "(no output)"
+            return out
 
         # Application Launch
         if intent.name == "open_app" and intent.extra:
-            cmd = f"nohup {shlex.quote(intent.extra)} >/dev/null 2>&1 &"
-            r = subprocess.run(["bash", "-lc", cmd])
+            # setsid: the app must not live in the job's process group
+            cmd = f"setsid nohup {shlex.quote(intent.extra)} >/dev/null 2>&1 &"
+            r = self._shell(cmd)
             if r.returncode == 0:
                 self.task_memory.update(
                     intent.description,
@@ -151,25 +180,51 @@ class ActionExecutionAgent:
 
         return "I don't have an action for that yet."
 
-    def run_raw_command(self, cmd: str) -> str:
+    def _shell(self, cmd: str, on_line=None) -> CommandResult:
+        """
+        Run cmd on a pooled bash worker. Commands that use sudo get a fresh
+        bash -c attached to our terminal so sudo can ask for the password.
+        """
+        kwargs = dict(
+            timeout=settings.RAW_COMMAND_TIMEOUT,
+            on_line=on_line,
+            head_bytes=settings.OUTPUT_HEAD_BYTES,
+            tail_bytes=settings.OUTPUT_TAIL_BYTES,
+        )
+        if _SUDO.search(cmd):
+            return CommandStream(["bash", "-c", cmd], own_group=False, **kwargs).result
+        if self.shell is None:
+            return CommandStream(["bash", "-c", cmd], **kwargs).result
+        return self.shell.run(cmd, **kwargs)
+
+    def run_raw_command(self, cmd: str, on_line=None) -> str:
+        """
+        Run a shell command, streaming its output into a bounded buffer.
+
+        on_line(line) -> Optional[str] sees each line while the command runs;
+        returning a reason stops the command early (see ObserverAgent.watch).
+        """
         if not cmd:
             return "No command provided."
 
-        try:
-            result = subprocess.run(
-                ["bash", "-c", cmd],
-                text=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                timeout=30
-            )
-            out = result.stdout.strip() or "(command executed successfully)"
-            self.task_memory.update(
-                "raw_command",
-                f"Executed: {cmd}"
-            )
-            return out
+        result = self._shell(cmd, on_line)
+        log.info(
+            "[Exec] %s -> rc=%s, %d lines / %d bytes in %.2fs%s",
+            cmd, result.returncode, result.total_lines, result.total_bytes, result.duration_s,
+            " (truncated)" if result.truncated else "",
+        )
 
-        except subprocess.TimeoutExpired:
+        if result.timed_out:
             self.task_memory.update("raw_command", "Command timed out")
             return "Command timed out."
+
+        out = result.output.strip() or "(command executed successfully)"
+        if result.aborted:
+            self.task_memory.update("raw_command", f"Stopped early ({result.aborted}): {cmd}")
+            return f"{out}\n(stopped early: {result.aborted})"
+
+        self.task_memory.update(
+            "raw_command",
+            f"Executed: {cmd}"
+        )
+        return out
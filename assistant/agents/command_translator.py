@@ -1,4 +1,5 @@
 from assistant.agents.local_llm import LocalLLM
+from assistant.config.settings import settings
 from assistant.utils.logger import get_logger
 
 log = get_logger(__name__)
@@ -10,6 +11,11 @@ class CommandTranslationAgent:
     Uses a fine-tuned T5 model.
     """
 
+    def __init__(self):
+        # The model is otherwise loaded on the first translate() call
+        if settings.LOCAL_LLM_WARMUP:
+            LocalLLM.warm_load(settings.LOCAL_LLM_PATH)
+
     def translate(self, instruction: str) -> str:
         prompt = instruction
         log.info("[CommandTranslator] Translating: %s", instruction)
@@ -1,10 +1,10 @@
 # assistant/agents/confirm_agent.py
 import json
-import queue
-import sounddevice as sd
-from vosk import Model, KaldiRecognizer
+import time
 from assistant.config.settings import settings
+from assistant.utils.audio_capture import get_audio_capture
 from assistant.utils.logger import get_logger
+from assistant.utils.vosk_models import configure_endpointer, get_vosk_registry
 from typing import Optional
 
 log = get_logger(__name__)
@@ -13,32 +13,24 @@ class ConfirmAgent:
     def __init__(self, model_dir: str | None = None, samplerate: int | None = None):
         model_dir = model_dir or settings.VOSK_MODEL_DIR
         samplerate = samplerate or settings.SAMPLE_RATE
-        self._model = Model(model_dir)
+        self._model = get_vosk_registry().get(model_dir)   # shared with VoiceInputAgent
         self._samplerate = samplerate
-        self._q: queue.Queue[bytes] = queue.Queue()
-        self._rec = KaldiRecognizer(self._model, self._samplerate)
-        self._stream = None
-
-    def _callback(self, indata, frames, time, status):
-        if status:
-            log.warning("[Confirm] %s", status)
-        self._q.put(bytes(indata))
+        self._rec = get_vosk_registry().recognizer(model_dir, self._samplerate)
+        configure_endpointer(self._rec)
+        self._capture = get_audio_capture()
 
     def listen_confirm(self, timeout: float = 5.0) -> Optional[bool]:
         log.info("[Confirm] Listening for %s seconds for yes/no...", timeout)
-        recorded = bytearray()
+        self._rec.Reset()
         try:
-            with sd.RawInputStream(samplerate=self._samplerate, blocksize=8000,
-                                   dtype='int16', channels=1, callback=self._callback):
-                import time as _time
-                t0 = _time.time()
-                while _time.time() - t0 < timeout:
-                    try:
-                        data = self._q.get(timeout=0.5)
-                    except queue.Empty:
+            # the shared stream is already open when voice input is running
+            with self._capture.attach("confirm") as tap:
+                t0 = time.monotonic()
+                while time.monotonic() - t0 < timeout:
+                    data = tap.read(min_samples=self._capture.blocksize, timeout=0.5)
+                    if data is None:
                         continue
-                    recorded.extend(data)
-                    if self._rec.AcceptWaveform(data):
+                    if self._rec.AcceptWaveform(data.tobytes()):
                         res = json.loads(self._rec.Result())
                         txt = (res.get("text") or "").strip().lower()
                         if txt:
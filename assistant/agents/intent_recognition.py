@@ -1,13 +1,13 @@
 # assistant/agents/intent_recognition.py
 import re
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Optional
 
 
 @dataclass
 class Intent:
     name: str
-    description: str   
+    description: str
     package: Optional[str] = None
     service: Optional[str] = None
     pid: Optional[int] = None
@@ -22,86 +22,212 @@ class Intent:
     index: Optional[int] = None
 
 
+_PUNCT = re.compile(r"[^\w\s\-\._@/:]")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip punctuation the same way every parser/cache sees it."""
+    t = text.lower().strip()
+    return _PUNCT.sub(" ", t)
+
+
+@dataclass
+class IntentRule:
+    """
+    One intent pattern.
+
+    verbs:    leading tokens the utterance must start with for this rule to be tried.
+    keywords: whole words that make the rule a candidate wherever they appear.
+    pattern:  precompiled regex matched at the start of the text (verb rules only).
+    build:    build(match, text) -> Intent, or None to let lower-priority rules try.
+    """
+    name: str
+    build: Callable[[Optional[re.Match], str], Optional[Intent]]
+    pattern: Optional[re.Pattern] = None
+    verbs: tuple = ()
+    keywords: tuple = ()
+
+
+class IntentMatcher:
+    """
+    Dispatches on the first token (and on keyword hits) so each utterance is
+    only tested against the handful of rules that could possibly match.
+    Candidates are tried in rule-list order, which is the precedence order.
+    """
+
+    def __init__(self, rules: list[IntentRule]):
+        self.rules = list(rules)
+        self._by_verb: dict[str, list[int]] = {}
+        self._by_keyword: dict[str, list[int]] = {}
+        for prio, rule in enumerate(self.rules):
+            for v in rule.verbs:
+                self._by_verb.setdefault(v, []).append(prio)
+            for k in rule.keywords:
+                self._by_keyword.setdefault(k, []).append(prio)
+        # One scan finds every keyword hit, whatever the number of keyword rules
+        self._keywords = None
+        if self._by_keyword:
+            alts = "|".join(sorted(map(re.escape, self._by_keyword), key=len, reverse=True))
+            self._keywords = re.compile(rf"(?<![a-z0-9])(?:{alts})(?![a-z0-9])")
+
+    def candidates(self, t: str) -> list[int]:
+        head = t.split(None, 1)
+        cands = self._by_verb.get(head[0], []) if head else []
+        if self._keywords is not None:
+            hits = self._keywords.findall(t)
+            if hits:
+                extra = {p for k in hits for p in self._by_keyword[k]}
+                cands = sorted(extra.union(cands))
+        return cands
+
+    def match(self, t: str) -> Optional[Intent]:
+        for prio in self.candidates(t):
+            rule = self.rules[prio]
+            m = None
+            if rule.pattern is not None:
+                m = rule.pattern.match(t)
+                if not m:
+                    continue
+            intent = rule.build(m, t)
+            if intent is not None:
+                return intent
+        return None
+
+
+# ----- rule builders -----
+
+_CLEANUP = re.compile(r"\b(?:cleanup|save space|free space)\b")
+_BARE_DOMAIN = re.compile(r".+\.[a-zA-Z]{2,}(/.*)?$")
+
+
+def _install(m, t):
+    pkg, ver = m.group(1), m.group(2)
+    return Intent(name="install_package", description=f"Install package {pkg}", package=pkg, extra=ver)
+
+
+def _disk(m, t):
+    if _CLEANUP.search(t):
+        return Intent(name="disk_cleanup", description="Clean up disk space")
+    return Intent(name="check_disk", description="Check disk usage")
+
+
+def _service(m, t):
+    verb = t.split()[0]
+    return Intent(name=f"svc_{verb}", description=f"{verb.capitalize()} service {m.group(1)}", service=m.group(1))
+
+
+def _top(m, t):
+    n = int(m.group(1)) if m.group(1) else 10
+    return Intent(name="top_processes", description="List top processes", count=n)
+
+
+def _open_url(m, t):
+    url = m.group(1)
+    if url.startswith("http://") or url.startswith("https://"):
+        return Intent(name="open_url", description=f"Open {url}", url=url)
+    if _BARE_DOMAIN.match(url):
+        return Intent(name="open_url", description=f"Open {url}", url="https://" + url)
+    return None
+
+
+def _compose_mail(m, t):
+    return Intent(
+        name="compose_mail",
+        description=f"Compose mail to {m.group(1)}",
+        recipient=m.group(1),
+        body=m.group(2),
+        subject="",  # subject can be added later if user specifies
+    )
+
+
+RULES: list[IntentRule] = [
+    # Package management intents
+    IntentRule(
+        "install_package", _install,
+        re.compile(r"(?:install|setup|add)\s+([a-z0-9\-\._+:]+)(?:\s+version\s+([^\s]+))?"),
+        verbs=("install", "setup", "add"),
+    ),
+    IntentRule(
+        "check_installed",
+        lambda m, t: Intent(name="check_installed", description=f"Check if {m.group(1)} is installed", package=m.group(1)),
+        re.compile(r"(?:is there|check if|is)\s+([a-z0-9\-\._]+)\s+(?:installed|present)?"),
+        verbs=("is", "check"),
+    ),
+    IntentRule(
+        "pkg_policy",
+        lambda m, t: Intent(name="pkg_policy", description=f"Show apt policy for {m.group(1)}", package=m.group(1)),
+        re.compile(r"(?:policy|apt policy)\s+([a-z0-9\-\._]+)"),
+        verbs=("policy", "apt"),
+    ),
+    # System info
+    IntentRule("check_disk", _disk, keywords=("disk", "disks", "storage")),
+    IntentRule(
+        "check_memory",
+        lambda m, t: Intent(name="check_memory", description="Check memory usage"),
+        keywords=("memory", "ram"),
+    ),
+    # Services
+    IntentRule(
+        "service", _service,
+        re.compile(r"(?:status|start|stop|restart|enable|disable)\s+([a-zA-Z0-9@.\-_]+)"),
+        verbs=("status", "start", "stop", "restart", "enable", "disable"),
+    ),
+    # Processes
+    IntentRule(
+        "kill_pid",
+        lambda m, t: Intent(name="kill_pid", description=f"Kill PID {m.group(1)}", pid=int(m.group(1))),
+        re.compile(r"kill\s+pid\s+(\d+)"),
+        verbs=("kill",),
+    ),
+    IntentRule(
+        "kill_name",
+        lambda m, t: Intent(name="kill_name", description=f"Kill {m.group(1)}", extra=m.group(1)),
+        re.compile(r"kill\s+([a-z0-9\-\._]+)"),
+        verbs=("kill",),
+    ),
+    IntentRule("top_processes", _top, re.compile(r"top(?:\s+(\d+))?"), verbs=("top",)),
+    # GUI / App intents
+    IntentRule(
+        "open_url", _open_url,
+        re.compile(r"(?:open|go to|visit)\s+([^\s]+)", re.IGNORECASE),
+        verbs=("open", "go", "visit"),
+    ),
+    IntentRule(
+        "open_app",
+        lambda m, t: Intent(name="open_app", description=f"Open application {m.group(1)}", extra=m.group(1)),
+        re.compile(r"(?:open|launch|start)\s+([a-z0-9\-\._]+)(?:\s+app|browser)?"),
+        verbs=("open", "launch", "start"),
+    ),
+    # Email intent
+    IntentRule(
+        "compose_mail", _compose_mail,
+        re.compile(r"(?:send|compose|mail)\s+to\s+([^\s]+@[^\s]+)\s+(.+)"),
+        verbs=("send", "compose", "mail"),
+    ),
+    # Search intents
+    IntentRule(
+        "search_query",
+        lambda m, t: Intent(name="search_query", description=f"Search for {m.group(1)}", query=m.group(1)),
+        re.compile(r"(?:search|find|look for)\s+(.+)"),
+        verbs=("search", "find", "look"),
+    ),
+    # Misc
+    IntentRule(
+        "speak_text",
+        lambda m, t: Intent(name="speak_text", description="Speak text", text=m.group(1)),
+        re.compile(r"(?:say|speak|echo)\s+(.+)"),
+        verbs=("say", "speak", "echo"),
+    ),
+]
+
+
 class IntentRecognitionAgent:
-    def parse(self, text: str) -> Optional[Intent]:
-        t = text.lower().strip()
-        t = re.sub(r"[^\w\s\-\._@/:]", " ", t)
-
-        # Package management intents
-        m = re.match(r"(?:install|setup|add)\s+([a-z0-9\-\._+:]+)(?:\s+version\s+([^\s]+))?", t)
-        if m:
-            pkg = m.group(1)
-            ver = m.group(2)
-            return Intent(name="install_package", description=f"Install package {pkg}", package=pkg, extra=ver)
-
-        m = re.match(r"(?:is|check if|is there)\s+([a-z0-9\-\._]+)\s+(?:installed|present)?", t)
-        if m:
-            return Intent(name="check_installed", package=m.group(1))
-
-        m = re.match(r"(?:policy|apt policy)\s+([a-z0-9\-\._]+)", t)
-        if m:
-            return Intent(name="pkg_policy", package=m.group(1))
-
-        if "disk" in t or "storage" in t:
-            if "cleanup" in t or "save space" in t or "free space" in t:
-                return Intent(name="disk_cleanup")
-            return Intent(name="check_disk", description="Check disk usage")
-        if "memory" in t or "ram" in t:
-            return Intent(name="check_memory")
-
-        m = re.match(r"(?:status|start|stop|restart|enable|disable)\s+([a-zA-Z0-9@.\-_]+)", t)
-        if m:
-            verb = t.split()[0]
-            return Intent(name=f"svc_{verb}", service=m.group(1))
-
-        m = re.match(r"kill\s+pid\s+(\d+)", t)
-        if m:
-            return Intent(name="kill_pid", pid=int(m.group(1)))
-        m = re.match(r"kill\s+([a-z0-9\-\._]+)", t)
-        if m:
-            return Intent(name="kill_name", extra=m.group(1))
-
-        m = re.match(r"top(?:\s+(\d+))?", t)
-        if m:
-            n = int(m.group(1)) if m.group(1) else 10
-            return Intent(name="top_processes", count=n)
-
-        # GUI / App intents
-        m = re.match(r"(?:open|go to|visit)\s+([^\s]+)", t, re.IGNORECASE)
-        if m:
-            url = m.group(1)
-
-            if url.startswith("http://") or url.startswith("https://"):
-                return Intent(name="open_url", url=url)
-
-            elif re.match(r".+\.[a-zA-Z]{2,}(/.*)?$", url):
-                return Intent(name="open_url", url="https://" + url)
-
-        m = re.match(r"(?:open|launch|start)\s+([a-z0-9\-\._]+)(?:\s+app|browser)?", t)
-        if m:
-            return Intent(name="open_app",description=f"Open application {m.group(1)}", extra=m.group(1))
-
-        # Email intent
-        m = re.match(r"(?:send|compose|mail)\s+to\s+([^\s]+@[^\s]+)\s+(.+)", t)
-        if m:
-            recipient = m.group(1)
-            body = m.group(2)
-            return Intent(
-                name="compose_mail",
-                recipient=recipient,
-                body=body,
-                subject="",  # subject can be added later if user specifies
-            )
-
-        # Search intents
-        m = re.match(r"(?:search|find|look for)\s+(.+)", t)
-        if m:
-            query = m.group(1)
-            return Intent(name="search_query",description=f"Search for {query}", query=query)
-
-        # Misc
-        m = re.match(r"(?:say|speak|echo)\s+(.+)", t)
-        if m:
-            return Intent(name="speak_text", text=m.group(1))
+    def __init__(self, rules: list[IntentRule] | None = None):
+        self.matcher = IntentMatcher(rules or RULES)
 
+    def parse(self, text: str) -> Optional[Intent]:
+        t = normalize(text)
+        it = self.matcher.match(t)
+        if it is not None:
+            return it
         return Intent(name="unknown", description="Unknown user request")
@@ -1,10 +1,9 @@
 # assistant/agents/llm_agent.py
 import json
-import time
-import requests
 from assistant.config.settings import settings
-from assistant.data.prompts import PROMPT_SYSTEM, PROMPT_ANSWER_TEMPLATE
+from assistant.data.prompts import PROMPT_SYSTEM, PROMPT_ANSWER_TEMPLATE, PROMPT_CHAT_TEMPLATE
 from assistant.utils.logger import get_logger
+from assistant.utils.ollama_client import get_ollama_client
 from typing import Dict, Any, Optional
 
 log = get_logger(__name__)
@@ -38,14 +37,20 @@ class MockLLM:
 class LLMAgent:
     def __init__(self):
         self.enabled = settings.LLM_ENABLED
-        self.host = settings.LLM_HOST
-        self.model = settings.LLM_MODEL_NAME
-        self.timeout = settings.LLM_TIMEOUT_SECONDS
-        # Use requests when contacting a running LLM server; otherwise use Mock.
+        self.model = settings.LLM_MODEL
+        # Shared Ollama client when contacting a running LLM server; otherwise use Mock.
+        self.client = get_ollama_client()
         self._mock = MockLLM()
 
-    def _build_prompt(self, user_text: str, context: str = "") -> str:
-        return PROMPT_ANSWER_TEMPLATE.format(system_prompt=PROMPT_SYSTEM, context=context, user_input=user_text)
+    def _build_prompt(self, user_text: str, context: str = "", system_prompt: str = PROMPT_SYSTEM) -> str:
+        return PROMPT_ANSWER_TEMPLATE.format(system_prompt=system_prompt, context=context, user_input=user_text)
+
+    def _chat(self, user_text: str, context: str) -> LLMResponse:
+        # PROMPT_SYSTEM travels as the system message (evaluated once while the
+        # model stays resident), so the user turn doesn't repeat it.
+        prompt = PROMPT_CHAT_TEMPLATE.format(context=context, user_input=user_text)
+        txt = self.client.chat_text(PROMPT_SYSTEM, prompt, model=self.model)
+        return LLMResponse(text=txt, meta={"model": self.model})
 
     def answer_query(self, text: str, context: str = "") -> LLMResponse:
         prompt = self._build_prompt(text, context)
@@ -53,24 +58,7 @@ class LLMAgent:
         if not self.enabled:
             return self._mock.answer(prompt)
         try:
-            # Attempt a generic HTTP POST to configured LLM host.
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": PROMPT_SYSTEM},
-                    {"role": "user", "content": prompt}
-                ],
-                "stream": False
-            }
-
-            r = requests.post(f"{self.host}/v1/chat/completions", json=payload, timeout=self.timeout)
-
-
-            print("\n--- RAW LLM RESPONSE (answer_query) ---\n", r.text, "\n-----------------------\n")
-            r.raise_for_status()
-            body = r.json()
-            txt = body["choices"][0]["message"]["content"]
-            return LLMResponse(text=txt, meta={"model": self.model, "raw": body})
+            return self._chat(text, context)
         except Exception as e:
             log.warning("[LLM] remote call failed: %s", e)
             return self._mock.answer(prompt)
@@ -84,22 +72,7 @@ class LLMAgent:
         if not self.enabled:
             return self._mock.suggest(prompt)
         try:
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": PROMPT_SYSTEM},
-                    {"role": "user", "content": prompt}
-                ],
-                "stream": False
-            }
-
-            r = requests.post(f"{self.host}/v1/chat/completions", json=payload, timeout=self.timeout)
-
-            r.raise_for_status()
-            body = r.json()
-            txt = body["choices"][0]["message"]["content"]
-
-            return LLMResponse(text=txt, meta={"model": self.model, "raw": body})
+            return self._chat("Please propose a safe command (JSON) if appropriate:\n\n" + text, context)
         except Exception as e:
             log.warning("[LLM] remote suggest failed: %s", e)
             return self._mock.suggest(prompt)
@@ -1,54 +1,264 @@
-import torch
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
 from pathlib import Path
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from assistant.config.settings import settings
 from assistant.utils.logger import get_logger
 
 log = get_logger(__name__)
 
 
-class LocalLLM:
-    _model = None
-    _tokenizer = None
+class _RequestCoalescer:
+    """
+    Collects generate() calls arriving within a short window and runs them
+    as one batch. A single worker thread owns the model, so callers never
+    race each other inside model.generate.
+    """
 
-    @classmethod
-    def load(cls, model_path: str):
-        if cls._model is not None:
-            return
+    def __init__(self, run_batch, window_s: float, max_batch: int):
+        self._run_batch = run_batch
+        self._window_s = window_s
+        self._max_batch = max_batch
+        self._q: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._worker, name="local-llm-batcher", daemon=True)
+        self._thread.start()
 
-        model_path = Path(model_path).expanduser().resolve()
+    def submit(self, prompt: str, max_new_tokens: int) -> Future:
+        fut = Future()
+        self._q.put((prompt, max_new_tokens, fut))
+        return fut
 
-        if not model_path.exists():
-            raise FileNotFoundError(f"Model path does not exist: {model_path}")
+    def _worker(self):
+        while True:
+            batch = [self._q.get()]
+            deadline = time.monotonic() + self._window_s
+            while len(batch) < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._q.get(timeout=remaining))
+                except queue.Empty:
+                    break
 
-        log.info("Loading local T5 fine-tuned model from %s", model_path)
+            # Requests with different token budgets are decoded separately
+            by_budget: dict[int, list] = {}
+            for req in batch:
+                by_budget.setdefault(req[1], []).append(req)
+
+            for budget, reqs in by_budget.items():
+                # identical prompts are decoded once and share the result
+                prompts = list(dict.fromkeys(r[0] for r in reqs))
+                try:
+                    outs = dict(zip(prompts, self._run_batch(prompts, budget)))
+                except Exception as e:
+                    for r in reqs:
+                        r[2].set_exception(e)
+                    continue
+                for r in reqs:
+                    r[2].set_result(outs[r[0]])
+
+
+def generated_tokens(outputs, pad_token_id) -> int:
+    """
+    Tokens generated in a batch of seq2seq outputs. Every row starts with the
+    decoder start token (not the input), and shorter rows are padded.
+    """
+    generated = outputs[:, 1:]
+    if pad_token_id is None:
+        return int(generated.numel() if hasattr(generated, "numel") else generated.size)
+    return int((generated != pad_token_id).sum())
 
-        cls._tokenizer = AutoTokenizer.from_pretrained(
-            model_path,
-            local_files_only=True
-        )
 
-        cls._model = AutoModelForSeq2SeqLM.from_pretrained(
+def load_seq2seq(model_path: str, backend: str = "torch"):
+    """
+    Load (tokenizer, model) for the fine-tuned T5 with the given backend:
+
+    - "torch": float model (float16 on CUDA, float32 otherwise)
+    - "int8":  float32 CPU model with dynamic int8 quantization of all Linear layers
+    - "onnx":  ONNX Runtime encoder/decoder sessions with KV cache (needs
+               optimum[onnxruntime]); exported once into <model_path>/onnx
+    """
+    import torch
+    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+
+    model_path = Path(model_path).expanduser().resolve()
+
+    if not model_path.exists():
+        raise FileNotFoundError(f"Model path does not exist: {model_path}")
+
+    log.info("Loading local T5 fine-tuned model from %s (backend=%s)", model_path, backend)
+
+    tokenizer = AutoTokenizer.from_pretrained(
+        model_path,
+        local_files_only=True
+    )
+
+    if backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        except ImportError as e:
+            raise RuntimeError("LOCAL_LLM_BACKEND=onnx requires optimum[onnxruntime]") from e
+
+        onnx_dir = model_path / "onnx"
+        if onnx_dir.exists():
+            model = ORTModelForSeq2SeqLM.from_pretrained(onnx_dir, use_cache=True, provider="CPUExecutionProvider")
+        else:
+            log.info("Exporting %s to ONNX (first run only)", model_path)
+            model = ORTModelForSeq2SeqLM.from_pretrained(
+                model_path, export=True, use_cache=True, provider="CPUExecutionProvider"
+            )
+            model.save_pretrained(onnx_dir)
+        return tokenizer, model
+
+    if backend == "int8":
+        model = AutoModelForSeq2SeqLM.from_pretrained(
             model_path,
-            dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
-            device_map="auto",
+            dtype=torch.float32,
             local_files_only=True
         )
+        model.eval()
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return tokenizer, model
+
+    if backend != "torch":
+        raise ValueError(f"Unknown LOCAL_LLM_BACKEND: {backend}")
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(
+        model_path,
+        dtype=torch.float16 if torch.cuda.is_available() else torch.float32,
+        device_map="auto",
+        local_files_only=True
+    )
+    model.eval()
+    return tokenizer, model
+
 
-        cls._model.eval()
+class LocalLLM:
+    """
+    Fine-tuned T5 used by the command translator.
+
+    Nothing is loaded at import time: torch/transformers and the weights are
+    pulled in by warm_load() on a background thread, or on the first
+    generate() call. Only callers that actually generate wait for it.
+    """
+    _model = None
+    _tokenizer = None
+    _lock = threading.Lock()
+    _coalescer = None
+    _loading: Future | None = None
+    last_batch_stats: dict = {}
+
+    @classmethod
+    def warm_load(cls, model_path: str | None = None) -> Future:
+        """Start loading in the background (once) and return the readiness future."""
+        with cls._lock:
+            if cls._loading is None:
+                cls._loading = Future()
+                threading.Thread(
+                    target=cls._load_into_future,
+                    args=(model_path or settings.LOCAL_LLM_PATH, cls._loading),
+                    name="local-llm-loader",
+                    daemon=True,
+                ).start()
+            return cls._loading
+
+    @classmethod
+    def load(cls, model_path: str | None = None):
+        """Blocking load; returns once the model is ready (or raises the load error)."""
+        cls.warm_load(model_path).result()
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        return cls._loading is not None and cls._loading.done() and cls._loading.exception() is None
+
+    @classmethod
+    def _load_into_future(cls, model_path: str, fut: Future):
+        t0 = time.perf_counter()
+        try:
+            cls._load(model_path)
+        except Exception as e:
+            log.error("Local model failed to load: %s", e)
+            # let the next warm_load()/generate() try again instead of re-raising forever
+            with cls._lock:
+                if cls._loading is fut:
+                    cls._loading = None
+            fut.set_exception(e)
+            return
+        log.info("Local model ready in %.1fs", time.perf_counter() - t0)
+        fut.set_result(True)
+
+    @classmethod
+    def _load(cls, model_path: str):
+        cls._tokenizer, cls._model = load_seq2seq(model_path, settings.LOCAL_LLM_BACKEND)
 
     @classmethod
     def generate(cls, prompt: str, max_new_tokens: int = 256) -> str:
-        inputs = cls._tokenizer(
-            prompt,
-            return_tensors="pt",
-            truncation=True
-        ).to(cls._model.device)
-
-        with torch.no_grad():
-            outputs = cls._model.generate(
-                **inputs,
-                max_new_tokens=max_new_tokens,
-                do_sample=False
+        """
+        Generate for a single prompt. Concurrent callers are coalesced into
+        one batched forward pass (see LOCAL_LLM_BATCH_WINDOW_MS).
+        """
+        if cls._coalescer is None:
+            with cls._lock:
+                if cls._coalescer is None:
+                    cls._coalescer = _RequestCoalescer(
+                        cls.generate_batch,
+                        settings.LOCAL_LLM_BATCH_WINDOW_MS / 1000.0,
+                        settings.LOCAL_LLM_MAX_BATCH,
+                    )
+        return cls._coalescer.submit(prompt, max_new_tokens).result()
+
+    @classmethod
+    def generate_batch(cls, prompts: list[str], max_new_tokens: int = 256) -> list[str]:
+        """
+        Generate for several prompts, returned in input order.
+
+        Prompts are sorted by token length and split into chunks of at most
+        LOCAL_LLM_MAX_BATCH so each chunk pads only to its own longest prompt.
+        """
+        if not prompts:
+            return []
+
+        import torch
+        cls.load()
+
+        encoded = cls._tokenizer(list(prompts), truncation=True)
+        order = sorted(range(len(prompts)), key=lambda i: len(encoded["input_ids"][i]))
+        results: list[str] = [""] * len(prompts)
+        size = max(1, settings.LOCAL_LLM_MAX_BATCH)
+
+        for start in range(0, len(order), size):
+            chunk = order[start:start + size]
+            features = [
+                {"input_ids": encoded["input_ids"][i], "attention_mask": encoded["attention_mask"][i]}
+                for i in chunk
+            ]
+            inputs = cls._tokenizer.pad(features, return_tensors="pt").to(cls._model.device)
+
+            t0 = time.perf_counter()
+            with cls._lock, torch.no_grad():
+                outputs = cls._model.generate(
+                    **inputs,
+                    max_new_tokens=max_new_tokens,
+                    do_sample=False
+                )
+            elapsed = time.perf_counter() - t0
+
+            new_tokens = generated_tokens(outputs, cls._tokenizer.pad_token_id)
+            cls.last_batch_stats = {
+                "batch_size": len(chunk),
+                "latency_ms": elapsed * 1000,
+                "tokens": new_tokens,
+                "tokens_per_s": new_tokens / elapsed if elapsed > 0 else 0.0,
+            }
+            log.info(
+                "[LocalLLM] batch=%d latency=%.0fms tokens=%d (%.1f tok/s)",
+                len(chunk), elapsed * 1000, new_tokens, cls.last_batch_stats["tokens_per_s"]
             )
 
-        return cls._tokenizer.decode(outputs[0], skip_special_tokens=True)
+            for i, text in zip(chunk, cls._tokenizer.batch_decode(outputs, skip_special_tokens=True)):
+                results[i] = text
+
+        return results
@@ -1,13 +1,11 @@
 # assistant/agents/nl_router.py
 
-import json
-import requests
-import re
-from assistant.agents.local_llm import LocalLLM
 from assistant.config.settings import settings
 from assistant.utils.logger import get_logger
+from assistant.utils.ollama_client import get_ollama_client
 
 from assistant.memory.conversation_memory import ConversationMemory
+from assistant.memory.route_cache import RouteCache
 
 log = get_logger(__name__)
 
@@ -76,12 +74,38 @@ Output valid JSON only, No other explanations before or after the JSON.
 
 
     def __init__(self):
-        LocalLLM.load(settings.LOCAL_LLM_PATH)
         self.conversation_memory = ConversationMemory()
-
-    def route(self, user_text: str) -> dict:
+        self.llm = get_ollama_client()
+        if settings.LLM_ENABLED:
+            # Load the model and evaluate SYSTEM_PROMPT before the first utterance
+            self.llm.prime_in_background(self.SYSTEM_PROMPT)
+        self.cache = RouteCache() if settings.ROUTE_CACHE_ENABLED else None
+
+    def route(self, user_text: str, on_field=None, use_cache: bool = True, store: bool = True) -> dict:
+        """
+        on_field(name, value): optional callback fired as soon as a top-level
+        field such as "type" is decoded from the streaming response.
+        use_cache: set False for one-off prompts (e.g. replanning) that should
+        neither be answered from nor stored in the route cache.
+        store: set False for speculative calls on partial text; they may be
+        answered from the cache but add nothing to it.
+
+        Only chat answers are cached here. A task route is cached by
+        remember() once its plan has run successfully.
+        """
         log.info("[NLRouter] Routing text: %s", user_text)
 
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            cached = cache.get(user_text)
+            if cached is not None:
+                log.info("[NLRouter] Route cache hit (%s)", cached.get("type"))
+                if on_field:
+                    for name, value in cached.items():
+                        if isinstance(value, str):
+                            on_field(name, value)
+                return dict(cached)
+
         recent_context = self.conversation_memory.recent(limit=6)
 
         context_block = ""
@@ -93,26 +117,9 @@ Output valid JSON only, No other explanations before or after the JSON.
 
             context_block += "\n"
 
-        prompt = (
-            f"{self.SYSTEM_PROMPT}\n"
-            
-            f"User: {user_text}\n"
-            f"Assistant:"
-        )#f"{context_block}"
-
-        payload = {
-            "model": settings.LLM_MODEL,
-            "prompt": prompt,
-            "stream": False,
-        }
-
         try:
-            r = requests.post(
-                settings.OLLAMA_URL,
-                json=payload,
-                timeout=120,
-            )
-            r.raise_for_status()
+            # SYSTEM_PROMPT goes as its own message so Ollama can reuse its evaluation
+            obj, raw = self.llm.chat_json(self.SYSTEM_PROMPT, user_text, on_field=on_field)
         except Exception as e:
             log.error("LLM request failed: %s", e)
             return {
@@ -120,23 +127,25 @@ Output valid JSON only, No other explanations before or after the JSON.
                 "response": "I'm having trouble thinking right now."
             }
 
-        raw = r.json().get("response", "").strip()
         log.debug("[NLRouter] Raw LLM output: %s", raw)
 
-        def strip_code_fences(text: str) -> str:
-            # Remove ```json ... ``` or ``` ... ```
-            text = text.strip()
-            text = re.sub(r"^```(?:json)?\s*", "", text)
-            text = re.sub(r"\s*```$", "", text)
-            return text.strip()
-
-        clean = strip_code_fences(raw)
-
-        try:
-            return json.loads(clean)
-        except json.JSONDecodeError:
+        if obj is None:
             log.warning("LLM returned non-JSON, falling back to chat")
             return {
                 "type": "chat",
                 "response": raw
             }
+
+        if cache is not None and store and obj.get("type") == "chat":
+            cache.put(user_text, obj)
+        return obj
+
+    def remember(self, user_text: str, route: dict):
+        """Cache a route that turned out well (a task whose plan succeeded)."""
+        if self.cache is not None and route.get("type") in ("chat", "task"):
+            self.cache.put(user_text, route)
+
+    def forget(self, user_text: str):
+        """Drop a cached route, e.g. a plan that failed."""
+        if self.cache is not None:
+            self.cache.discard(user_text)
@@ -1,4 +1,5 @@
 # assistant/agents/observer.py
+from typing import Optional
 
 from assistant.utils.logger import get_logger
 
@@ -19,6 +20,27 @@ class ObserverAgent:
         "no such file",
     ]
 
+    # Failures that make it pointless to let a running command continue.
+    # Per-file errors ("permission denied" from find / or grep -r) are not
+    # here: the rest of the output is still useful, so they are judged by
+    # observe() once the command has exited.
+    ABORT_KEYWORDS = [
+        "command not found",
+        "no space left on device",
+        "read-only file system",
+    ]
+
+    def watch(self, line: str) -> Optional[str]:
+        """
+        Called for each output line while a command is still running.
+        Returns the reason to stop the command early, or None to let it run.
+        """
+        lowered = line.lower()
+        for kw in self.ABORT_KEYWORDS:
+            if kw in lowered:
+                return kw
+        return None
+
     def observe(self, command: str, output: str) -> dict:
         log.info("[Observer] Observing result of %s", command)
 
@@ -1,44 +1,127 @@
 # assistant/agents/package_manager.py
+import glob
+import os
+import re
 import subprocess
 import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from assistant.config.settings import settings
+from assistant.utils.apt_index import PackagePolicy, get_apt_index
+from assistant.utils.dpkg_status import get_dpkg_index
 from assistant.utils.logger import get_logger
 
 log = get_logger(__name__)
 
+_UPDATE_STAMP = str(Path(settings.LEO_HOME) / "apt-update-stamp")
+# written by apt's periodic job after a successful update
+_APT_SUCCESS_STAMP = "/var/lib/apt/periodic/update-success-stamp"
+_MISSING_CANDIDATE = re.compile(
+    r"Unable to locate package|has no installation candidate|404\s+Not Found|Failed to fetch", re.IGNORECASE
+)
+# one apt-get update at a time, shared by every PackageManagerAgent
+_update_lock = threading.Lock()
+_last_update = 0.0
+
 class PackageManagerAgent:
     def __init__(self):
-        pass
+        self.dpkg = get_dpkg_index()
+        self.apt = get_apt_index()
 
     def is_installed(self, pkg: str) -> bool:
-        r = subprocess.run(["dpkg-query", "-W", "-f=${Status}", pkg], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-        return "install ok installed" in r.stdout
+        return self.dpkg.is_installed(pkg)
+
+    def are_installed(self, pkgs: list[str]) -> dict[str, bool]:
+        return self.dpkg.are_installed(pkgs)
+
+    def policy(self, pkg: str) -> Optional[PackagePolicy]:
+        return self.apt.policy(pkg)
 
     def apt_policy(self, pkg: str) -> str:
-        r = subprocess.run(["apt-cache", "policy", pkg], text=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-        return r.stdout
+        pol = self.apt.policy(pkg)
+        return pol.render() if pol else f"N: Unable to locate package {pkg}"
 
     def apt_exists(self, pkg: str) -> bool:
-        out = self.apt_policy(pkg)
-        return "Candidate:" in out and "Candidate: (none)" not in out
+        return self.apt.exists(pkg)
+
+    def suggest(self, pkg: str) -> list[str]:
+        """Package names close to a mistyped one."""
+        return self.apt.suggest(pkg)
 
     def available_disk_mb(self, path: str = "/") -> int:
         total, used, free = shutil.disk_usage(path)
         return int(free / (1024*1024))
 
+    # ----- apt-get update scheduling -----
+    def lists_age(self) -> float:
+        """Seconds since the apt lists were last known to be refreshed."""
+        paths = [_UPDATE_STAMP, _APT_SUCCESS_STAMP, self.apt.lists_dir]
+        paths += glob.glob(os.path.join(self.apt.lists_dir, "*_Packages*"))
+        newest = 0.0
+        for p in paths:
+            try:
+                newest = max(newest, os.stat(p).st_mtime)
+            except OSError:
+                continue
+        return time.time() - newest if newest else float("inf")
+
+    def update(self, force: bool = False, max_age: Optional[int] = None):
+        """
+        Yield `apt-get update` output lines, unless the lists are younger than
+        max_age (APT_UPDATE_MAX_AGE). Concurrent callers queue on one lock; whoever
+        comes second finds fresh lists and skips its own update.
+        """
+        max_age = settings.APT_UPDATE_MAX_AGE if max_age is None else max_age
+        requested = time.time()
+        with _update_lock:
+            global _last_update
+            if force and _last_update >= requested:
+                yield "[apt lists were refreshed by a concurrent request]"
+                return
+            if not force and self.lists_age() < max_age:
+                log.info("[apt] Lists are %.0fs old, skipping update", self.lists_age())
+                return
+            proc = subprocess.Popen(["sudo", "apt-get", "update"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            for line in proc.stdout:
+                yield line
+            if proc.wait() == 0:
+                _last_update = time.time()
+                try:
+                    Path(_UPDATE_STAMP).parent.mkdir(parents=True, exist_ok=True)
+                    Path(_UPDATE_STAMP).touch()
+                except OSError as e:
+                    log.debug("[apt] Could not write %s: %s", _UPDATE_STAMP, e)
+
     def install(self, pkg: str, update_first: bool = True):
         """
         Return a generator that yields stdout lines (so caller can stream).
+
+        update_first refreshes the apt lists only when they are older than
+        APT_UPDATE_MAX_AGE. If the install then fails because the package has
+        no candidate, the lists are refreshed once more and the install retried.
         """
+        updated = False
         if update_first:
-            # Do apt-get update first
-            proc = subprocess.Popen(["sudo", "apt-get", "update"], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            for line in self.update():
+                updated = True
+                yield line
+
+        returncode, missing = None, False
+        for attempt in range(2):
+            cmd = ["sudo", "apt-get", "install", "-y", pkg]
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            missing = False
             for line in proc.stdout:
+                missing = missing or bool(_MISSING_CANDIDATE.search(line))
+                yield line
+            returncode = proc.wait()
+            if returncode == 0 or not missing or updated:
+                break
+            log.info("[apt] %s has no candidate with the current lists, updating and retrying", pkg)
+            for line in self.update(force=True):
                 yield line
-            proc.wait()
-
-        cmd = ["sudo", "apt-get", "install", "-y", pkg]
-        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
-        for line in proc.stdout:
-            yield line
-        proc.wait()
-        yield f"[exit {proc.returncode}]"
+            updated = True
+        yield f"[exit {returncode}]"
@@ -0,0 +1,269 @@
+# assistant/agents/plan_scheduler.py
+"""
+Runs the steps of an LLM plan concurrently where it is safe to.
+
+Dependencies are inferred from the commands: read-only commands may run
+alongside each other, while any other command waits for everything before it
+and everything after it waits for it. A plan may add its own ordering
+("depends_on": one list of step indices per step) but never remove the
+inferred one. Whatever the execution order, messages are reported in plan
+order.
+"""
+import asyncio
+import re
+import shlex
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from assistant.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+# Binaries that cannot change system state whatever their arguments
+READ_ONLY_BINARIES = {
+    "ls", "cat", "head", "tail", "wc", "stat", "file", "du", "df", "free", "uptime",
+    "uname", "whoami", "id", "groups", "pwd", "which", "whereis", "type", "ps", "pgrep",
+    "lsblk", "lscpu", "lsusb", "lspci", "lsmod", "ss", "netstat", "grep", "egrep", "fgrep",
+    "cut", "tr", "dpkg-query", "apt-cache", "printenv", "test", "echo",
+}
+READ_ONLY_SUBCOMMANDS = {
+    "systemctl": {"status", "is-active", "is-enabled", "is-failed", "show", "list-units",
+                  "list-unit-files", "cat"},
+    "dpkg": {"-l", "-s", "-L", "--list", "--status", "--listfiles", "-S", "--search"},
+    "apt": {"list", "show", "search", "policy"},
+    "git": {"status", "log", "diff", "show", "branch", "remote"},
+    "find": None,   # read-only unless it deletes, executes or writes a file
+}
+# Subcommands that also create/delete things are read-only only with listing arguments
+LISTING_ARGS = {
+    ("git", "branch"): {"-a", "-r", "-l", "-v", "-vv", "--all", "--remotes", "--list", "--show-current"},
+    ("git", "remote"): {"-v", "--verbose"},
+}
+_UNSAFE_FIND_ARGS = {"-delete", "-exec", "-execdir", "-ok", "-okdir", "-fprint", "-fprint0", "-fprintf", "-fls"}
+_HARMLESS_REDIRECTS = re.compile(r"\s*(?:2>&1|[12&]?>\s*/dev/null)")
+# Separators between commands; every segment of a chain or pipeline is checked
+_CHAIN = re.compile(r"\|\||&&|[;|&\n]")
+
+
+def is_read_only(cmd: str) -> bool:
+    """Conservative check: True only if every segment is a known read-only command."""
+    if not cmd:
+        return False
+    cmd = _HARMLESS_REDIRECTS.sub(" ", cmd)
+    if re.search(r"[<>`]|\$\(", cmd):
+        return False    # redirection or command substitution could write anything
+    for segment in _CHAIN.split(cmd):
+        try:
+            argv = shlex.split(segment)
+        except ValueError:
+            return False
+        if not argv:
+            continue
+        base = argv[0].split("/")[-1]
+        if base in READ_ONLY_BINARIES:
+            continue
+        if base not in READ_ONLY_SUBCOMMANDS:
+            return False
+        if base == "find":
+            if _UNSAFE_FIND_ARGS.intersection(argv):
+                return False
+            continue
+        if len(argv) < 2 or argv[1] not in READ_ONLY_SUBCOMMANDS[base]:
+            return False
+        listing = LISTING_ARGS.get((base, argv[1]))
+        if listing is not None and not listing.issuperset(argv[2:]):
+            return False
+    return True
+
+
+def find_cycle(deps: list[set[int]]) -> Optional[list[int]]:
+    """A list of steps that wait for each other in a circle, or None."""
+    state = [0] * len(deps)     # 0 unvisited, 1 on the current path, 2 done
+    for root in range(len(deps)):
+        if state[root]:
+            continue
+        path, stack = [], [(root, iter(sorted(deps[root])))]
+        state[root] = 1
+        path.append(root)
+        while stack:
+            node, it = stack[-1]
+            nxt = next(it, None)
+            if nxt is None:
+                state[node] = 2
+                stack.pop()
+                path.pop()
+            elif state[nxt] == 1:
+                return path[path.index(nxt):]
+            elif state[nxt] == 0:
+                state[nxt] = 1
+                path.append(nxt)
+                stack.append((nxt, iter(sorted(deps[nxt]))))
+    return None
+
+
+def validate_dependencies(depends_on, n: int) -> Optional[list[set[int]]]:
+    """
+    Check a plan-supplied depends_on: one list per step, of existing step
+    indices other than the step itself. Returns it as sets, or None (with a
+    warning) if it is malformed.
+    """
+    if not isinstance(depends_on, list) or len(depends_on) != n:
+        log.warning("[Scheduler] Ignoring depends_on: expected %d lists, got %r", n, depends_on)
+        return None
+    try:
+        deps = [{int(j) for j in (d or [])} for d in depends_on]
+    except (TypeError, ValueError):
+        log.warning("[Scheduler] Ignoring depends_on with non-integer ids: %r", depends_on)
+        return None
+    for i, d in enumerate(deps):
+        unknown = sorted(j for j in d if not 0 <= j < n or j == i)
+        if unknown:
+            log.warning("[Scheduler] Ignoring depends_on: step %d waits for unknown steps %s", i, unknown)
+            return None
+    return deps
+
+
+def infer_dependencies(commands: list[str], depends_on: Optional[list] = None) -> list[set[int]]:
+    """
+    Return, for each step, the set of steps it must wait for.
+
+    The ordering inferred from is_read_only() always applies. A valid
+    depends_on from the plan is added to it, unless the combination has a
+    cycle.
+    """
+    n = len(commands)
+    read_only = [is_read_only(c) for c in commands]
+    deps: list[set[int]] = []
+    last_barrier = None
+    for i in range(n):
+        if read_only[i]:
+            d = {last_barrier} if last_barrier is not None else set()
+        else:
+            # a writing step waits for everything before it
+            d = set(range(i))
+            last_barrier = i
+        deps.append(d)
+
+    if depends_on is not None:
+        explicit = validate_dependencies(depends_on, n)
+        if explicit is not None:
+            merged = [d | e for d, e in zip(deps, explicit)]
+            cycle = find_cycle(merged)
+            if cycle is None:
+                return merged
+            log.warning("[Scheduler] Ignoring depends_on: steps %s wait for each other", cycle)
+    return deps
+
+
+class PlanScheduler:
+    """
+    run_step(index, command, emit) -> bool runs one step (including any
+    retry/replan) and reports messages through emit(text). A step returning
+    False stops the plan: steps that have not started are skipped (and
+    listed), running ones are allowed to finish.
+
+    A step that has to run commands the plan did not contain (recovery after
+    a failure) does so inside `async with scheduler.exclusive()`, which waits
+    for the other running steps to finish and holds back new ones.
+    """
+
+    def __init__(self, say: Callable[[str], None], max_parallel: int = 4):
+        self.say = say
+        self.max_parallel = max(1, max_parallel)
+        self._running = 0
+        self._exclusive = False
+        self._cond: Optional[asyncio.Condition] = None
+
+    @asynccontextmanager
+    async def _slot(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self._exclusive)
+            self._running += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
+
+    @asynccontextmanager
+    async def exclusive(self):
+        """Run the body with no other step running. Only valid inside run_step."""
+        async with self._cond:
+            # step aside first, so two steps asking at once don't wait for each other
+            self._running -= 1
+            self._cond.notify_all()
+            await self._cond.wait_for(lambda: not self._exclusive and self._running == 0)
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._exclusive = False
+                self._running += 1
+                self._cond.notify_all()
+
+    async def run(
+        self,
+        commands: list[str],
+        run_step: Callable[[int, str, Callable[[str], None]], Awaitable[bool]],
+        depends_on: Optional[list] = None,
+    ) -> bool:
+        deps = infer_dependencies(commands, depends_on)
+        n = len(commands)
+        done = [asyncio.Event() for _ in range(n)]
+        ok: list[Optional[bool]] = [None] * n
+        messages: list[list[str]] = [[] for _ in range(n)]
+        spoken = [0] * n
+        head = 0
+        stopped = False
+        sem = asyncio.Semaphore(self.max_parallel)
+        self._cond = asyncio.Condition()
+
+        def flush():
+            # Speak in plan order: only the earliest unfinished step may talk live
+            nonlocal head
+            while head < n:
+                msgs = messages[head]
+                while spoken[head] < len(msgs):
+                    self.say(msgs[spoken[head]])
+                    spoken[head] += 1
+                if not done[head].is_set():
+                    break
+                head += 1
+
+        def emitter(i):
+            def emit(text: str):
+                messages[i].append(text)
+                flush()
+            return emit
+
+        async def step(i: int):
+            nonlocal stopped
+            try:
+                for j in deps[i]:
+                    await done[j].wait()
+                if stopped or any(ok[j] is False or ok[j] is None for j in deps[i]):
+                    return
+                async with sem, self._slot():
+                    if stopped:
+                        return
+                    log.info("[Scheduler] step %d/%d: %s", i + 1, n, commands[i])
+                    try:
+                        ok[i] = await run_step(i, commands[i], emitter(i))
+                    except Exception as e:
+                        log.error("[Scheduler] step %d crashed: %s", i + 1, e)
+                        emitter(i)(f"Step {i + 1} failed unexpectedly: {e}. Stopping.")
+                        ok[i] = False
+                    if not ok[i]:
+                        stopped = True
+            finally:
+                done[i].set()
+                flush()
+
+        await asyncio.gather(*(step(i) for i in range(n)))
+        skipped = [i for i in range(n) if ok[i] is None]
+        if skipped:
+            listed = "; ".join(f"{i + 1}: {commands[i]}" for i in skipped)
+            self.say(f"Skipped {len(skipped)} step{'s' if len(skipped) > 1 else ''} after the failure: {listed}.")
+        return all(ok)
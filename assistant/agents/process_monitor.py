@@ -1,34 +1,137 @@
 # assistant/agents/process_monitor.py
+import os
+import re
+import signal
 import subprocess
+import time
 from typing import Generator
 
+from assistant.config.settings import settings
+from assistant.utils.logger import get_logger
+from assistant.utils import sysinfo
+from assistant.utils.procfs import ProcSampler, ProcessRow, proc_state, render_ps
+from assistant.utils.sysinfo import MemoryInfo, MountUsage, render_df, render_free
+from assistant.utils.systemd_units import get_unit_index, render_units
+
+log = get_logger(__name__)
+
 class ProcessMonitorAgent:
+    def __init__(self):
+        # kept between calls: CPU% is measured from the previous sample
+        self.sampler = ProcSampler()
+        self.units = get_unit_index()
+
     def disk_usage(self) -> str:
-        r = subprocess.run(["df", "-h"], text=True, stdout=subprocess.PIPE)
-        return r.stdout
+        """df -h style table."""
+        return render_df(sysinfo.disk_usage())
 
     def memory(self) -> str:
-        r = subprocess.run(["free", "-h"], text=True, stdout=subprocess.PIPE)
-        return r.stdout
+        """free -h style table."""
+        return render_free(sysinfo.memory_info())
+
+    def disk_report(self) -> list[MountUsage]:
+        return sysinfo.disk_usage()
+
+    def memory_report(self) -> MemoryInfo:
+        return sysinfo.memory_info()
 
     def top_processes(self, n: int = 10) -> str:
-        r = subprocess.run(["ps", "aux", "--sort=-%mem"], text=True, stdout=subprocess.PIPE)
-        lines = r.stdout.splitlines()
-        header = lines[0]
-        return "\n".join([header] + lines[1:1+n])
+        return render_ps(self.top_rows(n))
+
+    def top_rows(self, n: int = 10, by: str = "mem", match: str | None = None) -> list[ProcessRow]:
+        return self.sampler.top(n, by=by, match=match)
+
+    def pids_matching(self, name: str) -> list[int]:
+        """PIDs whose command line contains name (what `pgrep -f name` matched)."""
+        return self.sampler.pids_matching(re.escape(name))
 
     def kill_pid(self, pid: int) -> str:
-        # Basic safety: do not kill pid 1 or current process or system-critical pids (<= 100)
-        if pid <= 100:
+        outcome = self.kill_pids([pid])[pid]
+        if outcome == "protected":
             return f"Refusing to kill system PID {pid} (protected)."
-        r = subprocess.run(["sudo", "kill", "-9", str(pid)], text=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-        return r.stdout or f"kill returned {r.returncode}"
+        return f"PID {pid}: {outcome}"
+
+    def kill_pids(self, pids: list[int], grace: float | None = None) -> dict[int, str]:
+        """
+        SIGTERM every PID, wait up to `grace` seconds (one deadline shared by
+        all of them), then SIGKILL the survivors. Signals go through os.kill;
+        PIDs we are not allowed to signal are handled by a single `sudo kill`
+        per signal.
+
+        Returns pid -> "terminated", "killed", "already gone", "protected" or
+        "failed (...)".
+        """
+        grace = settings.KILL_GRACE_SECONDS if grace is None else grace
+        outcomes: dict[int, str] = {}
+        # remember which process each PID is, so a reused PID is never signalled
+        started: dict[int, int] = {}
+        for pid in dict.fromkeys(pids):
+            # Basic safety: do not kill pid 1 or current process or system-critical pids (<= 100)
+            if pid <= 100 or pid == os.getpid():
+                outcomes[pid] = "protected"
+                continue
+            st = proc_state(pid)
+            if st is None or st[0] in ("Z", "X"):
+                outcomes[pid] = "already gone"
+                continue
+            started[pid] = st[1]
+
+        def alive(pid: int) -> bool:
+            st = proc_state(pid)
+            return st is not None and st[1] == started[pid] and st[0] not in ("Z", "X")
+
+        def signal_all(targets: list[int], sig: signal.Signals) -> dict[int, str]:
+            privileged, errors = [], {}
+            for pid in targets:
+                if not alive(pid):
+                    continue
+                try:
+                    os.kill(pid, sig)
+                except ProcessLookupError:
+                    pass
+                except PermissionError:
+                    privileged.append(pid)
+            if privileged:
+                log.info("[Monitor] sudo kill -%s %s", sig.name, privileged)
+                r = subprocess.run(
+                    ["sudo", "kill", f"-{sig.name[3:]}"] + [str(p) for p in privileged],
+                    text=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                )
+                if r.returncode != 0:
+                    for pid in privileged:
+                        if alive(pid):
+                            errors[pid] = r.stdout.strip() or f"sudo kill returned {r.returncode}"
+            return errors
+
+        def wait_until(deadline: float, targets: list[int]) -> list[int]:
+            remaining = [p for p in targets if alive(p)]
+            while remaining and time.monotonic() < deadline:
+                time.sleep(0.05)
+                remaining = [p for p in remaining if alive(p)]
+            return remaining
+
+        targets = list(started)
+        errors = signal_all(targets, signal.SIGTERM) if grace > 0 else {}
+        survivors = wait_until(time.monotonic() + grace, targets) if grace > 0 else targets
+        for pid in targets:
+            if pid not in survivors:
+                outcomes[pid] = "terminated"
+
+        if survivors:
+            errors.update(signal_all(survivors, signal.SIGKILL))
+            still = wait_until(time.monotonic() + 1.0, survivors)
+            for pid in survivors:
+                if pid in still:
+                    outcomes[pid] = f"failed ({errors.get(pid, 'still running')})"
+                else:
+                    outcomes[pid] = "killed"
+        return {pid: outcomes[pid] for pid in dict.fromkeys(pids)}
+
+    def summarize_kills(self, outcomes: dict[int, str], name: str) -> str:
+        stopped = [p for p, o in outcomes.items() if o in ("terminated", "killed", "already gone")]
+        lines = [f"Stopped {len(stopped)} of {len(outcomes)} processes matching {name}."]
+        lines += [f"PID {p}: {o}" for p, o in outcomes.items() if p not in stopped]
+        return "\n".join(lines)
 
     def list_services(self, pattern: str | None = None) -> str:
-        # list systemctl --type=service --all
-        cmd = ["systemctl", "list-units", "--type=service", "--all", "--no-pager"]
-        r = subprocess.run(cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-        out = r.stdout
-        if pattern:
-            out = "\n".join([ln for ln in out.splitlines() if pattern in ln])
-        return out
+        return render_units(self.units.list(pattern))
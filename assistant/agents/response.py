@@ -1,3 +1,4 @@
+import asyncio
 import subprocess
 import tempfile
 from pathlib import Path
@@ -67,3 +68,38 @@ class ResponseAgent:
                 stderr=subprocess.DEVNULL,
                 check=False,
             )
+
+
+class SpeechQueue:
+    """
+    Ordered, non-blocking front end for ResponseAgent on an asyncio loop.
+
+    say() only queues the text and returns, so the caller can start the next
+    command or LLM request while piper/aplay run in a worker thread. Lines
+    are spoken one at a time in the order they were queued. drain() waits
+    until everything queued so far has been spoken. Must be used from the
+    loop's own thread.
+    """
+
+    def __init__(self, resp: ResponseAgent):
+        self.resp = resp
+        self._q: asyncio.Queue = asyncio.Queue()
+        self._worker = None
+
+    def say(self, text):
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        self._q.put_nowait(text)
+
+    async def drain(self):
+        await self._q.join()
+
+    async def _run(self):
+        while True:
+            text = await self._q.get()
+            try:
+                await asyncio.to_thread(self.resp.say, text)
+            except Exception as e:
+                log.warning("[Say] failed: %s", e)
+            finally:
+                self._q.task_done()
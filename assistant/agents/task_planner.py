@@ -1,9 +1,7 @@
 # assistant/agents/task_planner.py
 
-import json
-import requests
-from assistant.config.settings import settings
 from assistant.utils.logger import get_logger
+from assistant.utils.ollama_client import get_ollama_client
 
 log = get_logger(__name__)
 
@@ -43,27 +41,21 @@ Output:
 }
 """
 
+    def __init__(self):
+        self.llm = get_ollama_client()
+
     def plan(self, goal: str) -> dict:
         log.info("[Planner] Planning goal: %s", goal)
 
-        payload = {
-            "model": settings.LLM_MODEL,
-            "prompt": f"{self.SYSTEM_PROMPT}\nGoal: {goal}\nPlan:",
-            "stream": False,
-        }
-
         try:
-            r = requests.post(settings.OLLAMA_URL, json=payload, timeout=60)
-            r.raise_for_status()
+            plan, raw = self.llm.chat_json(self.SYSTEM_PROMPT, f"Goal: {goal}")
         except Exception as e:
             log.error("Planner LLM error: %s", e)
             return {"goal": goal, "steps": []}
 
-        raw = r.json().get("response", "").strip()
         log.debug("[Planner] Raw output: %s", raw)
 
-        try:
-            return json.loads(raw)
-        except json.JSONDecodeError:
+        if plan is None:
             log.error("Planner returned invalid JSON")
             return {"goal": goal, "steps": []}
+        return plan
@@ -1,46 +1,204 @@
-import json, queue, sys
-import sounddevice as sd
-from vosk import Model, KaldiRecognizer
+import json, sys, time
+from collections import deque
+from difflib import SequenceMatcher
+from typing import Optional
+import numpy as np
 from assistant.config.settings import settings
+from assistant.utils.audio_capture import get_audio_capture
 from assistant.utils.logger import get_logger
+from assistant.utils.vad import AUDIO, VoiceGate
+from assistant.utils.vosk_models import configure_endpointer, get_vosk_registry
 
 log = get_logger(__name__)
 
-command_list = [c.lower() for c in [
-    "leo",
-    "leo say",
-    "leo open", 
-    "leo install", 
-    "leo shutdown", 
-    "leo restart"
-]]
 
 class VoiceInputAgent:
+    """
+    Two-stage listener. A recognizer restricted to the wake word runs on all
+    speech; only once it hears the wake word is the unrestricted recognizer
+    fed, starting with the buffered audio of the current utterance so the
+    first word of the command is not lost.
+    """
+
     def __init__(self, model_dir: str | None = None, samplerate: int | None = None):
         model_dir = model_dir or settings.VOSK_MODEL_DIR
         samplerate = samplerate or settings.SAMPLE_RATE
-        self.model = Model(model_dir)
-        self.rec = KaldiRecognizer(self.model, samplerate, json.dumps(command_list))
+        registry = get_vosk_registry()
+        self.model = registry.get(model_dir)   # shared with ConfirmAgent
+        self.wake_word = settings.WAKE_WORD.lower()
+        self.two_stage = settings.WAKE_TWO_STAGE
+        # stage 1: cheap, grammar-restricted; stage 2: large vocabulary
+        self.wake_rec = registry.recognizer(model_dir, samplerate, [self.wake_word, "[unk]"]) if self.two_stage else None
+        self.rec = registry.recognizer(model_dir, samplerate)
+        if not configure_endpointer(self.rec):
+            log.debug("[Voice] This vosk has no endpointer settings; using its defaults")
         self.samplerate = samplerate
-        self.q = queue.Queue()
+        self.capture = get_audio_capture()
+        self._recent: deque = deque()         # audio of the current utterance, for the stage switch
+        self._recent_samples = 0
+        self._max_recent = int(samplerate * settings.WAKE_PREROLL_MS / 1000)
+        self._awake_until = 0.0 if self.two_stage else float("inf")
+        # end of speech -> dispatch, per utterance
+        self.latencies_ms: deque = deque(maxlen=200)
+        self.early_finalized = 0
+
+    # ----- stage 1 -----
+    def _remember(self, samples):
+        self._recent.append(samples.copy())
+        self._recent_samples += len(samples)
+        # the newest block is always kept, even with WAKE_PREROLL_MS=0
+        while len(self._recent) > 1 and self._recent_samples - len(self._recent[0]) >= self._max_recent:
+            self._recent_samples -= len(self._recent.popleft())
+
+    def _forget(self):
+        self._recent.clear()
+        self._recent_samples = 0
+
+    def _heard_wake(self, samples) -> bool:
+        if self.wake_rec.AcceptWaveform(samples.tobytes()):
+            text = json.loads(self.wake_rec.Result()).get("text", "")
+            if self.wake_word not in text.split():
+                # that utterance is over; don't replay it ahead of the next one
+                self._forget()
+                return False
+            return True
+        text = json.loads(self.wake_rec.PartialResult()).get("partial", "")
+        return self.wake_word in text.split()
+
+    def _wake(self):
+        log.debug("[Voice] Wake word heard; replaying %d ms", 1000 * self._recent_samples // self.samplerate)
+        self._awake_until = time.monotonic() + settings.WAKE_FOLLOWUP_S
+        self.wake_rec.Reset()
+        self.rec.Reset()
+
+    @property
+    def awake(self) -> bool:
+        return time.monotonic() < self._awake_until
+
+    def _command_text(self, text: str) -> str:
+        """
+        The full recognizer hears the wake word too (it was replayed); drop
+        it, or whatever the large vocabulary made of it, from the front.
+        """
+        words = text.split()
+        if words and SequenceMatcher(None, words[0], self.wake_word).ratio() >= 0.6:
+            words = words[1:]
+        return " ".join(words)
 
-    def _callback(self, indata, frames, time, status):
-        if status:
-            log.warning(str(status))
-        self.q.put(bytes(indata))
+    def _record_latency(self, speech_end: float, early: bool):
+        ms = (time.monotonic() - speech_end) * 1000
+        self.latencies_ms.append(ms)
+        self.early_finalized += early
+        log.info("[Voice] End of speech to dispatch: %.0f ms%s", ms, " (early)" if early else "")
 
-    def listen(self, on_final_text):
-        """Continuous listen; calls on_final_text(text) for each final phrase."""
+    def latency_stats(self) -> dict:
+        lat = sorted(self.latencies_ms)
+        if not lat:
+            return {"utterances": 0}
+        return {
+            "utterances": len(lat),
+            "p50_ms": round(lat[len(lat) // 2]),
+            "p95_ms": round(lat[max(0, int(len(lat) * 0.95) - 1)]),
+            "early": self.early_finalized,
+        }
+
+    def listen(self, on_final_text, on_partial_text=None, is_complete=None):
+        """
+        Continuous listen; calls on_final_text(text) for each final phrase,
+        as "<wake word> <command>".
+
+        on_partial_text(text), if given, is called once per hypothesis that has
+        stayed unchanged for SPECULATIVE_STABLE_MS, so the caller can start
+        work before Vosk finalizes the utterance.
+
+        is_complete(text), if given, is asked about a hypothesis that has been
+        unchanged for VOICE_EARLY_FINALIZE_MS; if it returns True the utterance
+        is finalized right away instead of waiting for the endpoint silence.
+        """
         log.info("[Voice] Listening… say: '%s <command>'", settings.WAKE_WORD)
-        with sd.RawInputStream(samplerate=self.samplerate, blocksize=8000, dtype='int16',
-                               channels=1, callback=self._callback):
+        stable_s = settings.SPECULATIVE_STABLE_MS / 1000.0
+        early_s = settings.VOICE_EARLY_FINALIZE_MS / 1000.0
+        partial, changed_at, reported, checked = "", 0.0, "", ""
+        gate = VoiceGate(self.samplerate) if settings.VAD_ENABLED else None
+        tap = None
+
+        def speech_end() -> Optional[float]:
+            if gate is not None:
+                return time.monotonic() - (gate.silence_samples + tap.pending()) / self.samplerate
+            # without the gate, the last change of the hypothesis is the best estimate
+            return changed_at or None
+
+        def finish(result: str, early: bool = False):
+            nonlocal partial, reported, checked
+            text = (json.loads(result).get("text") or "").strip()
+            ended = speech_end()
+            partial, reported, checked = "", "", ""
+            if self.two_stage:
+                command = self._command_text(text)
+                if not command:
+                    return
+                self._awake_until = 0.0
+                self._forget()
+                text = f"{self.wake_word} {command}"
+            elif not text:
+                return
+            if ended is not None:
+                self._record_latency(ended, early)
+            on_final_text(text)
+
+        def feed(samples):
+            nonlocal partial, changed_at, reported, checked
+            if not self.awake:
+                self._remember(samples)
+                if not self._heard_wake(samples):
+                    return
+                self._wake()
+                samples = np.concatenate(self._recent)
+                self._forget()
+            if self.rec.AcceptWaveform(samples.tobytes()):
+                finish(self.rec.Result())
+                return
+            if on_partial_text is None and is_complete is None and not self.two_stage:
+                return
+            current = json.loads(self.rec.PartialResult()).get("partial", "").strip()
+            if self.two_stage and current:
+                # still talking: keep the large-vocabulary stage on
+                self._awake_until = max(self._awake_until, time.monotonic() + settings.WAKE_FOLLOWUP_S)
+                current = self._command_text(current)
+                current = f"{self.wake_word} {current}" if current else ""
+            now = time.monotonic()
+            if current != partial:
+                partial, changed_at = current, now
+                return
+            if not partial:
+                return
+            if is_complete is not None and partial != checked and now - changed_at >= early_s:
+                checked = partial
+                if is_complete(partial):
+                    finish(self.rec.FinalResult(), early=True)
+                    self.rec.Reset()
+                    return
+            if on_partial_text is not None and partial != reported and now - changed_at >= stable_s:
+                reported = partial
+                on_partial_text(partial)
+
+        with self.capture.attach("voice") as tap:
             while True:
-                data = self.q.get()
-                if self.rec.AcceptWaveform(data):
-                    result = json.loads(self.rec.Result())
-                    text = (result.get("text") or "").strip()
-                    if text:
-                        on_final_text(text)
-                else:
-                    # partial = json.loads(self.rec.PartialResult()).get("partial", "")
-                    pass
\ No newline at end of file
+                data = tap.read(min_samples=self.capture.blocksize)
+                if data is None:
+                    break
+                if gate is None:
+                    feed(data)
+                    continue
+                for kind, samples in gate.process(data):
+                    if kind == AUDIO:
+                        feed(samples)
+                        continue
+                    # end of speech: flush the decoder and start the next segment clean
+                    if self.awake:
+                        finish(self.rec.FinalResult())
+                        self.rec.Reset()
+                    if self.two_stage:
+                        self.wake_rec.Reset()
+                        self._forget()
+                    log.debug("[Voice] VAD %s", gate.stats())
@@ -0,0 +1,108 @@
+# assistant/benchmarks/dpkg_status.py
+"""
+is_installed() through dpkg-query versus the in-process DpkgStatusIndex.
+
+A synthetic dpkg admin directory with --packages entries (default 3,000,
+the size of a typical desktop install) is generated so the numbers do not
+depend on the machine. Both paths must agree on every answer.
+
+    python -m assistant.benchmarks.dpkg_status [--packages 3000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from assistant.utils.dpkg_status import DpkgStatusIndex, dpkg_query
+
+STANZA = """Package: {name}
+Status: {status}
+Priority: optional
+Section: misc
+Installed-Size: 1234
+Maintainer: Nobody <nobody@example.org>
+Architecture: amd64
+Version: 1.{i}-1
+Depends: libc6 (>= 2.36)
+Description: synthetic package {i}
+ A package generated for the dpkg status benchmark.
+ .
+ It has a multi-line description like real entries do.
+"""
+
+
+def make_admindir(root: str, n: int) -> list[str]:
+    names = [f"pkg-{i:05d}" for i in range(n)]
+    with open(os.path.join(root, "status"), "w") as f:
+        for i, name in enumerate(names):
+            status = "deinstall ok config-files" if i % 10 == 0 else "install ok installed"
+            f.write(STANZA.format(name=name, status=status, i=i) + "\n")
+    open(os.path.join(root, "available"), "w").close()
+    os.makedirs(os.path.join(root, "info"), exist_ok=True)
+    os.makedirs(os.path.join(root, "updates"), exist_ok=True)
+    return names
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--packages", type=int, default=3000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--batch", type=int, default=50)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        names = make_admindir(root, args.packages)
+        rng = random.Random(0)
+        queries = [rng.choice(names) if rng.random() < 0.9 else f"missing-{i}" for i in range(args.queries)]
+
+        def query_one(pkg):
+            st = dpkg_query([pkg], admindir=root)[pkg]
+            return st is not None and st.installed
+
+        t0 = time.perf_counter()
+        expected = [query_one(q) for q in queries]
+        per_query = (time.perf_counter() - t0) / len(queries)
+
+        batch = queries[:args.batch]
+        t0 = time.perf_counter()
+        batched = dpkg_query(batch, admindir=root)
+        batch_query = time.perf_counter() - t0
+
+        index = DpkgStatusIndex(os.path.join(root, "status"))
+        t0 = time.perf_counter()
+        index.is_installed(names[0])
+        cold = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        got = [index.is_installed(q) for q in queries]
+        warm = (time.perf_counter() - t0) / len(queries)
+
+        t0 = time.perf_counter()
+        many = index.are_installed(batch)
+        batch_index = time.perf_counter() - t0
+
+        mismatches = sum(a != b for a, b in zip(expected, got))
+        mismatches += sum(many[p] != (batched[p] is not None and batched[p].installed) for p in batch)
+
+        print(f"{args.packages} packages, {len(queries)} queries")
+        print(f"dpkg-query per package     {per_query * 1e3:9.3f} ms")
+        print(f"dpkg-query, {len(batch)} at once     {batch_query * 1e3:9.3f} ms")
+        print(f"index first load           {cold * 1e3:9.3f} ms")
+        print(f"index per package          {warm * 1e6:9.3f} us")
+        print(f"index are_installed({len(batch)})   {batch_index * 1e6:9.3f} us")
+        print(f"disagreements              {mismatches}")
+
+        # make sure an update is picked up
+        with open(os.path.join(root, "status"), "a") as f:
+            f.write(STANZA.format(name="late-package", status="install ok installed", i=0) + "\n")
+        ok = index.is_installed("late-package") and index.loads == 2
+        print(f"mtime invalidation         {'ok' if ok else 'FAILED'}")
+
+    sys.exit(0 if ok and not mismatches else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# assistant/benchmarks/intent_matcher.py
+"""
+Throughput of IntentRecognitionAgent.parse over a synthetic corpus.
+
+Compares the first-token dispatch matcher against the old approach: every
+rule tried in order with re.match on the pattern string (through the re
+module cache) and substring checks for keyword rules.
+
+    python -m assistant.benchmarks.intent_matcher [--size 5000] [--rounds 5]
+"""
+import argparse
+import random
+import re
+import time
+
+from assistant.agents.intent_recognition import RULES, IntentRecognitionAgent, normalize
+
+PACKAGES = ["vim", "curl", "git", "htop", "nginx", "python3-venv", "gimp", "vlc", "tmux", "zsh"]
+SERVICES = ["nginx", "ssh", "docker", "cups", "bluetooth", "NetworkManager"]
+APPS = ["firefox", "gedit", "nautilus", "code", "thunderbird", "libreoffice"]
+SITES = ["debian.org", "https://github.com", "wikipedia.org", "news.ycombinator.com"]
+QUESTIONS = [
+    "what is a python venv", "update my system", "why is my laptop slow",
+    "explain systemd targets", "how do i change my wallpaper", "what time is it",
+    "tell me a joke", "compare apt and snap", "what is a program",
+]
+
+TEMPLATES = [
+    lambda r: f"install {r.choice(PACKAGES)}",
+    lambda r: f"is {r.choice(PACKAGES)} installed",
+    lambda r: f"apt policy {r.choice(PACKAGES)}",
+    lambda r: "check disk",
+    lambda r: "how much ram is free",
+    lambda r: f"{r.choice(['status', 'start', 'stop', 'restart'])} {r.choice(SERVICES)}",
+    lambda r: f"kill pid {r.randint(200, 60000)}",
+    lambda r: f"kill {r.choice(APPS)}",
+    lambda r: f"top {r.randint(1, 20)}",
+    lambda r: f"open {r.choice(SITES)}",
+    lambda r: f"open {r.choice(APPS)}",
+    lambda r: f"search {r.choice(QUESTIONS)}",
+    lambda r: f"say {r.choice(QUESTIONS)}",
+    lambda r: r.choice(QUESTIONS),
+]
+
+
+def corpus(size: int, seed: int = 0) -> list[str]:
+    r = random.Random(seed)
+    return [r.choice(TEMPLATES)(r) for _ in range(size)]
+
+
+def linear_parse(text: str):
+    t = normalize(text)
+    for rule in RULES:
+        m = None
+        if rule.pattern is not None:
+            m = re.match(rule.pattern.pattern, t, rule.pattern.flags)
+            if not m:
+                continue
+        elif not any(k in t for k in rule.keywords):
+            continue
+        it = rule.build(m, t)
+        if it is not None:
+            return it
+    return None
+
+
+def bench(fn, texts: list[str], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for text in texts:
+            fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--size", type=int, default=5000)
+    ap.add_argument("--rounds", type=int, default=5)
+    args = ap.parse_args()
+
+    texts = corpus(args.size)
+    agent = IntentRecognitionAgent()
+
+    for name, fn in (("dispatch", agent.parse), ("linear", linear_parse)):
+        secs = bench(fn, texts, args.rounds)
+        print(f"{name:9s} {len(texts) / secs:12,.0f} utterances/s  {secs / len(texts) * 1e6:7.2f} us/utterance")
+
+
+if __name__ == "__main__":
+    main()
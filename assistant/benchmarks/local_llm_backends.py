@@ -0,0 +1,138 @@
+# assistant/benchmarks/local_llm_backends.py
+"""
+Parity and speed of the LocalLLM backends (torch float, int8, onnx).
+
+Every backend runs in its own subprocess so resident memory is measured in
+isolation. Outputs on a fixed instruction set are compared against the
+float "torch" backend; the run fails if any backend's exact-match rate is
+below --min-parity, or if any backend (the reference included) did not
+produce results.
+
+    python -m assistant.benchmarks.local_llm_backends [--backends torch int8 onnx]
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from assistant.config.settings import settings
+
+INSTRUCTIONS = [
+    "list all files in the current directory including hidden ones",
+    "show disk usage of the home directory in human readable form",
+    "print the current working directory",
+    "create a directory named projects in the home directory",
+    "show the last 20 lines of the system log",
+    "find all python files under the current directory",
+    "show free and used memory in megabytes",
+    "count the lines in file notes.txt",
+    "show the ip addresses of all network interfaces",
+    "install the package htop",
+    "check whether the ssh service is running",
+    "compress the folder photos into photos.tar.gz",
+    "show the five processes using the most memory",
+    "update the list of available packages",
+    "remove the empty directory tmpdir",
+    "show the kernel version",
+]
+
+
+def rss_kb() -> tuple[int, int]:
+    """(current, peak) resident set size of this process in kB."""
+    cur = peak = 0
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                cur = int(line.split()[1])
+            elif line.startswith("VmHWM:"):
+                peak = int(line.split()[1])
+    return cur, peak
+
+
+def run_worker(backend: str, rounds: int) -> dict:
+    import torch
+    from assistant.agents.local_llm import load_seq2seq
+
+    base_rss, _ = rss_kb()
+    t0 = time.perf_counter()
+    tokenizer, model = load_seq2seq(settings.LOCAL_LLM_PATH, backend)
+    load_s = time.perf_counter() - t0
+
+    outputs, latencies = [], []
+    for r in range(rounds):
+        for text in INSTRUCTIONS:
+            inputs = tokenizer(text, return_tensors="pt", truncation=True).to(model.device)
+            t0 = time.perf_counter()
+            with torch.no_grad():
+                out = model.generate(**inputs, max_new_tokens=128, do_sample=False)
+            latencies.append(time.perf_counter() - t0)
+            if r == 0:
+                outputs.append(tokenizer.decode(out[0], skip_special_tokens=True).strip())
+
+    cur, peak = rss_kb()
+    latencies.sort()
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "rss_mb": (cur - base_rss) / 1024,
+        "peak_rss_mb": peak / 1024,
+        "outputs": outputs,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"])
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--min-parity", type=float, default=0.9)
+    ap.add_argument("--worker", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.rounds)))
+        return
+
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    results, failed = {}, []
+    for backend in backends:
+        p = subprocess.run(
+            [sys.executable, "-m", __spec__.name, "--worker", backend, "--rounds", str(args.rounds)],
+            text=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        try:
+            if p.returncode != 0:
+                raise RuntimeError(p.stderr.strip().splitlines()[-1] if p.stderr.strip() else p.returncode)
+            results[backend] = json.loads(p.stdout.strip().splitlines()[-1])
+        except (RuntimeError, ValueError, IndexError) as e:
+            print(f"{backend:6s} failed: {e}")
+            failed.append(backend)
+
+    # without every backend and the reference there is nothing to vouch for
+    ok = not failed
+    reference = results.get("torch", {}).get("outputs")
+    if not reference:
+        print("no torch reference outputs; parity was not checked")
+        ok = False
+    print(f"{'backend':8s} {'load s':>7s} {'p50 ms':>8s} {'p95 ms':>8s} {'model MB':>9s} {'peak MB':>8s} {'parity':>7s}")
+    for backend, r in results.items():
+        parity = 1.0 if reference else 0.0
+        if reference and backend != "torch":
+            same = sum(a == b for a, b in zip(reference, r["outputs"]))
+            parity = same / len(reference)
+            for text, a, b in zip(INSTRUCTIONS, reference, r["outputs"]):
+                if a != b:
+                    print(f"  [{backend}] {text!r}: {a!r} != {b!r}")
+        ok &= parity >= args.min_parity
+        print(f"{backend:8s} {r['load_s']:7.1f} {r['p50_ms']:8.1f} {r['p95_ms']:8.1f} "
+              f"{r['rss_mb']:9.0f} {r['peak_rss_mb']:8.0f} {parity:7.0%}")
+
+    if failed:
+        print(f"failed: {', '.join(failed)}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
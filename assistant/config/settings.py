@@ -4,7 +4,26 @@ from pathlib import Path
 class Settings(BaseSettings):
     APP_NAME: str = "Debian Voice Assistant"
     WAKE_WORD: str = "leo"          # Say "leo ..." before a command
+    WAKE_TWO_STAGE: bool = True     # wake-word-only recognizer gates the full one
+    WAKE_PREROLL_MS: int = 2000     # audio replayed to the full recognizer when the wake word is heard
+    WAKE_FOLLOWUP_S: float = 4.0    # after a bare wake word, how long to wait for the command
     SAMPLE_RATE: int = 16000
+    CAPTURE_BUFFER_S: float = 10.0  # shared microphone ring buffer; a consumer further behind skips ahead
+    # Voice input latency
+    VOICE_BLOCK_MS: int = 100               # microphone block size (was 500 ms)
+    VOICE_ENDPOINT_MODE: str = "short"      # Vosk endpointer: default, short, long, very_long (vosk >= 0.3.45)
+    VOICE_ENDPOINT_SILENCE_MS: int = 0      # trailing silence that ends an utterance (0 = mode default)
+    VOICE_EARLY_FINALIZE: bool = True       # dispatch as soon as the partial text is a fixed complete command
+    VOICE_EARLY_FINALIZE_MS: int = 150      # ...that has been unchanged this long
+    # Voice activity gate: only speech segments reach the recognizer
+    VAD_ENABLED: bool = True
+    VAD_SNR_DB: float = 10.0        # speech must be this much louder than the noise floor
+    VAD_HANGOVER_MS: int = 400      # silence that ends a segment
+    VAD_PREROLL_MS: int = 300       # audio kept from before the onset
+    # Start parsing/routing on partial ASR text once it has been stable this long
+    SPECULATIVE_ROUTING: bool = True
+    SPECULATIVE_STABLE_MS: int = 300
+    SPECULATIVE_PREFETCH_ROUTE: bool = True   # also prefetch the NLRouter route for unknown intents
     VOSK_MODEL_DIR: str = str(Path(__file__).resolve().parent.parent / "models" / "vosk" / "en-in")
     ENABLE_TTS: bool = True
     # safety: require explicit "yes" confirmation for privileged actions
@@ -12,12 +31,40 @@ class Settings(BaseSettings):
 
     # LLM related settings
     LOCAL_LLM_PATH: str = "assistant/models/leo-finetuned"
+    LOCAL_LLM_WARMUP: bool = False          # True: load the T5 translator in the background at startup
+    LOCAL_LLM_BACKEND: str = "torch"        # "torch", "int8" (dynamic quantization) or "onnx" (ONNX Runtime)
+    LOCAL_LLM_MAX_BATCH: int = 8            # prompts per forward pass
+    LOCAL_LLM_BATCH_WINDOW_MS: int = 5      # how long generate() waits to coalesce concurrent callers
     
     LLM_ENABLED: bool = True               # Set True to enable contacting a local LLM server
     LLM_PROVIDER: str = "ollama"            # "ollama" or "mock"
     OLLAMA_URL: str = "http://127.0.0.1:11434/api/generate" # endpoint used if LLM_ENABLED is True
     LLM_MODEL: str = "llama3.2:3B-instruct-q4_K_M"   # model identifier (provider-specific)
     LLM_TIMEOUT_SECONDS: int = 120
+    OLLAMA_KEEP_ALIVE: str = "30m"          # how long Ollama keeps the model (and its prompt cache) resident
+
+    # NLRouter result cache (in-memory LRU backed by the SQLite memory store)
+    ROUTE_CACHE_ENABLED: bool = True
+    ROUTE_CACHE_SIZE: int = 256
+    ROUTE_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+
+    # Nearest-neighbour index of confirmed task routes (between regex and LLM)
+    INTENT_INDEX_ENABLED: bool = True
+    INTENT_INDEX_THRESHOLD: float = 0.80
+    
+    PLAN_MAX_PARALLEL: int = 4              # independent read-only plan steps run concurrently
+
+    # Raw command execution: output beyond head + tail is counted but not kept
+    RAW_COMMAND_TIMEOUT: int = 30
+    OUTPUT_HEAD_BYTES: int = 4096
+    OUTPUT_TAIL_BYTES: int = 4096
+    SHELL_POOL_SIZE: int = 2                # long-lived bash workers (0 = fork bash -c per command)
+    SHELL_POOL_MAX_USES: int = 200          # commands before a worker is replaced
+
+    APT_UPDATE_MAX_AGE: int = 6 * 3600      # skip apt-get update before installs if the lists are this fresh
+    KILL_GRACE_SECONDS: float = 3.0         # SIGTERM -> SIGKILL delay when killing processes
+    SYSTEMD_INDEX_TTL: int = 300            # full re-list of service units
+    SYSTEMD_STATUS_TTL: int = 10            # status answers younger than this come from the cache
     
     CONVERSATION_MEMORY_SIZE: int = 8
     SUGGESTION_CONFIDENCE_THRESHOLD: float = 0.70
@@ -1,7 +1,7 @@
 # assistant/coordinator.py
-from assistant.agents.response import ResponseAgent
+from assistant.agents.response import ResponseAgent, SpeechQueue
 from assistant.agents.intent_recognition import IntentRecognitionAgent
-from assistant.agents.intent_recognition import Intent
+from assistant.agents.intent_recognition import Intent, normalize
 from assistant.agents.action_execution import ActionExecutionAgent
 from assistant.agents.confirm_agent import ConfirmAgent
 from assistant.agents.gui_agent import GUIAgent
@@ -10,15 +10,40 @@ from assistant.config.settings import settings
 from assistant.utils.logger import get_logger
 from assistant.agents.command_translator import CommandTranslationAgent
 from assistant.agents.observer import ObserverAgent
+from assistant.agents.plan_scheduler import PlanScheduler
 from assistant.memory.task_memory import TaskMemory
+from assistant.memory.intent_index import IntentIndex
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional
+import asyncio
+import contextlib
 import json
+import threading
 import time
 
 log = get_logger(__name__)
 
+# Whole commands that voice input may dispatch before the endpoint silence.
+# Only argument-free intents, and only as complete phrases: keyword rules look
+# at the whole text, so a prefix that parses ("check disk", before
+# "cleanup") is not enough.
+EARLY_FINAL_COMMANDS = frozenset({
+    "check memory", "check ram", "memory usage", "ram usage",
+    "disk cleanup", "storage cleanup",
+})
+
 class Coordinator:
+    """
+    Runs each turn as a coroutine on a private asyncio loop.
+
+    Speech goes through an ordered SpeechQueue, and blocking work (LLM
+    requests, command execution, confirmation listening) runs in worker
+    threads. A command can therefore start while the previous line is still
+    being spoken, without changing the order in which things are said.
+    handle_text() and resume_task() remain synchronous entry points.
+    """
+
     def __init__(self):
         self.resp = ResponseAgent()
         self.intent = IntentRecognitionAgent()
@@ -30,10 +55,45 @@ class Coordinator:
         self.observer = ObserverAgent()
         self._retried_commands = set()
         self.task_memory = TaskMemory()
+        self.intent_index = None
+        if settings.INTENT_INDEX_ENABLED:
+            self.intent_index = IntentIndex()
+            if not len(self.intent_index):
+                self.intent_index.rebuild_from_memory()
+        self._speculation = None
+        self._spec_lock = threading.Lock()
+        self._spec_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speculate")
+
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="coordinator-loop", daemon=True).start()
+        self.speech = SpeechQueue(self.resp)
+        self._turn_lock = asyncio.Lock()
 
+    # ----- event loop plumbing -----
+    def _run(self, coro):
+        """Run a coroutine on the coordinator loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def _say(self, text):
+        # Non-blocking: queued behind whatever is already being spoken
+        self.speech.say(text)
+
+    async def _in_thread(self, fn, *args, **kwargs):
+        return await asyncio.to_thread(fn, *args, **kwargs)
 
 
     def handle_text(self, text: str):
+        return self._run(self.handle_text_async(text))
+
+    async def handle_text_async(self, text: str):
+        # One turn at a time, so speech and confirmations never interleave
+        async with self._turn_lock:
+            try:
+                await self._handle_text(text)
+            finally:
+                await self.speech.drain()
+
+    async def _handle_text(self, text: str):
         text = text.strip()
         log.info("[Heard] %s", text)
         # wake word gating
@@ -41,106 +101,143 @@ class Coordinator:
             return  # ignore non-wake phrases
         command = text[len(settings.WAKE_WORD)+1:].strip()
         if not command:
-            self.resp.say("Yes?")
+            self._say("Yes?")
             return
-        it = self.intent.parse(command)
+        spec = self._take_speculation(command)
+        it = spec["intent"] if spec else self.intent.parse(command)
 
         if it is None or it.name == "unknown":
-            log.info("[Coordinator] Unknown intent — routing to NLRouter")
-            self._handle_unknown_with_llm(text)
+            route = spec["route"] if spec else None
+            if isinstance(route, Future):
+                route = await asyncio.wrap_future(route)
+                if route.get("type") == "chat":
+                    # the speculative request did not cache it; the final text is the same
+                    await self._in_thread(self.nlrouter.remember, text, route)
+            elif route is None and self.intent_index is not None:
+                route = await self._in_thread(self.intent_index.lookup, command)
+            if spec and route is not None:
+                log.info("[Coordinator] Unknown intent — using speculative route")
+            elif route is not None:
+                log.info("[Coordinator] Unknown intent — matched a confirmed task")
+            else:
+                log.info("[Coordinator] Unknown intent — routing to NLRouter")
+            await self._handle_unknown_with_llm(text, route)
             return
         '''
         if not it:
             self.resp.say("I didn't understand that command yet.")
             return
         '''
-        result = self.exec.run(it)
+        result = await self._in_thread(self.exec.run, it)
         # Trim overly long outputs for TTS
         if isinstance(result, str) and len(result) > 500:
             # speak short confirmation and print details to console
-            self.resp.say("Done. Output is long; see console for details.")
+            self._say("Done. Output is long; see console for details.")
             print(result)
         else:
-            self.resp.say(result if isinstance(result, str) else str(result))
+            self._say(result if isinstance(result, str) else str(result))
     
+    # ----- Speculative routing on partial ASR text -----
+    def speculate(self, partial: str):
+        """
+        Called with a stable partial hypothesis while the user is still
+        speaking. Parses it and, for unknown intents, prefetches the route in
+        the background. Nothing is executed here: handle_text() commits the
+        result only if the final text is the same command, otherwise it is
+        discarded.
+        """
+        text = partial.strip()
+        if not text.lower().startswith(settings.WAKE_WORD + " "):
+            return
+        command = text[len(settings.WAKE_WORD)+1:].strip()
+        if not command:
+            return
+        key = " ".join(normalize(command).split())
+        with self._spec_lock:
+            # same command: keep the result (or the route request still in flight)
+            if self._speculation and self._speculation["key"] == key:
+                return
+
+        it = self.intent.parse(command)
+        route = None
+        if it.name == "unknown":
+            if self.intent_index is not None:
+                route = self.intent_index.lookup(command)
+            if route is None and settings.SPECULATIVE_PREFETCH_ROUTE:
+                route = self._spec_pool.submit(self.nlrouter.route, text, store=False)
+        log.info("[Coordinator] Speculating on partial: %s (%s)", command, it.name)
+
+        with self._spec_lock:
+            previous, self._speculation = self._speculation, {"key": key, "intent": it, "route": route}
+        self._drop_speculation(previous)
+
+    @staticmethod
+    def _drop_speculation(spec: Optional[dict]):
+        # a superseded route request that has not started yet never reaches the LLM
+        if spec is not None and isinstance(spec["route"], Future):
+            spec["route"].cancel()
+
+    def is_complete_command(self, text: str) -> bool:
+        """
+        True when "<wake word> <command>" is one of EARLY_FINAL_COMMANDS, so
+        further words could not change what runs. Used by voice input to
+        finalize early.
+        """
+        words = normalize(text).split()
+        if not words or words[0] != settings.WAKE_WORD.lower():
+            return False
+        return " ".join(words[1:]) in EARLY_FINAL_COMMANDS
+
+    def _take_speculation(self, command: str) -> Optional[dict]:
+        with self._spec_lock:
+            spec, self._speculation = self._speculation, None
+        if spec is None:
+            return None
+        if spec["key"] != " ".join(normalize(command).split()):
+            log.info("[Coordinator] Final text differs from partial, discarding speculation")
+            self._drop_speculation(spec)
+            return None
+        return spec
+
     # ----- NLRouter handling (NEW) -----
-    def _handle_unknown_with_llm(self, text: str):
-        route = self.nlrouter.route(text)
+    async def _handle_unknown_with_llm(self, text: str, route: Optional[dict] = None):
+        if route is None:
+            route = await self._in_thread(self.nlrouter.route, text)
 
         rtype = route.get("type")
 
         if rtype == "chat" or rtype == "conversation":
-            self.resp.say(route.get("response", ""))
+            self._say(route.get("response", ""))
 
         elif rtype == "task" or rtype == "Task":
             goal = route.get("commands")
             
             if goal is None:
-                self.resp.say(f"I don't understand that.")
+                self._say(f"I don't understand that.")
                 return
-            self.resp.say(f"I understand. You want to {goal}.")
-            confirmed = self._confirm_voice(f"Should I proceed to {goal}?")
+            self._say(f"I understand. You want to {goal}.")
+            confirmed = await self._confirm_voice_async(f"Should I proceed to {goal}?")
             if not confirmed:
-                self.resp.say("Okay, cancelled.")
+                self._say("Okay, cancelled.")
                 return
-            self.task_memory.start_task(goal=str(goal))
-            
-            for cmd in goal:
-                log.info("[Coordinator] executing %s", cmd)
-                output = self.exec.run_raw_command(cmd) or ""
-
-                observation = self.observer.observe(cmd, output)
-
-                if observation["status"] == "failure":
-
-                    # If we've already retried this command once → stop
-                    if cmd in self._retried_commands:
-                        self.resp.say("That command failed again. Stopping to avoid harm.")
-                        return
-                    self.resp.say("Something went wrong. Let me try to fix it.")
-
-                    replanned = self._replan(cmd, observation["output"])
-                    if not replanned:
-                        self.resp.say("I couldn't safely recover. Stopping.")
-                        return
-
-                    for new_cmd in replanned:
-                        log.info("[Coordinator] recovery executing %s", new_cmd)
-                        out = self.exec.run_raw_command(new_cmd)
-                        if out:
-                            self.resp.say(out)
-
-                    # Mark this command as retried
-                    self._retried_commands.add(cmd)
-
-                    self.resp.say("Trying again now.")
-
-                    # 🔁 RETRY the original command
-                    retry_output = self.exec.run_raw_command(cmd) or ""
-                    retry_obs = self.observer.observe(cmd, retry_output)
-
-                    if retry_obs["status"] == "failure":
-                        self.resp.say("It still failed after recovery. Stopping.")
-                        self.task_memory.update(
-                            goal=str(goal),
-                            last_step=f"Failed: {cmd}"
-                        )
-
-                        return
-
-                    # Success after retry
-                    if retry_output:
-                        self.resp.say(retry_output)
-                        output = ""
-                else:
-                    self.task_memory.update(str(goal), f"Executed: {cmd}")
-
-                if output:
-                    self.resp.say(output)
+            await self._in_thread(self.task_memory.start_task, goal=str(goal))
             
-            self.task_memory.complete(str(goal))
+            scheduler = PlanScheduler(self._say, max_parallel=settings.PLAN_MAX_PARALLEL)
 
-            self.resp.say("Done.")
+            async def run_step(i, cmd, emit):
+                return await self._run_plan_step(goal, cmd, emit, scheduler.exclusive)
+
+            if not await scheduler.run(goal, run_step, depends_on=route.get("depends_on")):
+                # a failed plan must not be replayed from the route cache
+                await self._in_thread(self.nlrouter.forget, text)
+                return
+
+            await self._in_thread(self.task_memory.complete, str(goal))
+            await self._in_thread(self.nlrouter.remember, text, route)
+            if self.intent_index is not None:
+                await self._in_thread(self.intent_index.add, text, route)
+
+            self._say("Done.")
             """
             goal = route.get("instruction")
             if goal is None:
@@ -176,18 +273,89 @@ class Coordinator:
 
         else:
             log.warning("[Coordinator] Unknown router output: %s", route)
-            self.resp.say("I'm not sure how to handle that yet.")
+            self._say("I'm not sure how to handle that yet.")
+
+    async def _run_plan_step(self, goal: list, cmd: str, emit, exclusive=None) -> bool:
+        """
+        Execute one plan step with observe -> replan -> retry. Messages go
+        through emit() so the scheduler can report them in plan order.
+        Recovery commands may write, so they run inside exclusive() (the
+        scheduler's barrier) rather than next to other steps.
+        Returns False when the whole plan should stop.
+        """
+        log.info("[Coordinator] executing %s", cmd)
+        output = await self._in_thread(self.exec.run_raw_command, cmd, self.observer.watch) or ""
+
+        observation = self.observer.observe(cmd, output)
+
+        if observation["status"] == "failure":
+
+            # If we've already retried this command once → stop
+            if cmd in self._retried_commands:
+                emit("That command failed again. Stopping to avoid harm.")
+                return False
+            emit("Something went wrong. Let me try to fix it.")
+
+            replanned = await self._replan(cmd, observation["output"], say=emit)
+            if not replanned:
+                emit("I couldn't safely recover. Stopping.")
+                return False
+
+            async with (exclusive or contextlib.nullcontext)():
+                for new_cmd in replanned:
+                    log.info("[Coordinator] recovery executing %s", new_cmd)
+                    out = await self._in_thread(self.exec.run_raw_command, new_cmd, self.observer.watch)
+                    if out:
+                        emit(out)
+
+            # Mark this command as retried
+            self._retried_commands.add(cmd)
+
+            emit("Trying again now.")
+
+            # 🔁 RETRY the original command
+            retry_output = await self._in_thread(self.exec.run_raw_command, cmd, self.observer.watch) or ""
+            retry_obs = self.observer.observe(cmd, retry_output)
+
+            if retry_obs["status"] == "failure":
+                emit("It still failed after recovery. Stopping.")
+                await self._in_thread(
+                    self.task_memory.update,
+                    goal=str(goal),
+                    last_step=f"Failed: {cmd}"
+                )
+
+                return False
+
+            # Success after retry
+            if retry_output:
+                emit(retry_output)
+                output = ""
+        else:
+            await self._in_thread(self.task_memory.update, str(goal), f"Executed: {cmd}")
+
+        if output:
+            emit(output)
+        return True
+
     def resume_task(self, task: dict):
         """
         Resume an interrupted multi-step task.
         """
-        log.info("[Coordinator] Resuming task: %s", task)
-        last_step = task.get("last_step")
-        if not last_step:
-            self.resp.say("I don't know where to resume from.")
-            return
-        self.resp.say("Resuming where I left off.")
-        self.nlrouter.resume_from(last_step)
+        return self._run(self._resume_task(task))
+
+    async def _resume_task(self, task: dict):
+        async with self._turn_lock:
+            try:
+                log.info("[Coordinator] Resuming task: %s", task)
+                last_step = task.get("last_step")
+                if not last_step:
+                    self._say("I don't know where to resume from.")
+                    return
+                self._say("Resuming where I left off.")
+                await self._in_thread(self.nlrouter.resume_from, last_step)
+            finally:
+                await self.speech.drain()
 
     def _summarize_proposed_intent(self, intent: Intent, meta: dict) -> str:
         """
@@ -224,22 +392,29 @@ class Coordinator:
 
 
     def _confirm_voice(self, question: str) -> bool:
-        # Speak the question and then listen for yes/no using ConfirmAgent
-        self.resp.say(question)
-        val = self.confirm.ask_confirm(question, timeout=6.0)
+        # Synchronous form for agents running in worker threads (never call it on the loop)
+        return self._run(self._confirm_voice_async(question))
+
+    async def _confirm_voice_async(self, question: str) -> bool:
+        # Speak the question and then listen for yes/no using ConfirmAgent.
+        # Wait for queued speech first so the microphone doesn't hear us.
+        self._say(question)
+        await self.speech.drain()
+        val = await self._in_thread(self.confirm.ask_confirm, question, timeout=6.0)
         log.info("[Confirm result] %s", val)
         if val is None:
             # fallback to keyboard + console
-            self.resp.say("I didn't hear a clear response. Please type yes or no.")
+            self._say("I didn't hear a clear response. Please type yes or no.")
+            await self.speech.drain()
             try:
                 print("[Type yes/no then Enter] ", end="", flush=True)
-                ans = input().strip().lower()
+                ans = (await self._in_thread(input)).strip().lower()
                 return ans in {"y", "yes"}
             except Exception:
                 return False
         return val
 
-    def _replan(self, failed_cmd: str, error_output: str) -> Optional[list]:
+    async def _replan(self, failed_cmd: str, error_output: str, say=None) -> Optional[list]:
             prompt = f"""
         The following shell command failed:
 
@@ -250,13 +425,13 @@ class Coordinator:
         {error_output}
         """
 
-            route = self.nlrouter.route(prompt)
+            route = await self._in_thread(self.nlrouter.route, prompt, use_cache=False)
             print(route)
             rtype = route.get("type")
 
             if rtype == "chat" or rtype == "conversation":
                 log.warning("[Replan aborted] %s", route.get("response"))
-                self.resp.say(route.get("response", ""))
+                (say or self._say)(route.get("response", ""))
                 return None
 
             if rtype == "task":
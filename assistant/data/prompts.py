@@ -61,5 +61,20 @@ INSTRUCTIONS:
   the schema above.
 """
 
+# User turn for chat requests, where PROMPT_SYSTEM is sent as the system message
+PROMPT_CHAT_TEMPLATE = """
+CONTEXT:
+{context}
+
+USER:
+{user_input}
+
+INSTRUCTIONS:
+- If you can answer directly, answer naturally and helpfully. Provide a short summary (<40 words)
+  and a longer explanation in plain text.
+- If you think a system command should be proposed, output JSON ONLY (no extra commentary) matching
+  the schema in the system message.
+"""
+
 # Minimal post-processing labels
 LABEL_PROPOSED_JSON = "PROPOSED_JSON"
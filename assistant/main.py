@@ -3,6 +3,7 @@ import threading
 import sys
 from assistant.coordinator import Coordinator
 from assistant.agents.voice_input import VoiceInputAgent
+from assistant.config.settings import settings
 
 from assistant.memory.conversation_memory import ConversationMemory
 from assistant.memory.task_memory import TaskMemory
@@ -94,7 +95,11 @@ def main():
 
     # Continuous voice mode
     v = VoiceInputAgent()
-    v.listen(handle_text_with_memory)
+    v.listen(
+        handle_text_with_memory,
+        on_partial_text=c.speculate if settings.SPECULATIVE_ROUTING else None,
+        is_complete=c.is_complete_command if settings.VOICE_EARLY_FINALIZE else None,
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,268 @@
+# assistant/memory/intent_index.py
+
+import ast
+import io
+import json
+import os
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from assistant.agents.intent_recognition import normalize
+from assistant.config.settings import settings
+from assistant.memory.memory_store import MemoryStore
+from assistant.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+_QUOTED = re.compile(r"[\"'“‘]([^\"'”’]+)[\"'”’]")
+_ARG_CHARS = re.compile(r"[\d/~._@:]")
+_CMD_TOKEN = re.compile(r"[\w.\-/~@:]+")
+
+
+def _argument_words(text: str) -> set[str]:
+    """Words that look like arguments: numbers, paths, file names, quoted words."""
+    words = {w for w in normalize(text).split() if _ARG_CHARS.search(w)}
+    for quoted in _QUOTED.findall(text):
+        words.update(normalize(quoted).split())
+    return words
+
+
+def _command_words(route: dict) -> set[str]:
+    cmds = route.get("commands") or []
+    if isinstance(cmds, str):
+        cmds = [cmds]
+    if isinstance(route.get("command"), str):
+        cmds = [*cmds, route["command"]]
+    return {w for c in cmds if isinstance(c, str) for w in _CMD_TOKEN.findall(c.lower())}
+
+
+class IntentIndex:
+    """
+    Nearest-neighbour lookup of utterances the user already confirmed as tasks.
+
+    Utterances are embedded as signed hashed word + character-trigram vectors,
+    so no model has to be loaded. The labelled matrix is stored on disk as a
+    float16 .npy (memory-mapped on load) next to a JSON file of routes; new
+    rows are appended to the .npy in place.
+
+    A near match only reuses a route when the arguments agree: argument-like
+    words of the new utterance (numbers, paths, file names, quoted words) must
+    occur in the stored one, and words of the stored utterance that ended up
+    in its commands must occur in the new one. "mkdir projects" is not
+    replayed for "create a folder called project".
+    """
+
+    DIM = 1024
+
+    def __init__(self, path: str | None = None, threshold: float | None = None):
+        base = Path(path or Path(settings.LEO_HOME) / "intent_index")
+        self.matrix_path = base.with_suffix(".npy")
+        self.labels_path = base.with_suffix(".json")
+        self.threshold = threshold or settings.INTENT_INDEX_THRESHOLD
+        self._lock = threading.Lock()
+        self._matrix = np.zeros((0, self.DIM), dtype=np.float16)
+        self._pending: list[np.ndarray] = []
+        self._labels: list[dict] = []
+        self._rows: dict[str, int] = {}
+        self._on_disk = False       # the .npy holds exactly self._matrix, so rows can be appended
+        self._load()
+
+    @staticmethod
+    def key(text: str) -> str:
+        words = normalize(text).split()
+        if words and words[0] == settings.WAKE_WORD:
+            words = words[1:]
+        return " ".join(words)
+
+    def embed(self, text: str) -> np.ndarray:
+        key = self.key(text)
+        feats = key.split()
+        padded = f" {key} "
+        feats += [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+        hashes = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in feats), dtype=np.uint32, count=len(feats))
+        idx = (hashes % self.DIM).astype(np.intp)
+        signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+        vec = np.bincount(idx, weights=signs, minlength=self.DIM).astype(np.float32)
+
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    # ----- queries -----
+    def search_label(self, text: str) -> tuple[float, Optional[dict]]:
+        q = self.embed(text)
+        with self._lock:
+            if not self._labels:
+                return 0.0, None
+            scores = self._matrix @ q
+            if self._pending:
+                scores = np.concatenate([scores, np.stack(self._pending) @ q])
+            best = int(np.argmax(scores))
+            return float(scores[best]), self._labels[best]
+
+    def search(self, text: str) -> tuple[float, Optional[dict]]:
+        score, label = self.search_label(text)
+        return score, label["route"] if label else None
+
+    @staticmethod
+    def arguments_agree(text: str, label: dict) -> bool:
+        words = set(IntentIndex.key(text).split())
+        stored = set(label["text"].split())
+        if not _argument_words(text) <= stored:
+            return False
+        required = _argument_words(label["text"]) | (stored & _command_words(label["route"]))
+        return required <= words
+
+    def lookup(self, text: str) -> Optional[dict]:
+        """
+        Return the stored route for the same utterance, or for the closest
+        example if it clears the threshold and its arguments agree.
+        """
+        key = self.key(text)
+        with self._lock:
+            row = self._rows.get(key)
+            if row is not None:
+                return dict(self._labels[row]["route"])
+        score, label = self.search_label(text)
+        if label is None or score < self.threshold:
+            return None
+        if not self.arguments_agree(text, label):
+            log.info("[IntentIndex] %r is close to %r (score %.2f) but the arguments differ",
+                     text, label["text"], score)
+            return None
+        log.info("[IntentIndex] Matched %r (score %.2f)", text, score)
+        return dict(label["route"])
+
+    # ----- updates -----
+    def add(self, text: str, route: dict, save: bool = True):
+        key = self.key(text)
+        if not key:
+            return
+        with self._lock:
+            row = self._rows.get(key)
+            if row is not None:
+                # Same utterance: only the label changes
+                self._labels[row]["route"] = route
+            else:
+                self._rows[key] = len(self._labels)
+                self._labels.append({"text": key, "route": route})
+                self._pending.append(self.embed(key))
+        if save:
+            self.save()
+
+    def rebuild_from_memory(self, store: MemoryStore | None = None):
+        """
+        Rebuild from completed tasks, pairing each with the last user utterance
+        recorded before it started.
+        """
+        store = store or MemoryStore()
+        tasks = store.fetchall(
+            "SELECT goal, timestamp FROM tasks WHERE status = 'completed' ORDER BY id"
+        )
+        with self._lock:
+            self._matrix = np.zeros((0, self.DIM), dtype=np.float16)
+            self._pending, self._labels, self._rows = [], [], {}
+            self._on_disk = False
+
+        for task in tasks:
+            try:
+                commands = ast.literal_eval(task["goal"])
+            except (ValueError, SyntaxError):
+                continue
+            if not isinstance(commands, list):
+                continue
+            rows = store.fetchall(
+                "SELECT message FROM conversations WHERE role = 'user' AND timestamp <= ? "
+                "ORDER BY id DESC LIMIT 1",
+                (task["timestamp"],)
+            )
+            if rows:
+                self.add(rows[0]["message"], {"type": "task", "commands": commands}, save=False)
+
+        self.save()
+        log.info("[IntentIndex] Rebuilt with %d examples", len(self._labels))
+
+    # ----- persistence -----
+    def save(self):
+        """Append pending rows to the .npy (rewriting it only when it is stale) and write the labels."""
+        with self._lock:
+            rows = np.stack(self._pending).astype(np.float16) if self._pending else None
+            self._pending = []
+            self.matrix_path.parent.mkdir(parents=True, exist_ok=True)
+            if not (self._on_disk and self._append_rows(rows)):
+                matrix = np.asarray(self._matrix)
+                if rows is not None:
+                    matrix = np.concatenate([matrix, rows])
+                tmp = self.matrix_path.with_name(self.matrix_path.name + ".tmp")
+                with open(tmp, "wb") as f:
+                    np.save(f, matrix)
+                os.replace(tmp, self.matrix_path)
+
+            tmp = self.labels_path.with_name(self.labels_path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._labels, f, ensure_ascii=False)
+            os.replace(tmp, self.labels_path)
+
+            self._matrix = np.load(self.matrix_path, mmap_mode="r")
+            self._on_disk = True
+
+    def _append_rows(self, rows: Optional[np.ndarray]) -> bool:
+        """
+        Write rows after the existing data and bump the row count in the
+        header. False if the file can't be extended in place.
+        """
+        if rows is None:
+            return True
+        fmt = np.lib.format
+        try:
+            with open(self.matrix_path, "r+b") as f:
+                if fmt.read_magic(f) != (1, 0):
+                    return False
+                shape, fortran, dtype = fmt.read_array_header_1_0(f)
+                data_start = f.tell()
+                if fortran or dtype != np.float16 or shape != (len(self._matrix), self.DIM):
+                    return False
+                header = io.BytesIO()
+                fmt.write_array_header_1_0(header, {
+                    "descr": fmt.dtype_to_descr(dtype), "fortran_order": False,
+                    "shape": (shape[0] + len(rows), self.DIM),
+                })
+                if header.tell() != data_start:
+                    return False
+                # data first: a crash before the header update leaves a valid, shorter file
+                f.seek(data_start + shape[0] * self.DIM * dtype.itemsize)
+                f.truncate()
+                f.write(np.ascontiguousarray(rows, dtype=np.float16).tobytes())
+                f.flush()
+                f.seek(0)
+                f.write(header.getvalue())
+        except (OSError, ValueError) as e:
+            log.warning("[IntentIndex] Could not append to %s: %s", self.matrix_path, e)
+            return False
+        return True
+
+    def _load(self):
+        if not (self.matrix_path.exists() and self.labels_path.exists()):
+            return
+        try:
+            matrix = np.load(self.matrix_path, mmap_mode="r")
+            with open(self.labels_path, "r", encoding="utf-8") as f:
+                labels = json.load(f)
+        except Exception as e:
+            log.warning("[IntentIndex] Could not load index: %s", e)
+            return
+        if matrix.shape != (len(labels), self.DIM):
+            log.warning("[IntentIndex] Index files disagree, ignoring them")
+            return
+        self._matrix = matrix
+        self._labels = labels
+        self._rows = {e["text"]: i for i, e in enumerate(labels)}
+        self._on_disk = True
+
+    def __len__(self):
+        return len(self._labels)
@@ -41,6 +41,16 @@ class MemoryStore:
         )
         """)
 
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS route_cache (
+            utterance TEXT,
+            model TEXT,
+            route TEXT,
+            created REAL,
+            PRIMARY KEY (utterance, model)
+        )
+        """)
+
         self.conn.commit()
 
     def execute(self, query, params=()):
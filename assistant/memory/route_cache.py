@@ -0,0 +1,113 @@
+# assistant/memory/route_cache.py
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from assistant.agents.intent_recognition import normalize
+from assistant.config.settings import settings
+from assistant.memory.memory_store import MemoryStore
+
+
+class RouteCache:
+    """
+    Cache of NLRouter.route() results keyed on the normalized utterance.
+
+    Lookups hit an in-memory LRU first and fall back to the route_cache table,
+    so answers survive restarts. Entries expire after ROUTE_CACHE_TTL_SECONDS
+    and are dropped wholesale when settings.LLM_MODEL changes.
+    """
+
+    def __init__(self, size: int | None = None, ttl: int | None = None):
+        self.size = size or settings.ROUTE_CACHE_SIZE
+        self.ttl = ttl or settings.ROUTE_CACHE_TTL_SECONDS
+        self.store = MemoryStore()
+        self._lru: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._model = None
+        self.hits = 0
+        self.misses = 0
+        self._check_model()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return " ".join(normalize(text).split())
+
+    def _check_model(self):
+        model = settings.LLM_MODEL
+        if model == self._model:
+            return
+        self._lru.clear()
+        self.store.execute("DELETE FROM route_cache WHERE model != ?", (model,))
+        self._model = model
+
+    def get(self, text: str) -> Optional[dict]:
+        key = self.key(text)
+        now = time.time()
+        with self._lock:
+            self._check_model()
+
+            entry = self._lru.get(key)
+            if entry is None:
+                rows = self.store.fetchall(
+                    "SELECT route, created FROM route_cache WHERE utterance = ? AND model = ?",
+                    (key, self._model)
+                )
+                if rows:
+                    entry = (rows[0]["created"], json.loads(rows[0]["route"]))
+                    self._remember(key, entry)
+
+            if entry is None or now - entry[0] > self.ttl:
+                if entry is not None:
+                    self._forget(key)
+                self.misses += 1
+                return None
+
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, text: str, route: dict):
+        key = self.key(text)
+        entry = (time.time(), route)
+        with self._lock:
+            self._check_model()
+            self._remember(key, entry)
+            self.store.execute(
+                "INSERT OR REPLACE INTO route_cache (utterance, model, route, created) VALUES (?, ?, ?, ?)",
+                (key, self._model, json.dumps(route), entry[0])
+            )
+
+    def discard(self, text: str):
+        with self._lock:
+            self._forget(self.key(text))
+
+    def _remember(self, key: str, entry: tuple[float, dict]):
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.size:
+            self._lru.popitem(last=False)
+
+    def _forget(self, key: str):
+        self._lru.pop(key, None)
+        self.store.execute(
+            "DELETE FROM route_cache WHERE utterance = ? AND model = ?",
+            (key, self._model)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._lru.clear()
+            self.store.execute("DELETE FROM route_cache")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._lru),
+            "model": self._model,
+        }
@@ -0,0 +1,66 @@
+# assistant/tests/test_apt_index.py
+import os
+
+from assistant.utils.apt_index import AptCandidateIndex, parse_apt_cache_policy
+from assistant.utils.dpkg_status import compare_versions, native_architecture
+
+MAIN = "deb.debian.org_debian_dists_stable"
+BACKPORTS = "deb.debian.org_debian_dists_stable-backports"
+
+
+def write_lists(root, arch):
+    (root / f"{MAIN}_InRelease").write_text("Origin: Debian\nSuite: stable\n")
+    (root / f"{BACKPORTS}_InRelease").write_text(
+        "Origin: Debian Backports\nSuite: stable-backports\nNotAutomatic: yes\nButAutomaticUpgrades: yes\n")
+    (root / f"{MAIN}_main_binary-{arch}_Packages").write_text(
+        f"Package: htop\nVersion: 3.2.2-2\nArchitecture: {arch}\n\n"
+        f"Package: hyperfine\nVersion: 1.15.0-2\nArchitecture: {arch}\n\n"
+        "Package: python3-pip\nVersion: 23.0.1+dfsg-1\nArchitecture: all\n"
+    )
+    (root / f"{BACKPORTS}_main_binary-{arch}_Packages").write_text(
+        f"Package: htop\nVersion: 3.3.0-4~bpo12+1\nArchitecture: {arch}\n"
+    )
+
+
+def test_compare_versions():
+    assert compare_versions("1.0~rc1", "1.0") < 0
+    assert compare_versions("1:0.9", "2.0") > 0
+    assert compare_versions("1.0-1+b1", "1.0-1") > 0
+    assert compare_versions("1.00", "1.0") == 0
+
+
+def test_candidates_prefix_and_fuzzy(tmp_path):
+    lists = tmp_path / "lists"
+    lists.mkdir()
+    write_lists(lists, native_architecture() or "amd64")
+    cache = tmp_path / "apt.marshal"
+    index = AptCandidateIndex(str(lists), str(cache), preferences=[])
+
+    pol = index.policy("htop")
+    # backports (priority 100) lose to stable (500) despite the newer version
+    assert pol.candidate == "3.2.2-2"
+    assert [v.version for v in pol.versions] == ["3.3.0-4~bpo12+1", "3.2.2-2"]
+    assert index.candidates(["python3-pip", "no-such-pkg"]) == {"python3-pip": "23.0.1+dfsg-1", "no-such-pkg": None}
+    assert index.search_prefix("h") == ["htop", "hyperfine"]
+    assert index.suggest("htopp") == ["htop"]
+    assert index.builds == 1
+
+    # a fresh process reuses the serialized index while the lists are unchanged
+    again = AptCandidateIndex(str(lists), str(cache), preferences=[])
+    assert again.exists("hyperfine")
+    assert again.builds == 0
+
+
+def test_parse_apt_cache_policy():
+    text = """vim:
+  Installed: (none)
+  Candidate: 2:9.0.1378-2
+  Version table:
+     2:9.0.1378-2 500
+        500 http://deb.debian.org/debian bookworm/main amd64 Packages
+"""
+    pol = parse_apt_cache_policy(text)["vim"]
+    assert pol.installed is None
+    assert pol.candidate == "2:9.0.1378-2"
+    assert pol.versions[0].priority == 500
+    assert pol.versions[0].origins == ["http://deb.debian.org/debian bookworm/main amd64 Packages"]
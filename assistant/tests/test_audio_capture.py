@@ -0,0 +1,49 @@
+# assistant/tests/test_audio_capture.py
+import threading
+
+import numpy as np
+
+from assistant.utils.audio_capture import AudioCapture
+
+
+def test_taps_read_independently_across_wraparound():
+    cap = AudioCapture(samplerate=1000, blocksize=100, buffer_s=0.5, open_device=False)
+    a = cap.attach("a")
+    cap.write(np.arange(300, dtype=np.int16))
+    b = cap.attach("b")
+    assert a.read(max_samples=250).tolist() == list(range(250))
+    cap.write(np.arange(300, 600, dtype=np.int16))      # wraps the 500-sample ring
+    assert a.read().tolist() == list(range(250, 600))
+    assert b.read().tolist() == list(range(300, 600))
+    assert cap.taps == ["a", "b"]
+    a.detach()
+    assert cap.taps == ["b"]
+
+
+def test_slow_tap_skips_ahead_and_preroll():
+    cap = AudioCapture(samplerate=1000, blocksize=100, buffer_s=0.5, open_device=False)
+    slow = cap.attach("slow")
+    cap.write(np.arange(800, dtype=np.int16))
+    assert slow.read()[0] == 300 and slow.overruns == 1
+    late = cap.attach("late", preroll_s=0.2)
+    assert late.read().tolist() == list(range(600, 800))
+    late.rewind(50)
+    assert late.read().tolist() == list(range(750, 800))
+
+
+def test_read_waits_for_min_samples_and_detach_wakes_reader():
+    cap = AudioCapture(samplerate=1000, blocksize=100, open_device=False)
+    tap = cap.attach("t")
+    cap.write(np.zeros(50, dtype=np.int16))
+    assert tap.read(min_samples=100, timeout=0.05) is None
+    result = []
+    reader = threading.Thread(target=lambda: result.append(tap.read(min_samples=100)))
+    reader.start()
+    cap.write(np.ones(60, dtype=np.int16))
+    reader.join(1)
+    assert len(result[0]) == 110
+    reader = threading.Thread(target=lambda: result.append(tap.read(min_samples=100)))
+    reader.start()
+    tap.detach()
+    reader.join(1)
+    assert not reader.is_alive() and result[1] is None
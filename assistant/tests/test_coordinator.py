@@ -0,0 +1,208 @@
+# assistant/tests/test_coordinator.py
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from assistant.agents.intent_recognition import IntentRecognitionAgent
+from assistant.config.settings import settings
+from assistant.coordinator import EARLY_FINAL_COMMANDS, Coordinator
+
+
+class SlowRouter:
+    """NLRouter stand-in whose route() blocks until released."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+
+    def route(self, text, store=True):
+        assert not store    # speculative calls must not fill the route cache
+        self.calls.append(text)
+        self.release.wait(2)
+        return {"type": "answer", "text": text}
+
+
+def _bare_coordinator(router=None):
+    # only the parts speculation touches; the full constructor opens audio and LLM clients
+    c = Coordinator.__new__(Coordinator)
+    c.intent = IntentRecognitionAgent()
+    c.intent_index = None
+    c.nlrouter = router or SlowRouter()
+    c._speculation = None
+    c._spec_lock = threading.Lock()
+    c._spec_pool = ThreadPoolExecutor(max_workers=1)
+    return c
+
+
+def test_speculation_is_reused_for_the_same_command(monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_PREFETCH_ROUTE", True)
+    c = _bare_coordinator()
+    c.speculate("leo tell me a joke about cats")
+    first = c._speculation["route"]
+    c.speculate("leo tell me a joke about cats")
+    assert c._speculation["route"] is first
+    c.nlrouter.release.set()
+    spec = c._take_speculation("Tell me a joke about cats")
+    assert spec is not None and spec["route"].result(timeout=2)["text"] == "leo tell me a joke about cats"
+    assert len(c.nlrouter.calls) == 1
+
+
+def test_superseded_and_mismatched_speculations_are_cancelled(monkeypatch):
+    monkeypatch.setattr(settings, "SPECULATIVE_PREFETCH_ROUTE", True)
+    c = _bare_coordinator()
+    c.speculate("leo tell me a joke")               # occupies the single worker
+    c.speculate("leo tell me a joke about")         # queued behind it
+    queued = c._speculation["route"]
+    c.speculate("leo tell me a joke about cats")    # supersedes the queued request
+    assert queued.cancelled()
+    latest = c._speculation["route"]
+    assert isinstance(latest, Future)
+    assert c._take_speculation("tell me a joke about dogs") is None
+    assert latest.cancelled()
+    c.nlrouter.release.set()
+    c._spec_pool.shutdown(wait=True)
+    assert c.nlrouter.calls == ["leo tell me a joke"]
+    assert c._speculation is None
+
+
+class RecordingVoice:
+    """ResponseAgent stand-in: speaking takes a little time, lines are recorded."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.spoken = []
+
+    def say(self, text):
+        import time
+        time.sleep(self.delay)
+        self.spoken.append(text)
+
+
+def _looped_coordinator(voice):
+    import asyncio
+    from assistant.agents.response import SpeechQueue
+
+    c = Coordinator.__new__(Coordinator)
+    c._loop = asyncio.new_event_loop()
+    threading.Thread(target=c._loop.run_forever, daemon=True).start()
+    c.speech = SpeechQueue(voice)
+    c._turn_lock = asyncio.Lock()
+    return c
+
+
+async def _stop_worker(queue):
+    import asyncio
+    queue._worker.cancel()
+    await asyncio.gather(queue._worker, return_exceptions=True)
+
+
+def test_speech_queue_keeps_order_and_drain_waits():
+    import asyncio
+    from assistant.agents.response import SpeechQueue
+
+    voice = RecordingVoice()
+
+    async def turn():
+        q = SpeechQueue(voice)
+        for i in range(5):
+            q.say(f"line {i}")
+        assert voice.spoken == []        # say() does not block on speaking
+        await q.drain()
+        await _stop_worker(q)
+        return list(voice.spoken)
+
+    assert asyncio.run(turn()) == [f"line {i}" for i in range(5)]
+
+
+def test_concurrent_turns_do_not_interleave_speech():
+    import asyncio
+
+    voice = RecordingVoice()
+    c = _looped_coordinator(voice)
+
+    async def handle(text):
+        for part in ("start", "middle", "end"):
+            c._say(f"{text} {part}")
+            await asyncio.sleep(0.005)    # work between lines lets other turns run
+
+    c._handle_text = handle
+    threads = [threading.Thread(target=c.handle_text, args=(name,)) for name in ("one", "two", "three")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+    c._run(_stop_worker(c.speech))
+    c._loop.call_soon_threadsafe(c._loop.stop)
+    assert len(voice.spoken) == 9
+    # every turn's lines are contiguous and in order
+    for i in range(0, 9, 3):
+        name = voice.spoken[i].split()[0]
+        assert voice.spoken[i:i + 3] == [f"{name} start", f"{name} middle", f"{name} end"]
+
+
+def test_is_complete_command_only_accepts_fixed_phrases():
+    c = _bare_coordinator()
+    assert c.is_complete_command("leo check memory")
+    assert c.is_complete_command("Leo disk  cleanup")
+    # keyword rules: the next word may still turn check_disk into disk_cleanup
+    assert not c.is_complete_command("leo disk")
+    assert not c.is_complete_command("leo storage")
+    assert not c.is_complete_command("leo check disk")
+    # intents with arguments
+    assert not c.is_complete_command("leo open firefox")
+    assert not c.is_complete_command("leo top")
+    # no wake word
+    assert not c.is_complete_command("check memory")
+    assert not c.is_complete_command("leo")
+
+
+def test_early_final_commands_parse_to_argument_free_intents():
+    intent = IntentRecognitionAgent()
+    for phrase in EARLY_FINAL_COMMANDS:
+        it = intent.parse(phrase)
+        assert it.name in ("check_memory", "disk_cleanup"), phrase
+
+
+class CacheRecorder:
+    def __init__(self):
+        self.remembered, self.forgotten = [], []
+
+    def remember(self, text, route):
+        self.remembered.append(text)
+
+    def forget(self, text):
+        self.forgotten.append(text)
+
+
+def _task_coordinator(step_ok):
+    import types
+
+    c = Coordinator.__new__(Coordinator)
+    c.spoken = []
+    c._say = c.spoken.append
+    c.nlrouter = CacheRecorder()
+    c.intent_index = None
+    c.task_memory = types.SimpleNamespace(start_task=lambda goal: None, complete=lambda goal: None)
+
+    async def confirm(question):
+        return True
+
+    async def run_step(goal, cmd, emit, exclusive=None):
+        return step_ok
+
+    c._confirm_voice_async = confirm
+    c._run_plan_step = run_step
+    return c
+
+
+def test_task_route_is_cached_only_after_the_plan_succeeds(monkeypatch):
+    import asyncio
+
+    monkeypatch.setattr(settings, "PLAN_MAX_PARALLEL", 1)
+    route = {"type": "task", "commands": ["mkdir -p /tmp/x"]}
+    c = _task_coordinator(step_ok=True)
+    asyncio.run(c._handle_unknown_with_llm("leo make a folder", route))
+    assert c.nlrouter.remembered == ["leo make a folder"] and c.nlrouter.forgotten == []
+
+    c = _task_coordinator(step_ok=False)
+    asyncio.run(c._handle_unknown_with_llm("leo make a folder", route))
+    assert c.nlrouter.remembered == [] and c.nlrouter.forgotten == ["leo make a folder"]
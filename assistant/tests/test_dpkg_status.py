@@ -0,0 +1,53 @@
+# assistant/tests/test_dpkg_status.py
+import os
+
+from assistant.utils.dpkg_status import DpkgStatusIndex, parse_status
+
+STATUS = """Package: curl
+Status: install ok installed
+Architecture: all
+Version: 7.88.1-10
+Description: command line tool
+ Package: not-a-package
+ continuation lines are ignored
+
+Package: old-tool
+Status: deinstall ok config-files
+Architecture: all
+Version: 1.0
+
+Package: pinned
+Status: hold ok installed
+Architecture: all
+Version: 2.0
+
+Package: libfoo
+Status: install ok installed
+Architecture: i386
+Version: 3.0
+"""
+
+
+def test_parse_status():
+    index = parse_status(STATUS)
+    assert index["curl"].version == "7.88.1-10"
+    assert index["curl"].installed
+    assert not index["old-tool"].installed
+    assert index["pinned"].installed
+    assert index["libfoo:i386"].installed
+    assert "not-a-package" not in index
+
+
+def test_index_reloads_on_change(tmp_path):
+    path = tmp_path / "status"
+    path.write_text(STATUS)
+    index = DpkgStatusIndex(str(path))
+    assert index.are_installed(["curl", "old-tool", "nope"]) == {"curl": True, "old-tool": False, "nope": False}
+    assert index.is_installed("curl")
+    assert index.loads == 1
+
+    path.write_text(STATUS + "\nPackage: htop\nStatus: install ok installed\nArchitecture: all\nVersion: 3.2\n")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert index.version("htop") == "3.2"
+    assert index.loads == 2
@@ -0,0 +1,78 @@
+# assistant/tests/test_intent_index.py
+import numpy as np
+import pytest
+from assistant.memory import memory_store
+from assistant.memory.intent_index import IntentIndex
+from assistant.memory.memory_store import MemoryStore
+
+
+UPDATE = {"type": "task", "commands": ["sudo apt-get update", "sudo apt-get upgrade -y"]}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return IntentIndex(path=str(tmp_path / "idx"), threshold=0.7)
+
+
+def test_paraphrase_hits_and_unrelated_misses(index):
+    index.add("leo update my system", UPDATE)
+    assert index.lookup("update my system please") == UPDATE
+    assert index.lookup("what is the weather in paris") is None
+
+
+def test_reload_uses_memory_mapped_matrix(index, tmp_path):
+    index.add("list my home directory", {"type": "task", "commands": ["ls ~"]})
+    reloaded = IntentIndex(path=str(tmp_path / "idx"), threshold=0.7)
+    assert len(reloaded) == 1
+    assert isinstance(reloaded._matrix, np.memmap)
+    assert reloaded.lookup("list my home directory")["commands"] == ["ls ~"]
+
+
+def test_rebuild_from_completed_tasks(index, tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_store, "DB_PATH", tmp_path / "memory.db")
+    store = MemoryStore()
+    store.execute("INSERT INTO conversations (role, message) VALUES ('user', 'leo update my system')")
+    store.execute("INSERT INTO tasks (goal, status) VALUES (?, 'completed')", (str(UPDATE["commands"]),))
+    store.execute("INSERT INTO tasks (goal, status) VALUES (?, 'in_progress')", (str(["rm x"]),))
+
+    index.rebuild_from_memory(store)
+    assert len(index) == 1
+    assert index.lookup("update my system") == UPDATE
+
+
+def test_near_match_with_other_arguments_is_not_reused(index):
+    index.add("delete the file report_2023.txt", {"type": "task", "commands": ["rm report_2023.txt"]})
+    index.add("create a folder called projects", {"type": "task", "commands": ["mkdir projects"]})
+    assert index.lookup("delete the file report_2024.txt") is None
+    assert index.lookup("create a folder called project") is None
+    assert index.lookup("leo delete the file report_2023.txt")["commands"] == ["rm report_2023.txt"]
+    assert index.lookup("please create a folder called projects")["commands"] == ["mkdir projects"]
+
+
+def test_quoted_words_are_arguments(index):
+    index.add("make a note saying hello", {"type": "task", "commands": ["echo note > notes.txt"]})
+    assert index.lookup('make a note saying "goodbye"') is None
+
+
+def test_exact_key_is_reused_below_the_threshold(tmp_path):
+    index = IntentIndex(path=str(tmp_path / "idx"), threshold=1.5)
+    index.add("Leo, update my system!", UPDATE)
+    assert index.lookup("update my system") == UPDATE
+    assert index.lookup("update my system please") is None
+
+
+def test_add_appends_to_the_matrix_file(index, tmp_path, monkeypatch):
+    index.add("list my home directory", {"type": "task", "commands": ["ls ~"]})
+    # after the first write, new rows go to the end of the existing file
+    monkeypatch.setattr(np, "save", None)
+    index.add("show the disk usage of /var", {"type": "task", "commands": ["du -sh /var"]})
+    index.add("list my home directory", {"type": "task", "commands": ["ls -la ~"]})
+    index.add("update my system", UPDATE)
+    monkeypatch.undo()
+
+    reloaded = IntentIndex(path=str(tmp_path / "idx"), threshold=0.7)
+    assert len(reloaded) == 3
+    assert reloaded._matrix.shape == (3, IntentIndex.DIM)
+    assert np.allclose(reloaded._matrix[2], index.embed("update my system"), atol=1e-3)
+    assert reloaded.lookup("list my home directory")["commands"] == ["ls -la ~"]
+    assert reloaded.lookup("show the disk usage of /var")["commands"] == ["du -sh /var"]
@@ -0,0 +1,51 @@
+# assistant/tests/test_intent_recognition.py
+import re
+import pytest
+from assistant.agents.intent_recognition import (
+    Intent, IntentRecognitionAgent, IntentRule, RULES,
+)
+
+agent = IntentRecognitionAgent()
+
+
+@pytest.mark.parametrize("text,name,field,value", [
+    ("install vim", "install_package", "package", "vim"),
+    ("is there vim installed", "check_installed", "package", "vim"),
+    ("apt policy curl", "pkg_policy", "package", "curl"),
+    ("check disk", "check_disk", None, None),
+    ("free space on my disk", "disk_cleanup", None, None),
+    ("how much RAM is used?", "check_memory", None, None),
+    ("restart nginx", "svc_restart", "service", "nginx"),
+    ("start firefox", "svc_start", "service", "firefox"),
+    ("kill pid 4242", "kill_pid", "pid", 4242),
+    ("kill firefox", "kill_name", "extra", "firefox"),
+    ("top 5", "top_processes", "count", 5),
+    ("open debian.org", "open_url", "url", "https://debian.org"),
+    ("open firefox", "open_app", "extra", "firefox"),
+    ("search python venv", "search_query", "query", "python venv"),
+    ("say hello there", "speak_text", "text", "hello there"),
+])
+def test_known_intents(text, name, field, value):
+    it = agent.parse(text)
+    assert it.name == name
+    if field:
+        assert getattr(it, field) == value
+
+
+@pytest.mark.parametrize("text", ["what is a program", "topology of my network", "update my system"])
+def test_substrings_do_not_misfire(text):
+    assert agent.parse(text).name == "unknown"
+
+
+def test_added_rule_only_sees_its_verb():
+    calls = []
+
+    def build(m, t):
+        calls.append(t)
+        return Intent(name="lock_screen", description="Lock the screen")
+
+    rule = IntentRule("lock_screen", build, re.compile(r"lock\s+screen"), verbs=("lock",))
+    custom = IntentRecognitionAgent(RULES + [rule])
+    assert custom.parse("install vim").name == "install_package"
+    assert calls == []
+    assert custom.parse("lock screen").name == "lock_screen"
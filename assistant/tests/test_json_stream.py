@@ -0,0 +1,44 @@
+# assistant/tests/test_json_stream.py
+from assistant.utils.json_stream import JSONObjectScanner
+
+
+def feed_all(scanner, chunks):
+    for i, c in enumerate(chunks):
+        if scanner.feed(c):
+            return i
+    return None
+
+
+def test_stops_at_top_level_close():
+    s = JSONObjectScanner()
+    chunks = ['```json\n{"type":', '"chat","response":"hi"}', "\n```", " and more chatter"]
+    assert feed_all(s, chunks) == 1
+    assert s.value() == {"type": "chat", "response": "hi"}
+
+
+def test_braces_and_quotes_inside_strings():
+    s = JSONObjectScanner()
+    text = '{"type":"chat","response":"use {x} and \\"}\\" here"} trailing'
+    assert s.feed(text)
+    assert s.value()["response"] == 'use {x} and "}" here'
+
+
+def test_type_exposed_before_object_closes():
+    s = JSONObjectScanner()
+    assert not s.feed('{"type": "task", "commands": ["ls -la", ')
+    assert s.fields["type"] == "task"
+    assert "commands" not in s.fields
+    assert s.feed('"df -h"]}')
+    assert s.value()["commands"] == ["ls -la", "df -h"]
+
+
+def test_nested_strings_are_not_top_level_fields():
+    s = JSONObjectScanner()
+    s.feed('{"meta": {"type": "inner"}, "type": "chat"}')
+    assert s.fields == {"type": "chat"}
+
+
+def test_incomplete_object():
+    s = JSONObjectScanner()
+    assert not s.feed('no json here {"type": "chat"')
+    assert s.value() is None
@@ -39,3 +39,19 @@ def test_markov_verifier():
     v = MarkovVerifier()
     assert v.score_sequence("apt-get install firefox") > 0
     assert v.score_sequence("gibberish $$ ### ???") < 0
+
+def test_chat_user_turn_has_no_system_placeholder():
+    from assistant.data.prompts import PROMPT_SYSTEM
+    sent = {}
+
+    class Client:
+        def chat_text(self, system, prompt, model=None):
+            sent.update(system=system, prompt=prompt)
+            return "ok"
+
+    llm = LLMAgent()
+    llm.client = Client()
+    assert llm._chat("free space?", "ctx").text == "ok"
+    assert sent["system"] == PROMPT_SYSTEM
+    assert "SYSTEM PROMPT" not in sent["prompt"] and "see system message" not in sent["prompt"]
+    assert "free space?" in sent["prompt"] and "ctx" in sent["prompt"]
@@ -0,0 +1,78 @@
+# assistant/tests/test_local_llm.py
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from assistant.agents.local_llm import _RequestCoalescer, generated_tokens
+
+
+def _recording_batch(calls, gate=None):
+    def run_batch(prompts, budget):
+        if gate is not None:
+            gate.wait(1)
+        calls.append((list(prompts), budget))
+        return [f"{p}:{budget}" for p in prompts]
+    return run_batch
+
+
+def test_concurrent_requests_share_one_batch_and_identical_prompts_merge():
+    calls = []
+    co = _RequestCoalescer(_recording_batch(calls), window_s=0.2, max_batch=8)
+    prompts = ["a", "b", "a", "c", "b"]
+    with ThreadPoolExecutor(len(prompts)) as pool:
+        results = list(pool.map(lambda p: co.submit(p, 16).result(timeout=2), prompts))
+    # each caller gets the output for its own prompt
+    assert results == ["a:16", "b:16", "a:16", "c:16", "b:16"]
+    assert len(calls) == 1
+    assert sorted(calls[0][0]) == ["a", "b", "c"]
+
+
+def test_batches_split_by_budget_and_max_batch():
+    calls = []
+    gate = threading.Event()
+    co = _RequestCoalescer(_recording_batch(calls, gate), window_s=0.05, max_batch=2)
+    futs = [co.submit("x", 8), co.submit("y", 32), co.submit("z", 8)]
+    gate.set()
+    assert [f.result(timeout=2) for f in futs] == ["x:8", "y:32", "z:8"]
+    assert all(len(prompts) <= 2 for prompts, _ in calls)
+    assert {b for _, b in calls} == {8, 32}
+
+
+def test_batch_error_reaches_every_caller():
+    def boom(prompts, budget):
+        raise RuntimeError("out of memory")
+    co = _RequestCoalescer(boom, window_s=0.05, max_batch=4)
+    futs = [co.submit("a", 8), co.submit("a", 8)]
+    for f in futs:
+        assert isinstance(f.exception(timeout=2), RuntimeError)
+
+
+def test_failed_load_is_retried(monkeypatch):
+    from assistant.agents.local_llm import LocalLLM
+
+    attempts = []
+
+    def flaky_load(model_path):
+        attempts.append(model_path)
+        if len(attempts) == 1:
+            raise OSError("weights not found")
+
+    monkeypatch.setattr(LocalLLM, "_load", classmethod(lambda cls, p: flaky_load(p)))
+    monkeypatch.setattr(LocalLLM, "_loading", None)
+    first = LocalLLM.warm_load("/models/t5")
+    assert isinstance(first.exception(timeout=2), OSError)
+    assert not LocalLLM.is_ready()
+    LocalLLM.load("/models/t5")
+    assert LocalLLM.is_ready() and len(attempts) == 2
+
+
+def test_generated_tokens_skip_the_start_token_and_padding():
+    # T5: the decoder starts with the pad token (0); 1 is </s>
+    outputs = np.array([
+        [0, 71, 72, 73, 1],
+        [0, 81, 1, 0, 0],
+        [0, 1, 0, 0, 0],
+    ])
+    assert generated_tokens(outputs, pad_token_id=0) == 4 + 2 + 1
+    assert generated_tokens(outputs, pad_token_id=None) == 12
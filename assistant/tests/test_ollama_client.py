@@ -0,0 +1,63 @@
+# assistant/tests/test_ollama_client.py
+import json
+
+import pytest
+
+from assistant.utils.ollama_client import OllamaClient, OllamaError
+
+
+class FakeResponse:
+    def __init__(self, chunks):
+        self.lines = [json.dumps(c).encode() for c in chunks]
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return json.loads(self.lines[0])
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class FakeSession:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.urls = []
+
+    def post(self, url, **kwargs):
+        self.urls.append(url)
+        return FakeResponse(self.chunks)
+
+
+def _client(chunks):
+    client = OllamaClient(url="http://ollama:11434/api/generate")
+    client.session = FakeSession(chunks)
+    return client
+
+
+def test_streamed_json_reply():
+    client = _client([{"message": {"content": '{"type": "chat", '}},
+                      {"message": {"content": '"response": "hi"}'}}])
+    obj, raw = client.chat_json("system", "hello")
+    assert obj == {"type": "chat", "response": "hi"}
+    assert client.session.urls == ["http://ollama:11434/api/chat"]
+
+
+def test_error_in_stream_raises():
+    client = _client([{"message": {"content": '{"type": '}},
+                      {"error": "model runner has unexpectedly stopped"}])
+    with pytest.raises(OllamaError, match="unexpectedly stopped"):
+        client.chat_json("system", "hello")
+
+
+def test_error_in_non_streamed_reply_raises():
+    client = _client([{"error": "model 'x' not found"}])
+    with pytest.raises(OllamaError, match="not found"):
+        client.chat_text("system", "hello")
@@ -0,0 +1,82 @@
+# assistant/tests/test_output_capture.py
+import subprocess
+
+from assistant.agents.observer import ObserverAgent
+from assistant.utils import output_capture
+from assistant.utils.output_capture import MAX_LINE_BYTES, CommandStream, OutputBuffer
+
+
+def test_buffer_keeps_head_and_tail():
+    buf = OutputBuffer(head_bytes=20, tail_bytes=20)
+    for i in range(1000):
+        buf.append(f"line {i}\n")
+    assert buf.total_lines == 1000
+    assert buf.head[0] == "line 0\n"
+    assert list(buf.tail)[-1] == "line 999\n"
+    assert buf.truncated
+    assert len(buf.text()) < 200
+    assert "lines" in buf.text() and "omitted" in buf.text()
+
+
+def test_stream_yields_lines_and_counts_bytes():
+    stream = CommandStream(["seq", "1", "20000"], head_bytes=64, tail_bytes=64)
+    lines = list(stream)
+    r = stream.result
+    assert len(lines) == 20000
+    assert r.returncode == 0
+    assert r.total_lines == 20000
+    assert r.total_bytes == sum(len(l) for l in lines)
+    assert r.output.startswith("1\n2\n")
+    assert r.output.rstrip().endswith("20000")
+    assert r.truncated
+
+
+def test_observer_stops_command_early():
+    cmd = "echo start; echo 'tar: write error: No space left on device'; sleep 10; echo never"
+    stream = CommandStream(["bash", "-c", cmd], on_line=ObserverAgent().watch)
+    r = stream.result
+    assert r.aborted == "no space left on device"
+    assert "never" not in r.output
+    assert r.duration_s < 5
+
+
+def test_per_file_errors_do_not_stop_the_command():
+    cmd = "echo /a; echo 'find: /root: Permission denied'; echo /b"
+    observer = ObserverAgent()
+    r = CommandStream(["bash", "-c", cmd], on_line=observer.watch).result
+    assert r.aborted is None
+    assert r.output.endswith("/b\n")
+    # still reported once the command is done
+    assert observer.observe("find /", r.output)["reason"] == "permission denied"
+
+
+def test_timeout_kills_process_group():
+    r = CommandStream(["bash", "-c", "sleep 10 | cat"], timeout=0.3).result
+    assert r.timed_out
+    assert r.duration_s < 5
+
+
+def test_timeout_in_our_session_kills_the_tree():
+    # own_group=False is the sudo path: no process group to kill
+    r = CommandStream(["bash", "-c", "sleep 10 | cat; echo never"], timeout=0.3, own_group=False).result
+    assert r.timed_out
+    assert "never" not in r.output
+    assert r.duration_s < 3
+
+
+def test_timeout_stops_reading_when_the_pipe_stays_open(monkeypatch):
+    # stand-in for a root process under sudo that can't be signalled
+    monkeypatch.setattr(output_capture, "descendants", lambda pid: [])
+    monkeypatch.setattr(output_capture, "KILL_DRAIN_S", 0.2)
+    try:
+        r = CommandStream(["bash", "-c", "echo; sleep 5.37; true"], timeout=0.3, own_group=False).result
+        assert r.timed_out
+        assert r.duration_s < 3
+    finally:
+        subprocess.run(["pkill", "-KILL", "-f", r"^sleep 5\.37$"])
+
+
+def test_long_lines_are_split():
+    r = CommandStream(["bash", "-c", f"head -c {MAX_LINE_BYTES + 10} /dev/zero | tr '\\0' a; echo; echo b"]).result
+    assert r.total_lines == 3
+    assert r.total_bytes == MAX_LINE_BYTES + 10 + 1 + 2
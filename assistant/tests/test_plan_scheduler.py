@@ -0,0 +1,80 @@
+# assistant/tests/test_plan_scheduler.py
+import asyncio
+
+from assistant.agents.plan_scheduler import PlanScheduler, infer_dependencies, is_read_only
+
+
+def test_is_read_only():
+    for cmd in ("ls -la /tmp", "df -h | grep sda", "systemctl status nginx", "git branch",
+                "git branch -a", "git remote -v", "find / -name '*.log'", "dpkg -l 2>/dev/null"):
+        assert is_read_only(cmd), cmd
+    for cmd in ("git branch -D feature", "git branch new-topic", "git remote add origin x",
+                "git remote remove origin", "find . -delete", "find . -fprint0 out",
+                "find . -fls out", "ls > out.txt", "echo $(rm x)", "ls && rm -rf x",
+                "systemctl restart nginx", "apt install vim", ""):
+        assert not is_read_only(cmd), cmd
+
+
+def test_infer_dependencies():
+    cmds = ["ls", "df -h", "apt install vim", "ls", "free"]
+    assert infer_dependencies(cmds) == [set(), set(), {0, 1}, {2}, {2}]
+    inferred = infer_dependencies(cmds)
+    # a valid plan-supplied graph adds ordering but cannot remove the inferred one
+    assert infer_dependencies(cmds, [[], [0], [], [2], [1, 3]]) == [set(), {0}, {0, 1}, {2}, {1, 2, 3}]
+    assert infer_dependencies(cmds, [[1], [], [], [], []]) == [{1}, set(), {0, 1}, {2}, {2}]
+    # malformed: a cycle (0 -> 3 -> 2 -> 0), unknown or self ids, wrong length, junk
+    for bad in ([[3], [], [], [], []], [[], [7], [], [], []], [[], [], [2], [], []],
+                [[], [0]], [[], ["x"], [], [], []], "0,1"):
+        assert infer_dependencies(cmds, bad) == inferred, bad
+
+
+def test_messages_are_reported_in_plan_order():
+    spoken = []
+
+    async def run_step(i, cmd, emit):
+        # later steps finish first
+        await asyncio.sleep(0.01 * (3 - i))
+        emit(f"{cmd} done")
+        return True
+
+    ok = asyncio.run(PlanScheduler(spoken.append, max_parallel=4).run(["ls", "df", "free"], run_step))
+    assert ok
+    assert spoken == ["ls done", "df done", "free done"]
+
+
+def test_crashing_step_is_reported_and_stops_the_plan():
+    spoken, ran = [], []
+
+    async def run_step(i, cmd, emit):
+        ran.append(cmd)
+        if cmd == "apt install vim":
+            raise RuntimeError("boom")
+        return True
+
+    ok = asyncio.run(PlanScheduler(spoken.append).run(["ls", "apt install vim", "apt install git"], run_step))
+    assert not ok
+    assert ran == ["ls", "apt install vim"]
+    assert spoken == ["Step 2 failed unexpectedly: boom. Stopping.",
+                      "Skipped 1 step after the failure: 3: apt install git."]
+
+
+def test_exclusive_waits_for_running_steps_and_holds_back_new_ones():
+    running, seen = set(), []
+    scheduler = PlanScheduler(lambda text: None, max_parallel=3)   # "uptime" starts late
+
+    async def run_step(i, cmd, emit):
+        running.add(cmd)
+        if cmd == "df":
+            await asyncio.sleep(0.01)
+            async with scheduler.exclusive():
+                seen.append(set(running))
+                await asyncio.sleep(0.05)
+                seen.append(set(running))
+        else:
+            await asyncio.sleep(0.03)
+        running.discard(cmd)
+        return True
+
+    assert asyncio.run(scheduler.run(["ls", "df", "free", "uptime"], run_step))
+    # "df" itself is in the set; nothing else ran beside the recovery
+    assert seen == [{"df"}, {"df"}]
@@ -0,0 +1,59 @@
+# assistant/tests/test_process_monitor.py
+import subprocess
+import sys
+import time
+
+from assistant.agents.process_monitor import ProcessMonitorAgent
+
+_IGNORE_TERM = (
+    "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); "
+    "print('ready', flush=True); time.sleep(30)"
+)
+
+
+def test_kill_pids_shares_one_grace_period():
+    polite = [subprocess.Popen(["sleep", "30"]) for _ in range(2)]
+    stubborn = subprocess.Popen([sys.executable, "-c", _IGNORE_TERM], stdout=subprocess.PIPE, text=True)
+    assert stubborn.stdout.readline().strip() == "ready"
+    exited = subprocess.Popen(["true"])
+    while subprocess.run(["ps", "-o", "stat=", "-p", str(exited.pid)], capture_output=True, text=True).stdout.strip() != "Z":
+        time.sleep(0.01)    # left unreaped: a zombie
+    procs = polite + [stubborn, exited]
+    try:
+        t0 = time.monotonic()
+        outcomes = ProcessMonitorAgent().kill_pids([p.pid for p in procs] + [1], grace=0.5)
+        elapsed = time.monotonic() - t0
+        assert [outcomes[p.pid] for p in polite] == ["terminated", "terminated"]
+        assert outcomes[stubborn.pid] == "killed"
+        assert outcomes[exited.pid] == "already gone"
+        assert outcomes[1] == "protected"
+        # one shared deadline, not a grace period per process
+        assert 0.5 <= elapsed < 1.5
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
+
+
+def test_reused_pid_is_not_signalled(monkeypatch):
+    import assistant.agents.process_monitor as pm
+
+    victim = subprocess.Popen(["sleep", "30"])
+    real_state = pm.proc_state
+    calls = []
+
+    def reused_after_snapshot(pid):
+        state = real_state(pid)
+        calls.append(pid)
+        if state is not None and len(calls) > 1:
+            return state[0], state[1] + 1     # same PID, different process
+        return state
+
+    monkeypatch.setattr(pm, "proc_state", reused_after_snapshot)
+    try:
+        outcomes = ProcessMonitorAgent().kill_pids([victim.pid], grace=0.2)
+        assert outcomes[victim.pid] == "terminated"     # the original process is gone
+        assert victim.poll() is None                    # and the new one was left alone
+    finally:
+        victim.kill()
+        victim.wait()
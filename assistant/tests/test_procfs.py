@@ -0,0 +1,45 @@
+# assistant/tests/test_procfs.py
+import os
+import subprocess
+import time
+
+from assistant.utils.procfs import MAX_OPEN_FDS, PS_HEADER, ProcSampler, fd_budget, render_ps
+
+
+def test_top_rows_sorted_and_rendered():
+    sampler = ProcSampler()
+    rows = sampler.top(5)
+    assert 0 < len(rows) <= 5
+    assert [r.rss_kb for r in rows] == sorted((r.rss_kb for r in rows), reverse=True)
+    text = render_ps(rows)
+    assert text.splitlines()[0] == PS_HEADER
+    assert len(text.splitlines()) == len(rows) + 1
+    # second sample reuses the open stat files and measures CPU% from the delta
+    assert any(r.pid == os.getpid() for r in sampler.sample())
+    sampler.close()
+
+
+def test_pids_matching_like_pgrep():
+    p = subprocess.Popen(["sleep", "30.5"])
+    try:
+        time.sleep(0.1)
+        sampler = ProcSampler()
+        assert sampler.pids_matching(r"^sleep 30\.5$") == [p.pid]
+        assert [r.pid for r in sampler.top(10, match=r"sleep 30\.5")] == [p.pid]
+        assert os.getpid() not in sampler.pids_matching("python|pytest")
+    finally:
+        p.kill()
+        p.wait()
+
+
+def test_open_stat_files_stay_within_the_fd_budget():
+    assert fd_budget(60) == 0
+    assert fd_budget(1024) == 224
+    assert fd_budget(1 << 20) == MAX_OPEN_FDS
+    sampler = ProcSampler(max_open_fds=3)
+    rows = sampler.sample()
+    assert len(rows) > 3 and sampler._open_fds == 3
+    # processes past the budget are still sampled, by reopening their stat file
+    assert len(sampler.sample()) >= len(rows) - 5
+    sampler.close()
+    assert sampler._open_fds == 0
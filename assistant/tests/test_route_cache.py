@@ -0,0 +1,89 @@
+# assistant/tests/test_route_cache.py
+import pytest
+from assistant.config.settings import settings
+from assistant.memory import memory_store
+from assistant.agents.nl_router import NLRouter
+from assistant.memory.route_cache import RouteCache
+
+
+@pytest.fixture(autouse=True)
+def temp_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(memory_store, "DB_PATH", tmp_path / "memory.db")
+    monkeypatch.setattr(settings, "LLM_MODEL", "model-a")
+
+
+def test_hit_after_put_with_normalized_key():
+    cache = RouteCache()
+    assert cache.get("What is a Python venv?") is None
+    cache.put("What is a Python venv?", {"type": "chat", "response": "An isolated env."})
+    assert cache.get("  what is a python   venv ")["response"] == "An isolated env."
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_persists_across_instances():
+    RouteCache().put("update my system", {"type": "task", "commands": ["sudo apt-get update"]})
+    assert RouteCache().get("update my system")["commands"] == ["sudo apt-get update"]
+
+
+def test_ttl_expiry():
+    cache = RouteCache(ttl=1)
+    cache.put("hello", {"type": "chat", "response": "hi"})
+    key = cache.key("hello")
+    created, route = cache._lru[key]
+    cache._lru[key] = (created - 10, route)
+    assert cache.get("hello") is None
+
+
+def test_model_change_invalidates(monkeypatch):
+    cache = RouteCache()
+    cache.put("hello", {"type": "chat", "response": "hi"})
+    monkeypatch.setattr(settings, "LLM_MODEL", "model-b")
+    assert cache.get("hello") is None
+    assert RouteCache().get("hello") is None
+
+
+def test_discard():
+    cache = RouteCache()
+    cache.put("update my system", {"type": "task", "commands": ["sudo apt-get update"]})
+    cache.discard("Update my system")
+    assert cache.get("update my system") is None
+    assert RouteCache().get("update my system") is None
+
+
+class FakeLLM:
+    def __init__(self, obj):
+        self.obj = obj
+
+    def chat_json(self, system, text, on_field=None):
+        return self.obj, str(self.obj)
+
+
+def _router(obj):
+    # skips __init__, which would prime the LLM
+    router = NLRouter.__new__(NLRouter)
+    router.conversation_memory = type("Memory", (), {"recent": lambda self, limit: []})()
+    router.llm = FakeLLM(obj)
+    router.cache = RouteCache()
+    return router
+
+
+def test_router_caches_chat_but_not_unrun_tasks():
+    chat = _router({"type": "chat", "response": "hi"})
+    chat.route("leo hello")
+    assert chat.cache.get("leo hello") == {"type": "chat", "response": "hi"}
+
+    task = {"type": "task", "commands": ["rm -rf build"]}
+    router = _router(task)
+    router.route("leo clean the build")
+    assert router.cache.get("leo clean the build") is None
+    router.remember("leo clean the build", task)
+    assert router.cache.get("leo clean the build") == task
+    router.forget("leo clean the build")
+    assert router.cache.get("leo clean the build") is None
+
+
+def test_speculative_route_is_not_stored():
+    router = _router({"type": "chat", "response": "hi"})
+    router.route("leo tell me a", store=False)
+    assert router.cache.get("leo tell me a") is None
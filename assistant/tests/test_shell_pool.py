@@ -0,0 +1,60 @@
+# assistant/tests/test_shell_pool.py
+import time
+
+from assistant.utils.shell_pool import ShellPool
+
+
+def test_exit_codes_and_isolation():
+    pool = ShellPool(size=1)
+    try:
+        r = pool.run("echo hi; printf 'no newline'")
+        assert r.returncode == 0
+        assert r.output == "hi\nno newline"
+        assert pool.run("exit 3").returncode == 3
+        pool.run("cd /; X=1")
+        assert pool.run("echo ${X:-unset}").output.strip() == "unset"
+    finally:
+        pool.close()
+
+
+def test_timeout_kills_only_the_job():
+    pool = ShellPool(size=1)
+    try:
+        r = pool.run("sleep 10 | cat; echo never", timeout=0.3)
+        assert r.timed_out
+        assert "never" not in r.output
+        worker = pool._idle.get_nowait()
+        pool._idle.put(worker)
+        assert worker.alive()
+        assert pool.run("echo again").output.strip() == "again"
+    finally:
+        pool.close()
+
+
+def test_workers_are_recycled():
+    pool = ShellPool(size=1, max_uses=2)
+    try:
+        pool.run("true")
+        first = pool._idle.get_nowait()
+        pool._idle.put(first)
+        pool.run("true")
+        assert pool._idle.empty()      # reached max_uses and was closed
+        pool.run("true")
+        assert pool._idle.get_nowait() is not first
+    finally:
+        pool.close()
+
+
+def test_output_without_newline_keeps_sentinels_apart():
+    pool = ShellPool(size=1)
+    try:
+        for _ in range(300):
+            r = pool.run("printf x")
+            assert r.returncode == 0 and r.output == "x"
+        t0 = time.monotonic()
+        r = pool.run("printf x; sleep 5", timeout=0.05)
+        assert r.timed_out and r.output == "x"
+        assert time.monotonic() - t0 < 2
+        assert pool.run("echo ok").output.strip() == "ok"
+    finally:
+        pool.close()
@@ -0,0 +1,51 @@
+# assistant/tests/test_sysinfo.py
+from assistant.utils.sysinfo import (
+    MemoryInfo, MountUsage, disk_usage, memory_info, render_df, speak_disk, speak_memory,
+)
+
+MEMINFO = """MemTotal:        8000000 kB
+MemFree:         1000000 kB
+MemAvailable:    5000000 kB
+Buffers:          200000 kB
+Cached:          3000000 kB
+Shmem:            100000 kB
+SReclaimable:     300000 kB
+SwapTotal:       2000000 kB
+SwapFree:        1500000 kB
+HugePages_Total:       0
+"""
+
+
+def test_memory_info(tmp_path):
+    path = tmp_path / "meminfo"
+    path.write_text(MEMINFO)
+    mem = memory_info(str(path))
+    assert mem.total == 8000000 * 1024
+    assert mem.used == 3000000 * 1024
+    assert mem.buffers_cache == 3500000 * 1024
+    assert mem.swap_used == 500000 * 1024
+    assert "Swap is 25% used" in speak_memory(mem)
+
+
+def test_disk_usage_skips_pseudo_filesystems(tmp_path):
+    mounts = tmp_path / "mounts"
+    mounts.write_text(
+        "proc /proc proc rw 0 0\n"
+        "tmpfs /run tmpfs rw 0 0\n"
+        "/dev/root / ext4 rw 0 0\n"
+        "/dev/root / ext4 rw 0 0\n"
+    )
+    rows = disk_usage(str(mounts))
+    assert [(m.device, m.mountpoint) for m in rows] == [("/dev/root", "/")]
+    assert render_df(rows).splitlines()[0].startswith("Filesystem")
+
+
+def test_speak_disk_root_first():
+    gb = 1024 ** 3
+    mounts = [
+        MountUsage("/dev/sdb1", "/data", "ext4", 100 * gb, 90 * gb, 10 * gb),
+        MountUsage("/dev/sda1", "/", "ext4", 50 * gb, 20 * gb, 30 * gb),
+    ]
+    assert speak_disk(mounts) == (
+        "The root disk is 40% full with 30 gigabytes free. /data is 90% full with 10 gigabytes free."
+    )
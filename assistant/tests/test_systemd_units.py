@@ -0,0 +1,98 @@
+# assistant/tests/test_systemd_units.py
+import json
+
+from assistant.utils.systemd_units import SystemdUnitIndex
+
+UNITS = [
+    {"unit": "nginx.service", "load": "loaded", "active": "active", "sub": "running", "description": "nginx"},
+    {"unit": "NetworkManager.service", "load": "loaded", "active": "active", "sub": "running",
+     "description": "Network Manager"},
+    {"unit": "ssh.service", "load": "loaded", "active": "inactive", "sub": "dead", "description": "OpenSSH"},
+    {"unit": "systemd-tmpfiles-clean.timer", "load": "loaded", "active": "active", "sub": "waiting",
+     "description": "timer"},
+]
+
+
+class FakeSystemctl:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, argv):
+        self.calls.append(argv[1])
+        if argv[1] == "list-units":
+            return 0, json.dumps(UNITS)
+        if argv[1] == "list-unit-files":
+            return 0, "nginx.service enabled enabled\ncups.service disabled enabled\n"
+        if argv[1] == "show":
+            names = argv[argv.index("--") + 1:]
+            return 0, "\n\n".join(
+                f"Id={n}\nLoadState=loaded\nActiveState=active\nSubState=running\nDescription=x" for n in names
+            )
+        return 1, ""
+
+
+def test_resolve_spoken_names():
+    index = SystemdUnitIndex(run=FakeSystemctl(), ttl=300, status_ttl=10)
+    assert index.resolve("nginx") == "nginx.service"
+    assert index.resolve("network manager") == "NetworkManager.service"
+    assert index.resolve("nginx server") == "nginx.service"
+    assert index.resolve("sshd") == "ssh.service"
+    assert index.resolve("cups") == "cups.service"          # only known as a unit file
+    assert index.resolve("postgres") is None
+    assert "systemd-tmpfiles-clean.timer" not in index.units
+
+
+def test_status_served_from_cache_until_invalidated():
+    fake = FakeSystemctl()
+    index = SystemdUnitIndex(run=fake, ttl=300, status_ttl=10)
+    assert index.status("ssh.service").summary() == "ssh.service is inactive (dead)"
+    assert index.status("ssh.service").active == "inactive"
+    assert fake.calls == ["list-units"]
+
+    index.invalidate("ssh.service")
+    assert index.status("ssh.service").summary() == "ssh.service is active (running)"
+    assert fake.calls == ["list-units", "show"]
+
+
+def test_plain_fallback_without_json():
+    def run(argv):
+        if "--output=json" in argv:
+            return 1, "Unknown option"
+        return 0, "cron.service loaded active running Regular background program processing daemon\n"
+
+    index = SystemdUnitIndex(run=run, ttl=300, status_ttl=10)
+    assert index.list()[0].description == "Regular background program processing daemon"
+
+
+def test_guessed_names_are_flagged():
+    rows = [{"unit": u, "load": "loaded", "active": "active", "sub": "running", "description": ""}
+            for u in ("networking.service", "mysql.service", "nginx.service")]
+    index = SystemdUnitIndex(run=lambda argv: (0, json.dumps(rows)), ttl=300, status_ttl=10)
+    assert index.resolve_match("Nginx") == ("nginx.service", True)
+    assert index.resolve_match("nginx server") == ("nginx.service", True)
+    assert index.resolve_match("network") == ("networking.service", False)
+    assert index.resolve_match("sql") == ("mysql.service", False)
+
+
+def test_guessed_unit_is_not_stopped_without_confirmation():
+    from types import SimpleNamespace
+
+    from assistant.agents.action_execution import ActionExecutionAgent
+    from assistant.agents.intent_recognition import Intent
+    from assistant.agents.safety import SafetyAgent
+
+    rows = [{"unit": "networking.service", "load": "loaded", "active": "active", "sub": "exited", "description": ""}]
+    asked, ran = [], []
+    agent = ActionExecutionAgent.__new__(ActionExecutionAgent)
+    agent.safety = SafetyAgent()
+    agent.mon = SimpleNamespace(units=SystemdUnitIndex(run=lambda argv: (0, json.dumps(rows)), ttl=300, status_ttl=10))
+    agent.ask_confirm = lambda q: asked.append(q) or False
+    agent.task_memory = SimpleNamespace(update=lambda *a: None)
+    agent._shell = lambda cmd, on_line=None: ran.append(cmd)
+
+    out = agent.run(Intent(name="svc_stop", description="Stop service network", service="network"))
+    assert asked == ["Did you mean networking.service?"]
+    assert ran == [] and "not touching" in out
+    # a status question may use the guess without asking
+    out = agent.run(Intent(name="svc_status", description="Status of network", service="network"))
+    assert out == "networking.service is active (exited)" and len(asked) == 1
@@ -0,0 +1,69 @@
+# assistant/tests/test_vad.py
+import numpy as np
+
+from assistant.utils.vad import AUDIO, END, VoiceGate
+
+SR = 16000
+
+
+def _tone(seconds, amp=8000, hz=220):
+    t = np.arange(int(SR * seconds)) / SR
+    return (amp * np.sin(2 * np.pi * hz * t)).astype(np.int16)
+
+
+def _noise(seconds, amp=30, seed=0):
+    return np.random.default_rng(seed).normal(0, amp, int(SR * seconds)).astype(np.int16)
+
+
+def _run(gate, pcm, block=8000):
+    events = []
+    for i in range(0, len(pcm), block):
+        events.extend(gate.process(pcm[i:i + block]))
+    return events
+
+
+def test_passes_speech_with_preroll_and_gates_silence():
+    gate = VoiceGate(SR, hangover_ms=200, preroll_ms=100, snr_db=10)
+    pcm = np.concatenate((_noise(2.0), _tone(1.0), _noise(2.0, seed=1)))
+    events = _run(gate, pcm)
+    kinds = [k for k, _ in events]
+    assert kinds.count(END) == 1 and gate.segments == 1
+    passed = np.concatenate([s for k, s in events if k == AUDIO])
+    # the whole tone, plus pre-roll before it and hangover after it
+    assert SR * 1.0 <= len(passed) <= SR * 1.5
+    assert 0.6 < gate.gated_fraction < 0.8
+    # the tone ended 2 s before the end of the input
+    assert abs(gate.silence_samples - 2 * SR) <= gate.frame_len
+
+
+def test_silence_only_never_opens_and_odd_blocks_are_buffered():
+    gate = VoiceGate(SR)
+    assert _run(gate, _noise(3.0), block=1234) == []
+    assert gate.frames_total == int(SR * 3.0) // gate.frame_len
+    assert gate.gated_fraction == 1.0
+
+
+def test_two_utterances_two_segments():
+    gate = VoiceGate(SR, hangover_ms=200, preroll_ms=100)
+    pcm = np.concatenate((_noise(1.0), _tone(0.5), _noise(1.0, seed=2), _tone(0.5, hz=330), _noise(1.0, seed=3)))
+    kinds = [k for k, _ in _run(gate, pcm, block=4000)]
+    assert kinds.count(END) == 2 and kinds[-1] == END
+
+
+def test_floor_follows_a_step_in_background_noise():
+    gate = VoiceGate(SR)
+    hum = _tone(20.0, amp=824, hz=120)          # about -35 dBFS
+    pcm = np.concatenate((_noise(2.0), hum, hum[:SR] + _tone(1.0, amp=8000, hz=440)))
+    events = _run(gate, pcm)
+    passed = sum(len(s) for k, s in events if k == AUDIO)
+    # the hum opens the gate at most briefly, and speech over it still gets through
+    assert passed < SR * 6
+    assert gate.noise_db > -45
+    tail = _run(gate, hum[:SR] + _tone(1.0, amp=8000, hz=440))
+    assert any(k == AUDIO for k, _ in tail)
+
+
+def test_segment_length_is_capped():
+    gate = VoiceGate(SR, max_segment_ms=2000, floor_window_ms=30000)
+    events = _run(gate, np.concatenate((_noise(1.0), _tone(5.0))))
+    assert gate.forced_ends >= 1 and END in [k for k, _ in events]
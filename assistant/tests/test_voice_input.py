@@ -0,0 +1,177 @@
+# assistant/tests/test_voice_input.py
+"""
+VoiceInputAgent driven by scripted recognizers: every audio block is filled
+with one word code, and the fake recognizers "hear" those words.
+"""
+import json
+from collections import deque
+
+import numpy as np
+import pytest
+
+from assistant.agents.voice_input import VoiceInputAgent
+from assistant.config.settings import settings
+from assistant.coordinator import Coordinator
+
+WORDS = {1: "leo", 2: "check", 3: "disk", 4: "open", 5: "firefox", 6: "lee",
+         7: "memory", 8: "cleanup", 9: "..."}     # "...": a pause inside the utterance
+CODES = {w: c for c, w in WORDS.items()}
+BLOCK = 1600
+
+
+class FakeRecognizer:
+    """Words accumulate until a silent block, which ends the utterance."""
+
+    def __init__(self, grammar=None):
+        self.grammar = grammar
+        self.words = []
+        self.fed_blocks = 0
+
+    def _word(self, code):
+        word = WORDS[code]
+        return word if self.grammar is None or word in self.grammar else "[unk]"
+
+    def AcceptWaveform(self, data):
+        samples = np.frombuffer(data, dtype=np.int16)
+        ended = False
+        for block in samples.reshape(-1, BLOCK):
+            self.fed_blocks += 1
+            if block[0] == CODES["..."]:
+                continue
+            if block[0]:
+                self.words.append(self._word(int(block[0])))
+            elif self.words:
+                ended = True
+        return ended
+
+    def _text(self):
+        text, self.words = " ".join(self.words), []
+        return text
+
+    def Result(self):
+        return json.dumps({"text": self._text()})
+
+    FinalResult = Result
+
+    def PartialResult(self):
+        return json.dumps({"partial": " ".join(self.words)})
+
+    def Reset(self):
+        self.words = []
+
+
+class ScriptedTap:
+    def __init__(self, blocks):
+        self.blocks = deque(blocks)
+
+    def read(self, min_samples=1, timeout=None):
+        return self.blocks.popleft() if self.blocks else None
+
+    def pending(self):
+        return 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class ScriptedCapture:
+    blocksize = BLOCK
+
+    def __init__(self, blocks):
+        self.blocks = blocks
+
+    def attach(self, name, preroll_s=0.0):
+        return ScriptedTap(self.blocks)
+
+
+def _blocks(*words):
+    return [np.full(BLOCK, CODES[w] if w else 0, dtype=np.int16) for w in words]
+
+
+def _agent(blocks, two_stage=True, preroll_ms=2000):
+    # what __init__ sets up, minus the Vosk model and the microphone
+    a = VoiceInputAgent.__new__(VoiceInputAgent)
+    a.wake_word = "leo"
+    a.two_stage = two_stage
+    a.wake_rec = FakeRecognizer(["leo", "[unk]"]) if two_stage else None
+    a.rec = FakeRecognizer()
+    a.samplerate = 16000
+    a.capture = ScriptedCapture(blocks)
+    a._recent, a._recent_samples = deque(), 0
+    a._max_recent = 16000 * preroll_ms // 1000
+    a._awake_until = 0.0 if two_stage else float("inf")
+    a.latencies_ms, a.early_finalized = deque(maxlen=200), 0
+    return a
+
+
+@pytest.fixture(autouse=True)
+def _plain_settings(monkeypatch):
+    monkeypatch.setattr(settings, "VAD_ENABLED", False)
+    monkeypatch.setattr(settings, "WAKE_FOLLOWUP_S", 30.0)
+
+
+def _listen(agent, **kwargs):
+    heard = []
+    agent.listen(heard.append, **kwargs)
+    return heard
+
+
+def test_wake_word_hands_the_whole_utterance_to_the_full_recognizer():
+    agent = _agent(_blocks(None, "open", None, "leo", "check", "disk", None))
+    assert _listen(agent) == ["leo check disk"]
+    # "open" before the wake word never reached the large-vocabulary recognizer
+    assert agent.rec.fed_blocks == 4
+
+
+def test_no_wake_word_no_command():
+    agent = _agent(_blocks("check", "disk", None, "open", "firefox", None))
+    assert _listen(agent) == []
+    assert agent.rec.fed_blocks == 0
+
+
+def test_bare_wake_word_then_command_within_followup():
+    agent = _agent(_blocks("leo", None, None, "open", "firefox", None))
+    assert _listen(agent) == ["leo open firefox"]
+
+
+def test_misheard_wake_word_is_stripped():
+    agent = _agent([])
+    assert agent._command_text("lee check disk") == "check disk"
+    assert agent._command_text("check disk") == "check disk"
+
+
+def test_zero_preroll_does_not_crash():
+    agent = _agent(_blocks("check", "leo", "disk", None), preroll_ms=0)
+    assert _listen(agent) == ["leo disk"]
+
+
+def test_single_stage_passes_everything_through():
+    agent = _agent(_blocks("check", "disk", None, "leo", "open", None), two_stage=False)
+    assert _listen(agent) == ["check disk", "leo open"]
+
+
+def test_followup_window_expires(monkeypatch):
+    monkeypatch.setattr(settings, "WAKE_FOLLOWUP_S", 0.0)
+    agent = _agent(_blocks("leo", None, None, "open", "firefox", None))
+    assert _listen(agent) == []
+
+
+def _early(text):
+    return Coordinator.__new__(Coordinator).is_complete_command(text)
+
+
+def test_complete_command_is_finalized_during_the_pause(monkeypatch):
+    monkeypatch.setattr(settings, "VOICE_EARLY_FINALIZE_MS", 0)
+    agent = _agent(_blocks("leo", "check", "memory", "...", "...", None))
+    assert _listen(agent, is_complete=_early) == ["leo check memory"]
+    assert agent.early_finalized == 1
+
+
+def test_prefix_of_a_longer_command_waits_for_the_endpoint(monkeypatch):
+    monkeypatch.setattr(settings, "VOICE_EARLY_FINALIZE_MS", 0)
+    agent = _agent(_blocks("leo", "check", "disk", "...", "...", "cleanup", None))
+    assert _listen(agent, is_complete=_early) == ["leo check disk cleanup"]
+    assert agent.early_finalized == 0
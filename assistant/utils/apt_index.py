@@ -0,0 +1,362 @@
+# assistant/utils/apt_index.py
+"""
+Candidate-version index built from the apt lists in /var/lib/apt/lists.
+
+Every *_Packages file of the native architecture (or "all") is parsed into
+package -> [(version, priority, origin)], with priorities taken from the
+matching Release file the way apt assigns them by default (500, 100 for
+ButAutomaticUpgrades archives, 1 for NotAutomatic ones). The result is
+serialized with marshal under LEO_HOME and reused until a list, a Release
+file or the apt preferences change.
+
+Packages named in /etc/apt/preferences{,.d} may be pinned, so their policy
+is still read from `apt-cache policy`. The same fallback is used when there
+are no lists at all.
+"""
+import bisect
+import difflib
+import glob
+import gzip
+import marshal
+import os
+import re
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from functools import cmp_to_key
+from pathlib import Path
+from typing import Iterable, Optional
+
+from assistant.config.settings import settings
+from assistant.utils.dpkg_status import compare_versions, get_dpkg_index, native_architecture
+from assistant.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+LISTS_DIR = "/var/lib/apt/lists"
+PREFERENCES = ["/etc/apt/preferences", "/etc/apt/preferences.d"]
+CACHE_FORMAT = 1
+
+_PKG_FIELDS = re.compile(r"^(Package|Version|Architecture):[ \t]*(.*)$", re.MULTILINE)
+_RELEASE_FIELDS = re.compile(r"^(NotAutomatic|ButAutomaticUpgrades|Origin|Suite|Codename):[ \t]*(.*)$", re.MULTILINE)
+_PREF_PACKAGE = re.compile(r"^Package:[ \t]*(.*)$", re.MULTILINE)
+_VERSION_KEY = cmp_to_key(compare_versions)
+
+
+@dataclass
+class PackageVersion:
+    version: str
+    priority: int
+    origins: list[str] = field(default_factory=list)
+
+
+@dataclass
+class PackagePolicy:
+    """What `apt-cache policy <pkg>` reports, as data."""
+    name: str
+    installed: Optional[str]
+    candidate: Optional[str]
+    versions: list[PackageVersion] = field(default_factory=list)
+
+    def render(self) -> str:
+        lines = [
+            f"{self.name}:",
+            f"  Installed: {self.installed or '(none)'}",
+            f"  Candidate: {self.candidate or '(none)'}",
+            "  Version table:",
+        ]
+        for v in self.versions:
+            mark = "***" if v.version == self.installed else "   "
+            lines.append(f" {mark} {v.version} {v.priority}")
+            for o in v.origins:
+                lines.append(f"        {v.priority} {o}")
+        return "\n".join(lines)
+
+
+def parse_apt_cache_policy(text: str) -> dict[str, PackagePolicy]:
+    """Parse `apt-cache policy pkg...` output (one block per package)."""
+    result: dict[str, PackagePolicy] = {}
+    pol: Optional[PackagePolicy] = None
+    cur: Optional[PackageVersion] = None
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        if not line.startswith(" ") and line.rstrip().endswith(":"):
+            pol = PackagePolicy(line.strip()[:-1], None, None)
+            result[pol.name] = pol
+            cur = None
+            continue
+        if pol is None:
+            continue
+        s = line.strip()
+        if s.startswith("Installed:"):
+            v = s.split(":", 1)[1].strip()
+            pol.installed = None if v == "(none)" else v
+        elif s.startswith("Candidate:"):
+            v = s.split(":", 1)[1].strip()
+            pol.candidate = None if v == "(none)" else v
+        elif s.startswith("Version table:"):
+            continue
+        elif line.startswith(" *** ") or (line.startswith("     ") and not line.startswith("        ")):
+            parts = s.lstrip("*").split()
+            if len(parts) >= 2 and parts[-1].lstrip("-").isdigit():
+                cur = PackageVersion(parts[0], int(parts[-1]))
+                pol.versions.append(cur)
+        elif cur is not None:
+            prio, _, origin = s.partition(" ")
+            if prio.lstrip("-").isdigit():
+                cur.origins.append(origin.strip())
+    return result
+
+
+def _read(path: str) -> str:
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _release_priority(release_text: str) -> tuple[int, str]:
+    fields = dict(_RELEASE_FIELDS.findall(release_text))
+    label = "/".join(x for x in (fields.get("Origin"), fields.get("Suite") or fields.get("Codename")) if x)
+    if fields.get("NotAutomatic", "").strip().lower() == "yes":
+        if fields.get("ButAutomaticUpgrades", "").strip().lower() == "yes":
+            return 100, label
+        return 1, label
+    return 500, label
+
+
+class AptCandidateIndex:
+    def __init__(self, lists_dir: str = LISTS_DIR, cache_path: Optional[str] = None,
+                 preferences: Optional[list[str]] = None):
+        self.lists_dir = lists_dir
+        self.cache_path = cache_path or str(Path(settings.LEO_HOME) / "apt_index.marshal")
+        self.preferences = PREFERENCES if preferences is None else preferences
+        self._lock = threading.Lock()
+        self._sig = None
+        self._entries: dict[str, list[tuple[str, int, str]]] = {}
+        self._names: list[str] = []
+        self._pinned: set[str] = set()
+        self._pin_all = False
+        self.builds = 0
+
+    # ----- building -----
+    def _files(self) -> tuple[list[str], list[str], list[str]]:
+        lists = sorted(glob.glob(os.path.join(self.lists_dir, "*_Packages")) +
+                       glob.glob(os.path.join(self.lists_dir, "*_Packages.gz")))
+        releases = sorted(glob.glob(os.path.join(self.lists_dir, "*Release")))
+        prefs = []
+        for p in self.preferences:
+            if os.path.isdir(p):
+                prefs += sorted(os.path.join(p, f) for f in os.listdir(p) if not f.startswith("."))
+            elif os.path.exists(p):
+                prefs.append(p)
+        return lists, releases, prefs
+
+    @staticmethod
+    def _signature(paths: list[str]) -> tuple:
+        sig = []
+        for p in paths:
+            try:
+                st = os.stat(p)
+                sig.append((p, st.st_mtime_ns, st.st_size))
+            except OSError:
+                continue
+        return (CACHE_FORMAT, native_architecture(), tuple(sig))
+
+    def _refresh(self):
+        lists, releases, prefs = self._files()
+        sig = self._signature(lists + releases + prefs)
+        if sig == self._sig:
+            return
+        if not self._load_cache(sig):
+            self._build(lists, releases)
+            self._save_cache(sig)
+        self._read_preferences(prefs)
+        self._names = sorted(self._entries)
+        self._sig = sig
+
+    def _build(self, lists: list[str], releases: list[str]):
+        native = native_architecture()
+        release_of = {}
+        for r in releases:
+            # <prefix>_InRelease / <prefix>_Release pairs with <prefix>_<component>_binary-<arch>_Packages
+            prefix = os.path.basename(r).rsplit("_", 1)[0]
+            try:
+                release_of[prefix] = _release_priority(_read(r))
+            except OSError:
+                continue
+
+        entries: dict[str, list[tuple[str, int, str]]] = {}
+        for path in lists:
+            base = os.path.basename(path)
+            m = re.search(r"_binary-([^_]+)_Packages", base)
+            if m and m.group(1) not in (native, "all"):
+                continue
+            prefix = next((p for p in release_of if base.startswith(p + "_")), None)
+            priority, label = release_of.get(prefix, (500, ""))
+            origin = label or base.replace("_Packages", "").replace("_", "/")
+            try:
+                text = _read(path)
+            except OSError as e:
+                log.warning("[apt] Cannot read %s: %s", path, e)
+                continue
+            name = version = arch = None
+            for key, value in _PKG_FIELDS.findall(text):
+                if key == "Package":
+                    if name and version and arch in (native, "all", None):
+                        entries.setdefault(name, []).append((version, priority, origin))
+                    name, version, arch = value.strip(), None, None
+                elif key == "Version":
+                    version = value.strip()
+                else:
+                    arch = value.strip()
+            if name and version and arch in (native, "all", None):
+                entries.setdefault(name, []).append((version, priority, origin))
+        self._entries = entries
+        self.builds += 1
+        log.info("[apt] Indexed %d packages from %d lists", len(entries), len(lists))
+
+    def _load_cache(self, sig) -> bool:
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+        if data.get("sig") != sig:
+            return False
+        self._entries = data["entries"]
+        return True
+
+    def _save_cache(self, sig):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            tmp = self.cache_path + ".tmp"
+            with open(tmp, "wb") as f:
+                marshal.dump({"sig": sig, "entries": self._entries}, f)
+            os.replace(tmp, self.cache_path)
+        except (OSError, ValueError) as e:
+            log.warning("[apt] Could not write %s: %s", self.cache_path, e)
+
+    def _read_preferences(self, prefs: list[str]):
+        pinned, pin_all = set(), False
+        for p in prefs:
+            try:
+                text = _read(p)
+            except OSError:
+                continue
+            for line in _PREF_PACKAGE.findall(text):
+                for pkg in line.split():
+                    if any(c in pkg for c in "*?[/"):
+                        pin_all = True     # glob or regex pin: could match anything
+                    else:
+                        pinned.add(pkg)
+        self._pinned, self._pin_all = pinned, pin_all
+
+    # ----- queries -----
+    def _needs_apt_cache(self, pkg: str) -> bool:
+        return not self._entries or self._pin_all or pkg in self._pinned
+
+    def policies(self, pkgs: Iterable[str]) -> dict[str, Optional[PackagePolicy]]:
+        """Policy for each package; None when apt knows no version of it."""
+        pkgs = list(pkgs)
+        with self._lock:
+            self._refresh()
+            fallback = [p for p in pkgs if self._needs_apt_cache(p)]
+            local = {p: self._entries.get(p) for p in pkgs if p not in fallback}
+        installed = get_dpkg_index().lookup(pkgs)
+
+        result: dict[str, Optional[PackagePolicy]] = {}
+        for pkg, rows in local.items():
+            st = installed.get(pkg)
+            inst = st.version if st is not None and st.installed else None
+            result[pkg] = self._policy(pkg, rows or [], inst)
+        if fallback:
+            result.update(_apt_cache_policy(fallback))
+        return result
+
+    def policy(self, pkg: str) -> Optional[PackagePolicy]:
+        return self.policies([pkg])[pkg]
+
+    @staticmethod
+    def _policy(pkg: str, rows: list, installed: Optional[str]) -> Optional[PackagePolicy]:
+        by_version: dict[str, PackageVersion] = {}
+        for version, priority, origin in rows:
+            pv = by_version.setdefault(version, PackageVersion(version, priority))
+            pv.priority = max(pv.priority, priority)
+            pv.origins.append(origin)
+        if installed:
+            pv = by_version.setdefault(installed, PackageVersion(installed, 100))
+            pv.origins.append("/var/lib/dpkg/status")
+        if not by_version:
+            return None
+        versions = sorted(by_version.values(), key=_version_key, reverse=True)
+        # highest priority wins, newest version breaks ties
+        best = max(versions, key=lambda v: (v.priority, _version_key(v)))
+        candidate = best.version
+        # below 1000 apt never downgrades the installed version
+        if installed and best.priority < 1000 and compare_versions(installed, candidate) > 0:
+            candidate = installed
+        return PackagePolicy(pkg, installed, candidate, versions)
+
+    def candidates(self, pkgs: Iterable[str]) -> dict[str, Optional[str]]:
+        return {p: (pol.candidate if pol else None) for p, pol in self.policies(pkgs).items()}
+
+    def exists(self, pkg: str) -> bool:
+        pol = self.policy(pkg)
+        return pol is not None and pol.candidate is not None
+
+    def search_prefix(self, prefix: str, limit: int = 20) -> list[str]:
+        with self._lock:
+            self._refresh()
+            names = self._names
+        i = bisect.bisect_left(names, prefix)
+        out = []
+        while i < len(names) and len(out) < limit and names[i].startswith(prefix):
+            out.append(names[i])
+            i += 1
+        return out
+
+    def suggest(self, name: str, n: int = 3, cutoff: float = 0.75) -> list[str]:
+        """Likely intended package names for a mistyped one."""
+        with self._lock:
+            self._refresh()
+            names = self._names
+        if not name or not names:
+            return []
+        # only compare against names of similar length sharing the first letter
+        i = bisect.bisect_left(names, name[0])
+        j = bisect.bisect_left(names, chr(ord(name[0]) + 1))
+        pool = [x for x in names[i:j] if abs(len(x) - len(name)) <= 3]
+        return difflib.get_close_matches(name, pool, n=n, cutoff=cutoff)
+
+
+def _version_key(pv: PackageVersion):
+    return _VERSION_KEY(pv.version)
+
+
+def _apt_cache_policy(pkgs: list[str]) -> dict[str, Optional[PackagePolicy]]:
+    """One `apt-cache policy` call for all packages."""
+    result: dict[str, Optional[PackagePolicy]] = {p: None for p in pkgs}
+    try:
+        r = subprocess.run(["apt-cache", "policy", "--"] + pkgs, text=True,
+                           stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except OSError as e:
+        log.error("[apt] apt-cache failed: %s", e)
+        return result
+    for name, pol in parse_apt_cache_policy(r.stdout).items():
+        if name in result and (pol.candidate or pol.installed or pol.versions):
+            result[name] = pol
+    return result
+
+
+_apt_index: Optional[AptCandidateIndex] = None
+_apt_lock = threading.Lock()
+
+
+def get_apt_index() -> AptCandidateIndex:
+    """Process-wide index shared by every agent."""
+    global _apt_index
+    with _apt_lock:
+        if _apt_index is None:
+            _apt_index = AptCandidateIndex()
+        return _apt_index
@@ -0,0 +1,182 @@
+# assistant/utils/audio_capture.py
+"""
+One microphone stream shared by every listener.
+
+The capture engine owns the input device and copies each block into a
+preallocated int16 ring buffer. Consumers attach a Tap, which only holds a
+read cursor into that ring: attaching or detaching never touches the device,
+and a block is never copied per consumer on the audio thread. Conversion to
+bytes is left to the consumer that needs it (e.g. a Vosk recognizer).
+"""
+import threading
+from typing import Optional
+
+import numpy as np
+
+from assistant.config.settings import settings
+from assistant.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+
+class Tap:
+    """A consumer's cursor into the capture ring."""
+
+    def __init__(self, capture: "AudioCapture", name: str, cursor: int):
+        self.capture = capture
+        self.name = name
+        self.cursor = cursor        # absolute sample index of the next sample to read
+        self.overruns = 0           # times the reader fell a full ring behind and skipped ahead
+        self.closed = False
+
+    def read(self, min_samples: int = 1, max_samples: Optional[int] = None,
+             timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Wait for at least min_samples new samples and return them (up to
+        max_samples). Returns None on timeout or once the tap is detached.
+
+        A contiguous read is a view into the ring, valid until the writer laps
+        it (CAPTURE_BUFFER_S later); use it or convert it right away.
+        """
+        return self.capture._read(self, min_samples, max_samples, timeout)
+
+    def rewind(self, samples: int):
+        """Move the cursor back, e.g. to replay pre-roll audio to another recognizer."""
+        with self.capture._cond:
+            self.cursor = max(self.cursor - samples, self.capture._oldest())
+
+    def pending(self) -> int:
+        with self.capture._cond:
+            return self.capture._written - self.cursor
+
+    def detach(self):
+        self.capture.detach(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.detach()
+
+
+class AudioCapture:
+    def __init__(self, samplerate: Optional[int] = None, blocksize: Optional[int] = None,
+                 buffer_s: Optional[float] = None, open_device: bool = True):
+        self.samplerate = samplerate or settings.SAMPLE_RATE
+        self.blocksize = blocksize or self.samplerate * settings.VOICE_BLOCK_MS // 1000
+        buffer_s = settings.CAPTURE_BUFFER_S if buffer_s is None else buffer_s
+        self.capacity = max(int(self.samplerate * buffer_s), self.blocksize * 2)
+        self._ring = np.zeros(self.capacity, dtype=np.int16)
+        self._written = 0           # total samples ever written
+        self._taps: list[Tap] = []
+        self._cond = threading.Condition()
+        self._stream = None
+        self._start_lock = threading.Lock()
+        self.open_device = open_device     # False: samples only arrive through write()
+
+    # ----- device -----
+    def start(self):
+        """Open the input device once; later calls are no-ops."""
+        with self._start_lock:
+            if self._stream is not None:
+                return
+            import sounddevice as sd
+
+            self._stream = sd.RawInputStream(samplerate=self.samplerate, blocksize=self.blocksize,
+                                             dtype="int16", channels=1, callback=self._callback)
+            self._stream.start()
+            log.info("[Audio] Capturing at %d Hz, %d-frame blocks", self.samplerate, self.blocksize)
+
+    def stop(self):
+        with self._start_lock:
+            if self._stream is not None:
+                self._stream.stop()
+                self._stream.close()
+                self._stream = None
+
+    def _callback(self, indata, frames, time, status):
+        if status:
+            log.warning("[Audio] %s", status)
+        self.write(np.frombuffer(indata, dtype=np.int16))
+
+    # ----- ring -----
+    def write(self, pcm: np.ndarray):
+        """Append samples to the ring and wake waiting taps."""
+        total = len(pcm)
+        pcm = pcm[-self.capacity:]
+        n = len(pcm)
+        with self._cond:
+            start = (self._written + total - n) % self.capacity
+            first = min(n, self.capacity - start)
+            self._ring[start:start + first] = pcm[:first]
+            if first < n:
+                self._ring[:n - first] = pcm[first:]
+            self._written += total
+            self._cond.notify_all()
+
+    def _oldest(self) -> int:
+        return max(0, self._written - self.capacity)
+
+    def _read(self, tap: Tap, min_samples: int, max_samples: Optional[int],
+              timeout: Optional[float]) -> Optional[np.ndarray]:
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: tap.closed or self._written - tap.cursor >= min_samples, timeout)
+            if tap.closed or not ready:
+                return None
+            oldest = self._oldest()
+            if tap.cursor < oldest:
+                tap.overruns += 1
+                log.debug("[Audio] %s fell %d samples behind; skipping ahead", tap.name, oldest - tap.cursor)
+                tap.cursor = oldest
+            n = self._written - tap.cursor
+            if max_samples is not None:
+                n = min(n, max_samples)
+            start = tap.cursor % self.capacity
+            tap.cursor += n
+            if start + n <= self.capacity:
+                return self._ring[start:start + n]
+            return np.concatenate((self._ring[start:], self._ring[:start + n - self.capacity]))
+
+    # ----- consumers -----
+    def attach(self, name: str, preroll_s: float = 0.0) -> Tap:
+        """
+        New consumer starting at the current position, or preroll_s seconds
+        earlier. Opens the device on first use.
+        """
+        with self._cond:
+            cursor = max(self._written - int(preroll_s * self.samplerate), self._oldest())
+            tap = Tap(self, name, cursor)
+            self._taps.append(tap)
+        if self.open_device and self._stream is None:
+            try:
+                self.start()
+            except Exception:
+                self.detach(tap)
+                raise
+        return tap
+
+    def detach(self, tap: Tap):
+        """Stop a consumer. The device stays open for the others (and the next attach)."""
+        with self._cond:
+            tap.closed = True
+            if tap in self._taps:
+                self._taps.remove(tap)
+            self._cond.notify_all()
+
+    @property
+    def taps(self) -> list[str]:
+        with self._cond:
+            return [t.name for t in self._taps]
+
+
+_capture: Optional[AudioCapture] = None
+_capture_lock = threading.Lock()
+
+
+def get_audio_capture() -> AudioCapture:
+    global _capture
+    with _capture_lock:
+        if _capture is None:
+            _capture = AudioCapture()
+        return _capture
@@ -0,0 +1,219 @@
+# assistant/utils/dpkg_status.py
+"""
+In-process index of /var/lib/dpkg/status.
+
+The status file is parsed once into package -> (status, version, arch) and
+re-parsed only when its mtime or size changes, which dpkg does on every
+install or removal. Lookups are then dictionary reads. When the file cannot
+be read, queries fall back to a single batched dpkg-query call.
+"""
+import os
+import re
+import subprocess
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, Optional
+
+from assistant.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+DPKG_STATUS = "/var/lib/dpkg/status"
+_FIELDS = re.compile(r"^(Package|Status|Version|Architecture):[ \t]*(.*)$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class PackageStatus:
+    name: str
+    status: str             # e.g. "install ok installed", "deinstall ok config-files"
+    version: str = ""
+    architecture: str = ""
+
+    @property
+    def installed(self) -> bool:
+        # "want flag state": held packages ("hold ok installed") are installed too
+        parts = self.status.split()
+        return len(parts) == 3 and parts[2] == "installed"
+
+
+def _order(c: str) -> int:
+    if c == "~":
+        return -1
+    if c.isalpha():
+        return ord(c)
+    return ord(c) + 256
+
+
+def _compare_fragment(a: str, b: str) -> int:
+    """dpkg's verrevcmp: alternating non-digit (with ~ sorting first) and numeric runs."""
+    i = j = 0
+    while i < len(a) or j < len(b):
+        first_diff = 0
+        while (i < len(a) and not a[i].isdigit()) or (j < len(b) and not b[j].isdigit()):
+            ac = _order(a[i]) if i < len(a) and not a[i].isdigit() else 0
+            bc = _order(b[j]) if j < len(b) and not b[j].isdigit() else 0
+            if ac != bc:
+                return ac - bc
+            i += 1
+            j += 1
+        while i < len(a) and a[i] == "0":
+            i += 1
+        while j < len(b) and b[j] == "0":
+            j += 1
+        while i < len(a) and a[i].isdigit() and j < len(b) and b[j].isdigit():
+            if not first_diff:
+                first_diff = ord(a[i]) - ord(b[j])
+            i += 1
+            j += 1
+        if i < len(a) and a[i].isdigit():
+            return 1
+        if j < len(b) and b[j].isdigit():
+            return -1
+        if first_diff:
+            return first_diff
+    return 0
+
+
+def _split_version(v: str) -> tuple[int, str, str]:
+    epoch, _, rest = v.rpartition(":") if ":" in v else ("0", "", v)
+    upstream, _, revision = rest.rpartition("-") if "-" in rest else (rest, "", "")
+    return int(epoch or 0), upstream, revision
+
+
+def compare_versions(a: str, b: str) -> int:
+    """Debian version ordering: <0 if a < b, 0 if equal, >0 if a > b."""
+    ea, ua, ra = _split_version(a)
+    eb, ub, rb = _split_version(b)
+    if ea != eb:
+        return ea - eb
+    return _compare_fragment(ua, ub) or _compare_fragment(ra, rb)
+
+
+@lru_cache(maxsize=1)
+def native_architecture() -> str:
+    try:
+        r = subprocess.run(["dpkg", "--print-architecture"], text=True,
+                           stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        return r.stdout.strip()
+    except OSError:
+        return ""
+
+
+def parse_status(text: str) -> dict[str, PackageStatus]:
+    """
+    Parse a dpkg status file. Keys are "name:arch" for every entry, plus the
+    bare name for the native/"all" entry (or the only entry), which is what
+    dpkg-query -W name resolves to.
+    """
+    native = native_architecture()
+    index: dict[str, PackageStatus] = {}
+
+    def add(fields: dict):
+        name = fields.get("Package")
+        if not name:
+            return
+        arch = fields.get("Architecture", "")
+        entry = PackageStatus(name, fields.get("Status", ""), fields.get("Version", ""), arch)
+        if arch:
+            index[f"{name}:{arch}"] = entry
+        current = index.get(name)
+        if current is None or (arch in (native, "all") and current.architecture not in (native, "all")):
+            index[name] = entry
+
+    # One regex pass picks out the four fields we need; dpkg writes Package first in every stanza
+    fields: dict = {}
+    for key, value in _FIELDS.findall(text):
+        if key == "Package":
+            add(fields)
+            fields = {}
+        fields[key] = value.strip()
+    add(fields)
+    return index
+
+
+class DpkgStatusIndex:
+    def __init__(self, path: str = DPKG_STATUS):
+        self.path = path
+        self._index: dict[str, PackageStatus] = {}
+        self._sig: Optional[tuple[int, int]] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _refresh(self) -> bool:
+        """Re-read the status file if it changed. False when it cannot be read."""
+        try:
+            st = os.stat(self.path)
+            sig = (st.st_mtime_ns, st.st_size)
+            if sig == self._sig:
+                return True
+            with open(self.path, encoding="utf-8", errors="replace") as f:
+                text = f.read()
+        except OSError as e:
+            log.warning("[dpkg] Cannot read %s (%s), using dpkg-query", self.path, e)
+            return False
+        self._index = parse_status(text)
+        self._sig = sig
+        self.loads += 1
+        log.debug("[dpkg] Indexed %d entries from %s", len(self._index), self.path)
+        return True
+
+    def get(self, pkg: str) -> Optional[PackageStatus]:
+        return self.lookup([pkg]).get(pkg)
+
+    def lookup(self, pkgs: Iterable[str]) -> dict[str, Optional[PackageStatus]]:
+        pkgs = list(pkgs)
+        with self._lock:
+            if self._refresh():
+                return {p: self._index.get(p) for p in pkgs}
+        return dpkg_query(pkgs)
+
+    def is_installed(self, pkg: str) -> bool:
+        st = self.get(pkg)
+        return st is not None and st.installed
+
+    def are_installed(self, pkgs: Iterable[str]) -> dict[str, bool]:
+        return {p: st is not None and st.installed for p, st in self.lookup(pkgs).items()}
+
+    def version(self, pkg: str) -> Optional[str]:
+        st = self.get(pkg)
+        return st.version if st is not None and st.installed else None
+
+
+def dpkg_query(pkgs: list[str], admindir: Optional[str] = None) -> dict[str, Optional[PackageStatus]]:
+    """One dpkg-query call for all packages; unknown packages map to None."""
+    result: dict[str, Optional[PackageStatus]] = {p: None for p in pkgs}
+    if not pkgs:
+        return result
+    cmd = ["dpkg-query"]
+    if admindir:
+        cmd.append(f"--admindir={admindir}")
+    cmd += ["-W", "-f=${binary:Package}\\t${Package}\\t${Status}\\t${Version}\\t${Architecture}\\n", "--"] + pkgs
+    try:
+        r = subprocess.run(cmd, text=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except OSError as e:
+        log.error("[dpkg] dpkg-query failed: %s", e)
+        return result
+    for line in r.stdout.splitlines():
+        parts = line.split("\t")
+        if len(parts) != 5:
+            continue
+        binary, name, status, version, arch = parts
+        entry = PackageStatus(name, status, version, arch)
+        for key in (binary, name, f"{name}:{arch}"):
+            if key in result and result[key] is None:
+                result[key] = entry
+    return result
+
+
+_dpkg_index: Optional[DpkgStatusIndex] = None
+_dpkg_lock = threading.Lock()
+
+
+def get_dpkg_index() -> DpkgStatusIndex:
+    """Process-wide index, so every agent shares one parse of the status file."""
+    global _dpkg_index
+    with _dpkg_lock:
+        if _dpkg_index is None:
+            _dpkg_index = DpkgStatusIndex()
+        return _dpkg_index
@@ -0,0 +1,103 @@
+# assistant/utils/json_stream.py
+"""
+Incremental scanner for the first top-level JSON object in a token stream.
+
+LLMs often wrap their JSON in code fences or keep talking after it. The
+scanner skips everything before the first "{", tracks string/escape state so
+braces inside strings are ignored, and reports completion the moment the
+top-level object closes. Top-level string fields (e.g. "type") are exposed
+as soon as their value has been decoded, before the object is finished.
+"""
+import json
+from typing import Optional
+
+
+class JSONObjectScanner:
+    def __init__(self):
+        self.fields: dict = {}
+        self.done = False
+        self._buf: list[str] = []
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        # top-level key/value tracking
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._str_chars: Optional[list[str]] = None
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Consume a chunk of text. Returns True once the top-level object is complete;
+        anything after the closing brace is ignored.
+        """
+        if self.done:
+            return True
+
+        for ch in chunk:
+            if not self._started:
+                if ch != "{":
+                    continue
+                self._started = True
+
+            self._buf.append(ch)
+
+            if self._in_string:
+                if self._str_chars is not None:
+                    self._str_chars.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._str_chars is not None:
+                        self._end_top_level_string("".join(self._str_chars))
+                        self._str_chars = None
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    self._str_chars = ['"']
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.done = True
+                    return True
+            elif self._depth == 1:
+                if ch == ",":
+                    self._expect_key = True
+                    self._key = None
+                elif ch == ":":
+                    self._expect_key = False
+
+        return False
+
+    def _end_top_level_string(self, raw: str):
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        if self._expect_key:
+            self._key = value
+        elif self._key is not None:
+            self.fields[self._key] = value
+            self._key = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self._buf)
+
+    def value(self) -> Optional[dict]:
+        """Decoded object, or None if it is incomplete or invalid."""
+        if not self.done:
+            return None
+        try:
+            return json.loads(self.text)
+        except json.JSONDecodeError:
+            return None
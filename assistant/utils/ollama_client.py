@@ -0,0 +1,252 @@
+# assistant/utils/ollama_client.py
+"""
+Persistent, streaming client for the local Ollama server.
+
+A single requests.Session keeps the TCP connection to Ollama alive between
+turns. Responses are streamed and fed to a JSONObjectScanner; as soon as the
+top-level JSON object closes the connection is dropped, which makes Ollama
+abort the rest of the generation.
+
+Requests go through /api/chat with the fixed system prompt as its own
+message and an explicit keep_alive. As long as the model stays resident,
+Ollama reuses the already-evaluated system prefix and only evaluates the new
+user turn. The client remembers, per model, until when it expects the model
+to stay loaded.
+
+An {"error": ...} object from the server, also mid-stream, raises OllamaError.
+"""
+import json
+import re
+import threading
+import time
+from typing import Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from assistant.config.settings import settings
+from assistant.utils.json_stream import JSONObjectScanner
+from assistant.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+class OllamaError(RuntimeError):
+    """The server answered with an error instead of a completion."""
+
+
+def _check_error(chunk: dict):
+    if chunk.get("error"):
+        raise OllamaError(chunk["error"])
+
+
+def keep_alive_seconds(value) -> float:
+    """Seconds for an Ollama keep_alive value ("30m", "1h30m", 300, -1 = forever)."""
+    s = str(value).strip()
+    if s.startswith("-"):
+        return float("inf")
+    try:
+        return float(s)
+    except ValueError:
+        return sum(float(n) * _UNIT_SECONDS[u] for n, u in _DURATION.findall(s))
+
+
+class OllamaClient:
+    def __init__(self, url: str | None = None, timeout: int | None = None):
+        # OLLAMA_URL points at an endpoint (/api/generate); other endpoints share its host
+        self.base_url = (url or settings.OLLAMA_URL).split("/api/")[0].rstrip("/")
+        self.timeout = timeout or settings.LLM_TIMEOUT_SECONDS
+        self.keep_alive = settings.OLLAMA_KEEP_ALIVE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._resident: dict[str, float] = {}   # model -> monotonic time it is expected to unload
+        self._primed: set[tuple[str, str]] = set()
+        self._lock = threading.Lock()
+
+    # ----- residency tracking -----
+    def _mark_resident(self, model: str):
+        with self._lock:
+            self._resident[model] = time.monotonic() + keep_alive_seconds(self.keep_alive)
+
+    def is_resident(self, model: str | None = None, ask_server: bool = True) -> bool:
+        """
+        Whether the model is believed to be loaded. Falls back to /api/ps when
+        our own bookkeeping says it may have been unloaded.
+        """
+        model = model or settings.LLM_MODEL
+        with self._lock:
+            if self._resident.get(model, 0) > time.monotonic():
+                return True
+        if not ask_server:
+            return False
+        try:
+            r = self.session.get(f"{self.base_url}/api/ps", timeout=5)
+            r.raise_for_status()
+            names = {m.get("name") for m in r.json().get("models", [])}
+        except Exception as e:
+            log.debug("[Ollama] /api/ps failed: %s", e)
+            return False
+        if model in names:
+            self._mark_resident(model)
+            return True
+        with self._lock:
+            self._resident.pop(model, None)
+            self._primed = {p for p in self._primed if p[0] != model}
+        return False
+
+    def prime(self, system: str, model: str | None = None):
+        """
+        Load the model and evaluate the system prefix once, so the next real
+        request only pays for its user turn.
+        """
+        model = model or settings.LLM_MODEL
+        if (model, system) in self._primed and self.is_resident(model, ask_server=False):
+            return
+        payload = {
+            "model": model,
+            "messages": [{"role": "system", "content": system}],
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {"num_predict": 1},
+        }
+        try:
+            t0 = time.perf_counter()
+            r = self.session.post(f"{self.base_url}/api/chat", json=payload, timeout=self.timeout)
+            r.raise_for_status()
+            _check_error(r.json())
+        except Exception as e:
+            log.warning("[Ollama] Priming %s failed: %s", model, e)
+            return
+        self._mark_resident(model)
+        with self._lock:
+            self._primed.add((model, system))
+        log.info("[Ollama] %s primed in %.1fs", model, time.perf_counter() - t0)
+
+    def prime_in_background(self, system: str, model: str | None = None):
+        threading.Thread(target=self.prime, args=(system, model), name="ollama-prime", daemon=True).start()
+
+    # ----- requests -----
+    def _messages(self, system: str, user: str) -> list[dict]:
+        return [
+            {"role": "system", "content": system},
+            {"role": "user", "content": user},
+        ]
+
+    def chat_json(
+        self,
+        system: str,
+        user: str,
+        model: str | None = None,
+        on_field: Optional[Callable[[str, str], None]] = None,
+    ) -> tuple[Optional[dict], str]:
+        """
+        Stream a chat completion and stop at the end of the first JSON object.
+
+        on_field(name, value) is called once for each top-level string field
+        the moment it is decoded (e.g. "type"), before generation finishes.
+
+        Returns (parsed_object_or_None, raw_text). Raises on transport errors
+        and OllamaError on an error reported by the server.
+        """
+        model = model or settings.LLM_MODEL
+        payload = {
+            "model": model,
+            "messages": self._messages(system, user),
+            "stream": True,
+            "keep_alive": self.keep_alive,
+        }
+        return self._stream_json(
+            f"{self.base_url}/api/chat", payload, model,
+            lambda chunk: chunk.get("message", {}).get("content", ""),
+            on_field,
+        )
+
+    def chat_text(self, system: str, user: str, model: str | None = None) -> str:
+        """Non-streaming chat completion returning the assistant text."""
+        model = model or settings.LLM_MODEL
+        payload = {
+            "model": model,
+            "messages": self._messages(system, user),
+            "stream": False,
+            "keep_alive": self.keep_alive,
+        }
+        r = self.session.post(f"{self.base_url}/api/chat", json=payload, timeout=self.timeout)
+        r.raise_for_status()
+        body = r.json()
+        _check_error(body)
+        self._mark_resident(model)
+        return body.get("message", {}).get("content", "").strip()
+
+    def generate_json(
+        self,
+        prompt: str,
+        model: str | None = None,
+        on_field: Optional[Callable[[str, str], None]] = None,
+    ) -> tuple[Optional[dict], str]:
+        """Like chat_json(), for a raw prompt sent to /api/generate."""
+        model = model or settings.LLM_MODEL
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": self.keep_alive,
+        }
+        return self._stream_json(
+            f"{self.base_url}/api/generate", payload, model,
+            lambda chunk: chunk.get("response", ""),
+            on_field,
+        )
+
+    def _stream_json(self, url, payload, model, token_of, on_field):
+        scanner = JSONObjectScanner()
+        raw: list[str] = []
+        seen: set[str] = set()
+
+        with self.session.post(url, json=payload, stream=True, timeout=self.timeout) as r:
+            r.raise_for_status()
+            self._mark_resident(model)
+            for line in r.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                _check_error(chunk)
+                token = token_of(chunk)
+                raw.append(token)
+
+                complete = scanner.feed(token)
+                if on_field:
+                    for name, value in scanner.fields.items():
+                        if name not in seen and isinstance(value, str):
+                            seen.add(name)
+                            on_field(name, value)
+
+                if complete:
+                    # Closing the response drops the connection, which cancels generation.
+                    log.debug("[Ollama] JSON object closed, cancelling remaining generation")
+                    break
+                if chunk.get("done"):
+                    log.debug(
+                        "[Ollama] prompt_eval_count=%s load_duration=%s",
+                        chunk.get("prompt_eval_count"), chunk.get("load_duration"),
+                    )
+                    break
+
+        return scanner.value(), "".join(raw).strip()
+
+
+_client: Optional[OllamaClient] = None
+_client_lock = threading.Lock()
+
+
+def get_ollama_client() -> OllamaClient:
+    """Process-wide client so every caller shares one connection pool."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OllamaClient()
+        return _client
@@ -0,0 +1,236 @@
+# assistant/utils/output_capture.py
+"""
+Streaming, bounded-memory capture of command output.
+
+A command is read line by line as it runs. Only the first head_bytes and the
+last tail_bytes of output are kept (the tail in a ring of lines), together
+with total byte and line counts, so `journalctl` or `find /` cost the same
+memory as `ls`. Each line can be handed to an observer while the command is
+still running; the observer may end the command early by returning a
+reason.
+"""
+import os
+import select
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional
+
+from assistant.utils.logger import get_logger
+from assistant.utils.procfs import descendants
+
+log = get_logger(__name__)
+
+MAX_LINE_BYTES = 64 * 1024     # longer lines are read (and stored) in pieces
+KILL_DRAIN_S = 1.0             # after a kill, read what is left for at most this long
+
+
+class OutputBuffer:
+    """Keeps the head and the tail of a stream of lines within a byte budget."""
+
+    def __init__(self, head_bytes: int = 4096, tail_bytes: int = 4096):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.head: list[str] = []
+        self.tail: deque[str] = deque()
+        self._tail_sizes: deque[int] = deque()
+        self._head_size = 0
+        self._tail_size = 0
+        self.total_bytes = 0
+        self.total_lines = 0
+        self.dropped_bytes = 0
+        self.dropped_lines = 0
+
+    def append(self, line: str, nbytes: Optional[int] = None):
+        n = len(line.encode("utf-8", "replace")) if nbytes is None else nbytes
+        self.total_bytes += n
+        self.total_lines += 1
+        if not self.tail and self._head_size + n <= self.head_bytes:
+            self.head.append(line)
+            self._head_size += n
+            return
+        self.tail.append(line)
+        self._tail_sizes.append(n)
+        self._tail_size += n
+        # always keep the newest line, even if it alone exceeds the budget
+        while self._tail_size > self.tail_bytes and len(self.tail) > 1:
+            self.tail.popleft()
+            size = self._tail_sizes.popleft()
+            self._tail_size -= size
+            self.dropped_bytes += size
+            self.dropped_lines += 1
+
+    @property
+    def truncated(self) -> bool:
+        return self.dropped_lines > 0
+
+    def text(self) -> str:
+        parts = ["".join(self.head)]
+        if self.truncated:
+            parts.append(f"\n... [{self.dropped_lines} lines, {self.dropped_bytes} bytes omitted] ...\n")
+        parts.append("".join(self.tail))
+        return "".join(parts)
+
+
+@dataclass
+class CommandResult:
+    returncode: Optional[int]
+    output: str
+    total_bytes: int
+    total_lines: int
+    truncated: bool
+    timed_out: bool = False
+    aborted: Optional[str] = None   # reason given by the line observer
+    duration_s: float = 0.0
+
+
+class CommandStream:
+    """
+    Runs argv with stdout and stderr merged and yields output line by line.
+
+        stream = CommandStream(["bash", "-c", cmd], timeout=30, on_line=observer.watch)
+        for line in stream:
+            ...
+        stream.result   # CommandResult, available once iteration ends
+
+    on_line(line) -> Optional[str]: a non-empty return value stops the
+    command (its whole process group) and is recorded as result.aborted.
+    Iterating is optional; result runs the command to completion itself.
+
+    own_group=False keeps the command in our session so sudo can still prompt
+    on the terminal; a kill then signals the process tree found in /proc. What
+    runs as root under sudo can't be signalled, so reading also stops
+    KILL_DRAIN_S after the kill, even if such a process still holds the pipe.
+    """
+
+    def __init__(
+        self,
+        argv: list[str],
+        timeout: Optional[float] = 30,
+        on_line: Optional[Callable[[str], Optional[str]]] = None,
+        head_bytes: int = 4096,
+        tail_bytes: int = 4096,
+        own_group: bool = True,
+    ):
+        self.argv = argv
+        self.own_group = own_group
+        self.timeout = timeout
+        self.on_line = on_line
+        self.buffer = OutputBuffer(head_bytes, tail_bytes)
+        self._result: Optional[CommandResult] = None
+        self._timed_out = False
+        self._aborted: Optional[str] = None
+        self._started = False
+        self._stop_reading_at: Optional[float] = None
+        self._eof = False
+
+    def _kill(self, proc: subprocess.Popen):
+        if self._stop_reading_at is None:
+            self._stop_reading_at = time.monotonic() + KILL_DRAIN_S
+        if self.own_group:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            return
+        # the tree is listed before anything is killed, while every parent link is intact
+        for pid in [proc.pid, *descendants(proc.pid)]:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+    def _read_lines(self, fd: int) -> Iterator[bytes]:
+        """
+        Lines from fd, at most MAX_LINE_BYTES each. Ends at EOF, or without it
+        once the command was killed and the drain time is over.
+        """
+        pending, start = b"", 0
+        while True:
+            if self._stop_reading_at is not None and time.monotonic() >= self._stop_reading_at:
+                return
+            ready, _, _ = select.select([fd], [], [], 0.1)
+            if not ready:
+                continue
+            chunk = os.read(fd, MAX_LINE_BYTES)
+            if not chunk:
+                if start < len(pending):
+                    yield pending[start:]
+                self._eof = True
+                return
+            pending = pending[start:] + chunk
+            start = 0
+            while True:
+                end = pending.find(b"\n", start, start + MAX_LINE_BYTES)
+                if end >= 0:
+                    end += 1
+                elif len(pending) - start >= MAX_LINE_BYTES:
+                    end = start + MAX_LINE_BYTES
+                else:
+                    break
+                yield pending[start:end]
+                start = end
+
+    def _on_timeout(self, proc: subprocess.Popen):
+        self._timed_out = True
+        log.warning("[Capture] %s timed out after %ss", self.argv, self.timeout)
+        self._kill(proc)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._started:
+            raise RuntimeError("CommandStream can only be iterated once")
+        self._started = True
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(
+            self.argv,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=self.own_group,     # own process group, so a kill reaches pipelines too
+        )
+        timer = None
+        if self.timeout:
+            timer = threading.Timer(self.timeout, self._on_timeout, args=(proc,))
+            timer.daemon = True
+            timer.start()
+        try:
+            for raw in self._read_lines(proc.stdout.fileno()):
+                line = raw.decode("utf-8", "replace")
+                self.buffer.append(line, len(raw))
+                if self.on_line and self._aborted is None:
+                    reason = self.on_line(line)
+                    if reason:
+                        self._aborted = reason
+                        log.info("[Capture] stopping %s early: %s", self.argv, reason)
+                        self._kill(proc)
+                yield line
+        finally:
+            if timer:
+                timer.cancel()
+            if not self._eof and self._aborted is None:
+                # the consumer stopped iterating before the command finished
+                self._kill(proc)
+            proc.stdout.close()
+            returncode = proc.wait()
+            self._result = CommandResult(
+                returncode=returncode,
+                output=self.buffer.text(),
+                total_bytes=self.buffer.total_bytes,
+                total_lines=self.buffer.total_lines,
+                truncated=self.buffer.truncated,
+                timed_out=self._timed_out,
+                aborted=self._aborted,
+                duration_s=time.perf_counter() - t0,
+            )
+
+    @property
+    def result(self) -> CommandResult:
+        if self._result is None:
+            if self._started:
+                raise RuntimeError("result is only available after iteration has finished")
+            for _ in self:
+                pass
+        return self._result
@@ -0,0 +1,323 @@
+# assistant/utils/procfs.py
+"""
+In-process process table sampler reading /proc directly.
+
+/proc/<pid>/stat is kept open between samples and re-read with pread(),
+so a sample costs one listdir plus one read per process instead of a ps
+fork. CPU% is computed from the utime+stime delta since the previous sample
+(the lifetime average, like ps, for processes seen for the first time).
+The cmdline and owner of a process are read once and cached.
+"""
+import heapq
+import os
+import pwd
+import re
+import resource
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from assistant.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+CLK_TCK = os.sysconf("SC_CLK_TCK")
+PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024
+MAX_OPEN_FDS = 1024      # hard cap; beyond the budget, stat files are opened per read instead
+FD_HEADROOM = 32         # descriptors always left for sockets, pipes, sqlite ...
+_CONTROL = re.compile(r"[\x00-\x1f\x7f]")
+
+
+@dataclass
+class ProcessRow:
+    pid: int
+    user: str
+    cpu_percent: float
+    mem_percent: float
+    vsz_kb: int
+    rss_kb: int
+    tty: str
+    stat: str
+    start: str
+    cpu_time_s: float
+    command: str
+
+    def ps_line(self) -> str:
+        """Format like a line of `ps aux`."""
+        minutes, seconds = divmod(int(self.cpu_time_s), 60)
+        return (
+            f"{self.user[:8]:<8} {self.pid:>7} {self.cpu_percent:>4.1f} {self.mem_percent:>4.1f} "
+            f"{self.vsz_kb:>6} {self.rss_kb:>5} {self.tty:<8} {self.stat:<4} {self.start:>5} "
+            f"{minutes:>3}:{seconds:02d} {self.command}"
+        )
+
+
+PS_HEADER = "USER         PID %CPU %MEM    VSZ   RSS TTY      STAT START   TIME COMMAND"
+
+
+def render_ps(rows: Iterable[ProcessRow]) -> str:
+    return "\n".join([PS_HEADER] + [r.ps_line() for r in rows])
+
+
+def _tty_name(tty_nr: int) -> str:
+    if tty_nr == 0:
+        return "?"
+    major, minor = (tty_nr >> 8) & 0xFFF, (tty_nr & 0xFF) | ((tty_nr >> 12) & 0xFFF00)
+    if major == 136:
+        return f"pts/{minor}"
+    if major == 4:
+        return f"tty{minor}"
+    return "?"
+
+
+def _read_file(path: str) -> str:
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8", "replace")
+
+
+def rss_kb(pid="self", proc: str = "/proc") -> int:
+    """Resident set size of a process in kB (0 if unknown)."""
+    try:
+        with open(f"{proc}/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def fd_budget(soft_limit: Optional[int] = None) -> int:
+    """
+    How many /proc stat files the sampler may keep open: a quarter of the
+    RLIMIT_NOFILE soft limit minus FD_HEADROOM, at most MAX_OPEN_FDS.
+    """
+    if soft_limit is None:
+        soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    if soft_limit == resource.RLIM_INFINITY:
+        return MAX_OPEN_FDS
+    return max(0, min(MAX_OPEN_FDS, soft_limit // 4 - FD_HEADROOM))
+
+
+def proc_state(pid: int, proc: str = "/proc") -> Optional[tuple[str, int]]:
+    """(state letter, start time in ticks) of a process, or None if it is gone."""
+    try:
+        with open(f"{proc}/{pid}/stat", "rb") as f:
+            text = f.read().decode("utf-8", "replace")
+    except OSError:
+        return None
+    f = text[text.rfind(")") + 2:].split()
+    return f[0], int(f[19])
+
+
+def descendants(pid: int, proc: str = "/proc") -> list[int]:
+    """Children, grandchildren ... of pid, parents before their children."""
+    children: dict[int, list[int]] = {}
+    for d in os.listdir(proc):
+        if not d.isdigit():
+            continue
+        try:
+            text = _read_file(f"{proc}/{d}/stat")
+        except OSError:
+            continue
+        ppid = int(text[text.rfind(")") + 2:].split()[1])
+        children.setdefault(ppid, []).append(int(d))
+    out, todo = [], [pid]
+    while todo:
+        kids = children.get(todo.pop(), [])
+        out.extend(kids)
+        todo.extend(kids)
+    return out
+
+
+@dataclass
+class _Proc:
+    fd: Optional[int]
+    starttime: int
+    user: str
+    command: str
+    last_ticks: int
+    last_time: float
+
+
+class ProcSampler:
+    def __init__(self, proc: str = "/proc", max_open_fds: Optional[int] = None):
+        self.proc = proc
+        self.max_open_fds = fd_budget() if max_open_fds is None else max_open_fds
+        self._procs: dict[int, _Proc] = {}
+        self._users: dict[int, str] = {}
+        self._open_fds = 0
+        self._lock = threading.Lock()
+        self._boot_time = self._read_boot_time()
+        self._mem_total_kb = self._read_mem_total()
+
+    # ----- helpers -----
+    def _read_boot_time(self) -> float:
+        for line in _read_file(f"{self.proc}/stat").splitlines():
+            if line.startswith("btime"):
+                return float(line.split()[1])
+        return time.time() - time.monotonic()
+
+    def _read_mem_total(self) -> int:
+        for line in _read_file(f"{self.proc}/meminfo").splitlines():
+            if line.startswith("MemTotal:"):
+                return int(line.split()[1])
+        return 0
+
+    def _user(self, uid: int) -> str:
+        name = self._users.get(uid)
+        if name is None:
+            try:
+                name = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                name = str(uid)
+            self._users[uid] = name
+        return name
+
+    def _start(self, starttime: int) -> str:
+        started = self._boot_time + starttime / CLK_TCK
+        if time.time() - started < 24 * 3600:
+            return time.strftime("%H:%M", time.localtime(started))
+        return time.strftime("%b%d", time.localtime(started))
+
+    def _read_stat(self, pid: int, entry: Optional[_Proc]) -> Optional[bytes]:
+        try:
+            if entry is not None and entry.fd is not None:
+                return os.pread(entry.fd, 4096, 0)
+            with open(f"{self.proc}/{pid}/stat", "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _new_proc(self, pid: int, starttime: int, comm: str) -> Optional[_Proc]:
+        try:
+            uid = os.stat(f"{self.proc}/{pid}").st_uid
+            raw = _read_file(f"{self.proc}/{pid}/cmdline")
+        except OSError:
+            return None
+        # like ps, show control characters (newlines in arguments) as "?"
+        args = _CONTROL.sub("?", raw.rstrip("\0").replace("\0", " "))
+        fd = None
+        if self._open_fds < self.max_open_fds:
+            try:
+                fd = os.open(f"{self.proc}/{pid}/stat", os.O_RDONLY)
+                self._open_fds += 1
+            except OSError:
+                fd = None
+        return _Proc(fd, starttime, self._user(uid), args or f"[{comm}]", 0, 0.0)
+
+    def _forget(self, pid: int):
+        entry = self._procs.pop(pid, None)
+        if entry is not None and entry.fd is not None:
+            self._open_fds -= 1
+            try:
+                os.close(entry.fd)
+            except OSError:
+                pass
+
+    # ----- sampling -----
+    def sample(self) -> list[ProcessRow]:
+        """One row per live process."""
+        with self._lock:
+            now = time.monotonic()
+            uptime = time.time() - self._boot_time
+            pids = [int(d) for d in os.listdir(self.proc) if d.isdigit()]
+            live = set(pids)
+            for pid in [p for p in self._procs if p not in live]:
+                self._forget(pid)
+
+            rows = []
+            for pid in pids:
+                entry = self._procs.get(pid)
+                data = self._read_stat(pid, entry)
+                if data is None:
+                    self._forget(pid)
+                    continue
+                text = data.decode("utf-8", "replace")
+                # comm may contain spaces and parentheses; the last ")" ends it
+                lp, rp = text.find("("), text.rfind(")")
+                comm = text[lp + 1:rp]
+                f = text[rp + 2:].split()
+                starttime = int(f[19])
+                if entry is not None and entry.starttime != starttime:
+                    self._forget(pid)        # pid was reused
+                    entry = None
+                if entry is None:
+                    entry = self._new_proc(pid, starttime, comm)
+                    if entry is None:
+                        continue
+                    self._procs[pid] = entry
+
+                ticks = int(f[11]) + int(f[12])
+                if entry.last_time:
+                    elapsed = now - entry.last_time
+                    cpu = 100.0 * (ticks - entry.last_ticks) / CLK_TCK / elapsed if elapsed > 0 else 0.0
+                else:
+                    alive = uptime - starttime / CLK_TCK
+                    cpu = 100.0 * ticks / CLK_TCK / alive if alive > 0 else 0.0
+                entry.last_ticks, entry.last_time = ticks, now
+
+                rss_kb = int(f[21]) * PAGE_KB
+                state = f[0]
+                nice, threads = int(f[16]), int(f[17])
+                if nice < 0:
+                    state += "<"
+                elif nice > 0:
+                    state += "N"
+                if int(f[3]) == pid:
+                    state += "s"
+                if threads > 1:
+                    state += "l"
+                if int(f[5]) == int(f[2]) and int(f[4]) != 0:
+                    state += "+"
+
+                rows.append(ProcessRow(
+                    pid=pid,
+                    user=entry.user,
+                    cpu_percent=cpu,
+                    mem_percent=100.0 * rss_kb / self._mem_total_kb if self._mem_total_kb else 0.0,
+                    vsz_kb=int(f[20]) // 1024,
+                    rss_kb=rss_kb,
+                    tty=_tty_name(int(f[4])),
+                    stat=state,
+                    start=self._start(starttime),
+                    cpu_time_s=ticks / CLK_TCK,
+                    command=entry.command,
+                ))
+            return rows
+
+    def top(self, n: int = 10, by: str = "mem", match: Optional[str] = None) -> list[ProcessRow]:
+        """The n processes using the most memory ("mem") or CPU ("cpu")."""
+        rows = self.sample()
+        if match:
+            pattern = re.compile(match)
+            rows = [r for r in rows if pattern.search(r.command)]
+        key = (lambda r: r.cpu_percent) if by == "cpu" else (lambda r: r.rss_kb)
+        return heapq.nlargest(n, rows, key=key)
+
+    def pids_matching(self, pattern: str) -> list[int]:
+        """
+        Like `pgrep -f`: PIDs whose command line (or name, for kernel threads)
+        matches the regex. Our own process is never included.
+        """
+        regex = re.compile(pattern)
+        me = os.getpid()
+        out = []
+        for d in os.listdir(self.proc):
+            if not d.isdigit() or int(d) == me:
+                continue
+            try:
+                cmdline = _read_file(f"{self.proc}/{d}/cmdline").rstrip("\0").replace("\0", " ")
+                if not cmdline:
+                    cmdline = _read_file(f"{self.proc}/{d}/comm").strip()
+            except OSError:
+                continue
+            if regex.search(cmdline):
+                out.append(int(d))
+        return out
+
+    def close(self):
+        with self._lock:
+            for pid in list(self._procs):
+                self._forget(pid)
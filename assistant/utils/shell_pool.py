@@ -0,0 +1,241 @@
+# assistant/utils/shell_pool.py
+"""
+Pool of long-lived bash workers.
+
+Each worker is a `bash --noprofile --norc` started once. A command is sent
+to it as a background job in a subshell, framed by sentinel lines that carry
+the job's PID and its exit code:
+
+    ( echo <PID sentinel>$BASHPID; eval '<cmd>' ) </dev/null 2>&1 &
+    wait $!
+    echo <DONE sentinel>$?
+
+The job prints its own PID before running the command, so the PID sentinel
+is always the first line of its output, whatever the command writes.
+
+The worker runs with job control (set -m), so every job is its own process
+group; a timeout or an early abort kills that group and leaves the worker
+alive. Commands still get bash -c semantics: `cd`, `exit` or variables do not
+leak into the next command. Workers are replaced after SHELL_POOL_MAX_USES
+commands, when they die, or when a killed job does not report back.
+"""
+import os
+import queue
+import shlex
+import signal
+import subprocess
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from assistant.config.settings import settings
+from assistant.utils.logger import get_logger
+from assistant.utils.output_capture import MAX_LINE_BYTES, CommandResult, OutputBuffer
+
+log = get_logger(__name__)
+
+# How long a killed job may take to report its exit code before the worker is discarded
+KILL_GRACE_S = 2.0
+
+
+class ShellWorker:
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            ["bash", "--noprofile", "--norc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,     # job notifications; job output is merged into stdout
+            start_new_session=True,
+        )
+        self.uses = 0
+        self.broken = False
+        self._send("set -m\n")
+
+    def _send(self, script: str):
+        self.proc.stdin.write(script.encode())
+        self.proc.stdin.flush()
+
+    def alive(self) -> bool:
+        return not self.broken and self.proc.poll() is None
+
+    @staticmethod
+    def _killpg(pgid: int):
+        try:
+            os.killpg(pgid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    def _discard(self):
+        self.broken = True
+        log.warning("[ShellPool] worker %d unresponsive, discarding it", self.proc.pid)
+        self.close()
+
+    def close(self):
+        self._killpg(self.proc.pid)
+        self.proc.wait()
+
+    def run(
+        self,
+        cmd: str,
+        timeout: Optional[float] = 30,
+        on_line: Optional[Callable[[str], Optional[str]]] = None,
+        buffer: Optional[OutputBuffer] = None,
+    ) -> CommandResult:
+        buffer = buffer or OutputBuffer()
+        token = uuid.uuid4().hex
+        pid_mark = f"__LEO_PID_{token}_".encode()
+        done_mark = f"__LEO_DONE_{token}_".encode()
+        self.uses += 1
+
+        t0 = time.perf_counter()
+        self._send(
+            f"( echo {pid_mark.decode()}$BASHPID; eval {shlex.quote(cmd)} ) </dev/null 2>&1 &\n"
+            f"wait $!\n"
+            f"echo {done_mark.decode()}$?\n"
+        )
+
+        state = {"job_pid": None, "kill": False, "timed_out": False, "aborted": None}
+        lock = threading.Lock()
+        guard = threading.Timer(KILL_GRACE_S, self._discard)
+        guard.daemon = True
+
+        def kill_job():
+            with lock:
+                if state["kill"]:
+                    return
+                state["kill"] = True
+                pid = state["job_pid"]
+            if pid is not None:
+                self._killpg(pid)
+            # a job that survives its kill would block the read forever
+            guard.start()
+
+        def on_timeout():
+            state["timed_out"] = True
+            log.warning("[ShellPool] %r timed out after %ss", cmd, timeout)
+            kill_job()
+
+        timer = threading.Timer(timeout, on_timeout) if timeout else None
+        if timer:
+            timer.daemon = True
+            timer.start()
+        returncode = None
+        try:
+            while True:
+                raw = self.proc.stdout.readline(MAX_LINE_BYTES)
+                if not raw:
+                    self.broken = True
+                    break
+
+                if raw.startswith(pid_mark):
+                    with lock:
+                        state["job_pid"] = pid = int(raw[len(pid_mark):].strip())
+                        killed = state["kill"]
+                    if killed:
+                        self._killpg(pid)
+                    continue
+
+                # output without a trailing newline shares a line with the sentinel
+                idx = raw.find(done_mark)
+                if idx >= 0:
+                    returncode = int(raw[idx + len(done_mark):].strip() or -1)
+                    raw = raw[:idx]
+                    if not raw:
+                        break
+
+                line = raw.decode("utf-8", "replace")
+                buffer.append(line, len(raw))
+                if on_line and state["aborted"] is None:
+                    reason = on_line(line)
+                    if reason:
+                        state["aborted"] = reason
+                        log.info("[ShellPool] stopping %r early: %s", cmd, reason)
+                        kill_job()
+                if returncode is not None:
+                    break
+        finally:
+            with lock:
+                state["kill"] = True     # a late timeout must not touch the next command
+            if timer:
+                timer.cancel()
+            guard.cancel()
+
+        return CommandResult(
+            returncode=returncode,
+            output=buffer.text(),
+            total_bytes=buffer.total_bytes,
+            total_lines=buffer.total_lines,
+            truncated=buffer.truncated,
+            timed_out=state["timed_out"],
+            aborted=state["aborted"],
+            duration_s=time.perf_counter() - t0,
+        )
+
+
+class ShellPool:
+    """
+    Up to `size` workers, created on first use. run() borrows an idle worker
+    (blocking while all of them are busy) and returns it afterwards.
+    """
+
+    def __init__(self, size: int = 2, max_uses: int = 200):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self._idle: queue.LifoQueue[ShellWorker] = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    @contextmanager
+    def worker(self):
+        self._slots.acquire()
+        w = None
+        try:
+            try:
+                w = self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            if w is None or not w.alive():
+                if w is not None:
+                    w.close()
+                w = ShellWorker()
+            yield w
+        finally:
+            if w is not None:
+                if w.alive() and w.uses < self.max_uses:
+                    self._idle.put(w)
+                else:
+                    log.debug("[ShellPool] recycling worker after %d commands", w.uses)
+                    w.close()
+            self._slots.release()
+
+    def run(
+        self,
+        cmd: str,
+        timeout: Optional[float] = 30,
+        on_line: Optional[Callable[[str], Optional[str]]] = None,
+        head_bytes: int = 4096,
+        tail_bytes: int = 4096,
+    ) -> CommandResult:
+        with self.worker() as w:
+            return w.run(cmd, timeout, on_line, OutputBuffer(head_bytes, tail_bytes))
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+_pool: Optional[ShellPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_shell_pool() -> ShellPool:
+    """Process-wide pool shared by every agent that runs shell commands."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ShellPool(settings.SHELL_POOL_SIZE, settings.SHELL_POOL_MAX_USES)
+        return _pool
@@ -0,0 +1,183 @@
+# assistant/utils/sysinfo.py
+"""
+Disk and memory usage from statvfs(), /proc/mounts and /proc/meminfo.
+
+Returns typed records instead of `df -h` / `free -h` text, without starting a
+process. Text renderers reproduce the familiar tables for the console, and
+the speak_* helpers give a one-sentence summary that fits TTS.
+"""
+import math
+import os
+from dataclasses import dataclass
+from typing import Iterable
+
+# Filesystems that do not describe storage a user cares about
+PSEUDO_FS = {
+    "proc", "sysfs", "devtmpfs", "devpts", "tmpfs", "cgroup", "cgroup2", "securityfs", "pstore",
+    "debugfs", "tracefs", "configfs", "fusectl", "mqueue", "hugetlbfs", "bpf", "autofs", "binfmt_misc",
+    "efivarfs", "rpc_pipefs", "nsfs", "ramfs", "squashfs", "fuse.gvfsd-fuse", "fuse.portal",
+}
+
+
+@dataclass
+class MountUsage:
+    device: str
+    mountpoint: str
+    fstype: str
+    total: int      # bytes
+    used: int
+    available: int  # available to unprivileged users, like df's "Avail"
+
+    @property
+    def percent(self) -> float:
+        # df's Use%: used / (used + available), root reserve excluded
+        denom = self.used + self.available
+        return 100.0 * self.used / denom if denom else 0.0
+
+
+@dataclass
+class MemoryInfo:
+    total: int      # bytes
+    free: int
+    available: int
+    buffers_cache: int
+    shared: int
+    swap_total: int
+    swap_free: int
+
+    @property
+    def used(self) -> int:
+        # what free(1) reports as "used" (procps 4: everything that is not available)
+        return max(0, self.total - self.available)
+
+    @property
+    def swap_used(self) -> int:
+        return self.swap_total - self.swap_free
+
+
+def _unescape(field: str) -> str:
+    # /proc/mounts escapes space, tab, newline and backslash as \\ooo
+    if "\\" not in field:
+        return field
+    out, i = [], 0
+    while i < len(field):
+        if field[i] == "\\" and field[i + 1:i + 4].isdigit() and len(field[i + 1:i + 4]) == 3:
+            out.append(chr(int(field[i + 1:i + 4], 8)))
+            i += 4
+        else:
+            out.append(field[i])
+            i += 1
+    return "".join(out)
+
+
+def disk_usage(mounts_file: str = "/proc/mounts", include_pseudo: bool = False) -> list[MountUsage]:
+    """Usage of every real mounted filesystem, one entry per device."""
+    result: list[MountUsage] = []
+    seen: set = set()
+    with open(mounts_file) as f:
+        lines = f.read().splitlines()
+    for line in lines:
+        parts = line.split()
+        if len(parts) < 3:
+            continue
+        device, mountpoint, fstype = _unescape(parts[0]), _unescape(parts[1]), parts[2]
+        if not include_pseudo and fstype in PSEUDO_FS:
+            continue
+        try:
+            st = os.statvfs(mountpoint)
+        except OSError:
+            continue
+        if st.f_blocks == 0:
+            continue
+        # bind mounts and btrfs subvolumes repeat the same filesystem
+        key = (device, st.f_fsid) if hasattr(st, "f_fsid") else (device,)
+        if key in seen:
+            continue
+        seen.add(key)
+        total = st.f_blocks * st.f_frsize
+        used = (st.f_blocks - st.f_bfree) * st.f_frsize
+        result.append(MountUsage(device, mountpoint, fstype, total, used, st.f_bavail * st.f_frsize))
+    return result
+
+
+def memory_info(meminfo_file: str = "/proc/meminfo") -> MemoryInfo:
+    values: dict[str, int] = {}
+    with open(meminfo_file) as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            parts = rest.split()
+            if parts:
+                values[key] = int(parts[0]) * (1024 if len(parts) > 1 else 1)
+    free = values.get("MemFree", 0)
+    cache = values.get("Buffers", 0) + values.get("Cached", 0) + values.get("SReclaimable", 0)
+    return MemoryInfo(
+        total=values.get("MemTotal", 0),
+        free=free,
+        available=values.get("MemAvailable", free + cache),
+        buffers_cache=cache,
+        shared=values.get("Shmem", 0),
+        swap_total=values.get("SwapTotal", 0),
+        swap_free=values.get("SwapFree", 0),
+    )
+
+
+# ----- rendering -----
+
+def human(n: float) -> str:
+    """Sizes the way `df -h` / `free -h` print them (powers of 1024)."""
+    for unit in ("B", "K", "M", "G", "T", "P"):
+        if abs(n) < 1024 or unit == "P":
+            if unit == "B":
+                return f"{int(n)}B"
+            return f"{n:.1f}{unit}" if abs(n) < 10 else f"{n:.0f}{unit}"
+        n /= 1024
+    return f"{n}"
+
+
+def _spoken_size(n: float) -> str:
+    gb = n / 1024 ** 3
+    if gb >= 1:
+        return f"{gb:.1f} gigabytes" if gb < 10 else f"{gb:.0f} gigabytes"
+    return f"{n / 1024 ** 2:.0f} megabytes"
+
+
+def render_df(mounts: Iterable[MountUsage]) -> str:
+    rows = [("Filesystem", "Size", "Used", "Avail", "Use%", "Mounted on")]
+    for m in mounts:
+        rows.append((m.device, human(m.total), human(m.used), human(m.available), f"{math.ceil(m.percent)}%", m.mountpoint))
+    width = max(len(r[0]) for r in rows)
+    return "\n".join(f"{r[0]:<{width}} {r[1]:>5} {r[2]:>5} {r[3]:>5} {r[4]:>4} {r[5]}" for r in rows)
+
+
+def render_free(mem: MemoryInfo) -> str:
+    return "\n".join([
+        f"{'':<6}{'total':>11}{'used':>12}{'free':>12}{'shared':>12}{'buff/cache':>12}{'available':>12}",
+        f"{'Mem:':<6}{human(mem.total):>11}{human(mem.used):>12}{human(mem.free):>12}"
+        f"{human(mem.shared):>12}{human(mem.buffers_cache):>12}{human(mem.available):>12}",
+        f"{'Swap:':<6}{human(mem.swap_total):>11}{human(mem.swap_used):>12}{human(mem.swap_free):>12}",
+    ])
+
+
+def speak_disk(mounts: list[MountUsage], limit: int = 3) -> str:
+    """e.g. "The root disk is 42% full with 51 gigabytes free. /home is 80% full ..." """
+    if not mounts:
+        return "I couldn't find any disks."
+    # the root filesystem first, then the fullest ones
+    ordered = sorted(mounts, key=lambda m: (m.mountpoint != "/", -m.percent))[:limit]
+    parts = []
+    for m in ordered:
+        name = "The root disk" if m.mountpoint == "/" else m.mountpoint
+        parts.append(f"{name} is {m.percent:.0f}% full with {_spoken_size(m.available)} free")
+    text = ". ".join(parts) + "."
+    if len(mounts) > limit:
+        text += f" {len(mounts) - limit} more on the console."
+    return text
+
+
+def speak_memory(mem: MemoryInfo) -> str:
+    text = (f"{_spoken_size(mem.used)} of {_spoken_size(mem.total)} memory in use, "
+            f"{_spoken_size(mem.available)} available.")
+    if mem.swap_total:
+        text += f" Swap is {100.0 * mem.swap_used / mem.swap_total:.0f}% used."
+    return text
+
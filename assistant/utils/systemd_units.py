@@ -0,0 +1,217 @@
+# assistant/utils/systemd_units.py
+"""
+Cached index of systemd service units.
+
+One `systemctl list-units --output=json` call fills the index; it is redone
+only after SYSTEMD_INDEX_TTL. Status questions are answered from the cache
+while the entry is younger than SYSTEMD_STATUS_TTL, otherwise the units in
+question are refreshed together with a single `systemctl show`. Spoken
+names ("network manager", "nginx server") are resolved to unit names before
+anything is run.
+"""
+import difflib
+import json
+import re
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+
+from assistant.config.settings import settings
+from assistant.utils.logger import get_logger
+
+log = get_logger(__name__)
+
+SHOW_PROPERTIES = "Id,LoadState,ActiveState,SubState,Description,UnitFileState"
+# words people add when naming a service out loud
+_FILLER = {"service", "services", "server", "daemon", "the"}
+
+
+@dataclass
+class UnitInfo:
+    name: str
+    load: str = ""
+    active: str = ""
+    sub: str = ""
+    description: str = ""
+    unit_file_state: str = ""
+    updated: float = 0.0    # monotonic time of the last refresh
+
+    def summary(self) -> str:
+        """e.g. "nginx.service is active (running)"."""
+        if self.load == "not-found":
+            return f"{self.name} is not installed"
+        return f"{self.name} is {self.active or 'unknown'}" + (f" ({self.sub})" if self.sub else "")
+
+
+def _run(argv: list[str]) -> tuple[int, str]:
+    try:
+        r = subprocess.run(argv, text=True, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except OSError as e:
+        log.error("[systemd] %s failed: %s", argv[:2], e)
+        return 1, ""
+    return r.returncode, r.stdout
+
+
+def _spoken_key(text: str) -> str:
+    words = re.split(r"[\s_\-]+", text.lower().removesuffix(".service"))
+    return "".join(w for w in words if w and w not in _FILLER)
+
+
+class SystemdUnitIndex:
+    def __init__(self, run: Callable[[list[str]], tuple[int, str]] = _run,
+                 ttl: Optional[float] = None, status_ttl: Optional[float] = None):
+        self.run = run
+        self.ttl = settings.SYSTEMD_INDEX_TTL if ttl is None else ttl
+        self.status_ttl = settings.SYSTEMD_STATUS_TTL if status_ttl is None else status_ttl
+        self.units: dict[str, UnitInfo] = {}
+        self._unit_files: set[str] = set()
+        self._unit_files_at = 0.0
+        self._listed_at = 0.0
+        self._lock = threading.RLock()
+
+    # ----- loading -----
+    def _list_units(self):
+        rc, out = self.run(["systemctl", "list-units", "--type=service", "--all", "--output=json", "--no-pager"])
+        rows = None
+        if rc == 0 and out.strip().startswith("["):
+            try:
+                rows = json.loads(out)
+            except ValueError:
+                rows = None
+        if rows is None:
+            # systemd older than 246 has no JSON output
+            rc, out = self.run(["systemctl", "list-units", "--type=service", "--all", "--plain", "--no-legend", "--no-pager"])
+            rows = []
+            for line in out.splitlines():
+                parts = line.split(None, 4)
+                if len(parts) >= 4:
+                    rows.append({"unit": parts[0], "load": parts[1], "active": parts[2], "sub": parts[3],
+                                 "description": parts[4] if len(parts) > 4 else ""})
+        now = time.monotonic()
+        units = {}
+        for row in rows:
+            name = row.get("unit", "")
+            if name.endswith(".service"):
+                units[name] = UnitInfo(name, row.get("load", ""), row.get("active", ""), row.get("sub", ""),
+                                       row.get("description", ""), updated=now)
+        self.units = units
+        self._listed_at = now
+        log.debug("[systemd] Indexed %d service units", len(units))
+
+    def _list_unit_files(self):
+        """Installed but never loaded units (e.g. disabled ones) only show up here."""
+        rc, out = self.run(["systemctl", "list-unit-files", "--type=service", "--plain", "--no-legend", "--no-pager"])
+        self._unit_files = {line.split()[0] for line in out.splitlines() if line.strip()}
+        self._unit_files_at = time.monotonic()
+
+    def _ensure(self):
+        if not self._listed_at or time.monotonic() - self._listed_at > self.ttl:
+            self._list_units()
+
+    def refresh(self, names: Iterable[str]):
+        """Re-read the given units with one `systemctl show` call."""
+        names = list(dict.fromkeys(names))
+        if not names:
+            return
+        rc, out = self.run(["systemctl", "show", "--no-pager", "-p", SHOW_PROPERTIES, "--"] + names)
+        now = time.monotonic()
+        with self._lock:
+            for block in out.split("\n\n"):
+                props = dict(line.split("=", 1) for line in block.splitlines() if "=" in line)
+                name = props.get("Id")
+                if not name:
+                    continue
+                self.units[name] = UnitInfo(
+                    name, props.get("LoadState", ""), props.get("ActiveState", ""), props.get("SubState", ""),
+                    props.get("Description", ""), props.get("UnitFileState", ""), updated=now,
+                )
+
+    def invalidate(self, name: str):
+        """Call after changing a unit so the next status query re-reads it."""
+        with self._lock:
+            unit = self.units.get(name)
+            if unit is not None:
+                unit.updated = 0.0
+
+    # ----- queries -----
+    def resolve(self, spoken: str) -> Optional[str]:
+        """
+        Map a spoken or partial service name to a unit name. When systemd
+        cannot be queried at all the name is returned unchanged.
+        """
+        return self.resolve_match(spoken)[0]
+
+    def resolve_match(self, spoken: str) -> tuple[Optional[str], bool]:
+        """
+        Like resolve(), also telling whether the match is exact: the same name
+        up to case, punctuation, ".service" and filler words. Prefix and
+        fuzzy matches are guesses and return False.
+        """
+        with self._lock:
+            self._ensure()
+            name, exact = self._resolve(spoken, self.units.keys())
+            if name is None:
+                if time.monotonic() - self._unit_files_at > self.ttl:
+                    self._list_unit_files()
+                if not self.units and not self._unit_files:
+                    return spoken, True
+                name, exact = self._resolve(spoken, self.units.keys() | self._unit_files)
+            return name, exact
+
+    @staticmethod
+    def _resolve(spoken: str, names: Iterable[str]) -> tuple[Optional[str], bool]:
+        names = list(names)
+        raw = spoken.strip().lower()
+        for candidate in (raw, f"{raw}.service"):
+            if candidate in names:
+                return candidate, True
+        key = _spoken_key(raw)
+        if not key:
+            return None, False
+        keyed: dict[str, str] = {}
+        for n in names:
+            keyed.setdefault(_spoken_key(n), n)
+        if key in keyed:
+            return keyed[key], True
+        prefixed = sorted(k for k in keyed if k.startswith(key))
+        if prefixed:
+            return keyed[min(prefixed, key=len)], False
+        close = difflib.get_close_matches(key, list(keyed), n=1, cutoff=0.75)
+        return (keyed[close[0]], False) if close else (None, False)
+
+    def status(self, name: str) -> Optional[UnitInfo]:
+        """Cached unit state; refreshed first when older than status_ttl."""
+        with self._lock:
+            self._ensure()
+            unit = self.units.get(name)
+            if unit is None or time.monotonic() - unit.updated > self.status_ttl:
+                self.refresh([name])
+                unit = self.units.get(name)
+            return unit
+
+    def list(self, pattern: Optional[str] = None) -> list[UnitInfo]:
+        with self._lock:
+            self._ensure()
+            units = sorted(self.units.values(), key=lambda u: u.name)
+        if pattern:
+            units = [u for u in units if pattern in u.name or pattern in u.description]
+        return units
+
+
+def render_units(units: Iterable[UnitInfo]) -> str:
+    """Plain `systemctl list-units` style lines."""
+    return "\n".join(f"{u.name} {u.load} {u.active} {u.sub} {u.description}" for u in units)
+
+
+_index: Optional[SystemdUnitIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_unit_index() -> SystemdUnitIndex:
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = SystemdUnitIndex()
+        return _index
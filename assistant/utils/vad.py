@@ -0,0 +1,153 @@
+# assistant/utils/vad.py
+"""
+Energy + zero-crossing voice activity gate.
+
+Audio is cut into short frames and each frame's level (dBFS) and
+zero-crossing rate are computed for the whole block at once with NumPy.
+A frame counts as speech when it is louder than the tracked noise floor by
+snr_db and is not broadband hiss (very high ZCR). A segment opens after
+start_frames speech frames, is prefixed with the pre-roll audio so word onsets
+are not clipped, and closes after hangover_ms without speech. Only segments
+are passed on, so the recognizer does not decode room noise.
+
+The noise floor follows the minimum level of the last floor_window_ms of
+audio, speech or not: it drops at once, and rises when a steady noise (a fan,
+a hum) starts, since speech always has gaps that keep the minimum low. A
+segment longer than max_segment_ms is closed regardless, so the gate cannot
+stay open for good.
+"""
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+from assistant.config.settings import settings
+
+AUDIO = "audio"     # event: samples to feed the recognizer
+END = "end"         # event: the current speech segment is over
+
+
+class VoiceGate:
+    def __init__(self, samplerate: Optional[int] = None, frame_ms: int = 20,
+                 hangover_ms: Optional[int] = None, preroll_ms: Optional[int] = None,
+                 snr_db: Optional[float] = None, min_dbfs: float = -55.0,
+                 max_zcr: float = 0.5, start_frames: int = 3,
+                 floor_window_ms: int = 3000, max_segment_ms: int = 15000):
+        samplerate = samplerate or settings.SAMPLE_RATE
+        hangover_ms = settings.VAD_HANGOVER_MS if hangover_ms is None else hangover_ms
+        preroll_ms = settings.VAD_PREROLL_MS if preroll_ms is None else preroll_ms
+        self.snr_db = settings.VAD_SNR_DB if snr_db is None else snr_db
+        self.frame_len = samplerate * frame_ms // 1000
+        self.hangover_frames = max(1, hangover_ms // frame_ms)
+        self.start_frames = start_frames
+        self.min_dbfs = min_dbfs
+        self.max_zcr = max_zcr
+        self._preroll: deque = deque(maxlen=max(1, preroll_ms // frame_ms) + start_frames)
+        self._levels: deque = deque(maxlen=max(1, floor_window_ms // frame_ms))
+        self.max_segment_frames = max(1, max_segment_ms // frame_ms)
+        # counters
+        self.frames_total = 0
+        self.frames_passed = 0
+        self.segments = 0
+        self.forced_ends = 0        # segments closed by max_segment_ms
+        self.noise_db = min_dbfs    # tracked background level
+        self.reset()
+
+    def reset(self):
+        """Forget the current segment and partial frame; the noise floor is kept."""
+        self.active = False
+        self._since_speech = 0       # samples classified since the last speech frame
+        self._hang = 0
+        self._seg_frames = 0
+        self._onset = 0
+        self._rest = np.zeros(0, dtype=np.int16)
+        self._preroll.clear()
+
+    def features(self, frames: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(level in dBFS, zero-crossing rate) per row of an int16 frame matrix."""
+        x = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(x * x, axis=1))
+        db = 20.0 * np.log10(rms / 32768.0 + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frames.shape[1]
+        return db, zcr
+
+    def process(self, pcm: np.ndarray) -> list[tuple[str, Optional[np.ndarray]]]:
+        """
+        Feed int16 samples; returns (AUDIO, samples) and (END, None) events in
+        order. Samples that do not fill a frame are held for the next call.
+        """
+        if self._rest.size:
+            pcm = np.concatenate((self._rest, pcm))
+        L = self.frame_len
+        n = len(pcm) // L
+        self._rest = pcm[n * L:].copy()
+        if n == 0:
+            return []
+        frames = pcm[:n * L].reshape(n, L)
+        db, zcr = self.features(frames)
+        candidate = (db > self.min_dbfs) & (zcr <= self.max_zcr)
+        self.frames_total += n
+
+        events: list[tuple[str, Optional[np.ndarray]]] = []
+        run_start = 0 if self.active else None
+        for i in range(n):
+            level = max(float(db[i]), -90.0)
+            self._levels.append(level)
+            floor = min(self._levels)
+            # fall to quieter levels at once, rise slowly towards the recent minimum
+            if level < self.noise_db:
+                self.noise_db = level
+            elif floor > self.noise_db:
+                self.noise_db += 0.05 * (floor - self.noise_db)
+            speech = bool(candidate[i]) and db[i] > self.noise_db + self.snr_db
+            self._since_speech = 0 if speech else self._since_speech + L
+            if self.active:
+                self._hang = self.hangover_frames if speech else self._hang - 1
+                self._seg_frames += 1
+                if self._seg_frames >= self.max_segment_frames:
+                    # no real utterance is this long: treat the level as background
+                    self.forced_ends += 1
+                    self.noise_db = max(self.noise_db, floor)
+                    self._hang = 0
+                if self._hang <= 0:
+                    self._emit(events, frames[run_start:i + 1])
+                    events.append((END, None))
+                    self.active, run_start = False, None
+                continue
+            self._preroll.append(frames[i])
+            self._onset = self._onset + 1 if speech else 0
+            if self._onset >= self.start_frames:
+                self.active, self._hang, self._onset, self._seg_frames = True, self.hangover_frames, 0, 0
+                self.segments += 1
+                self._emit(events, np.stack(self._preroll))
+                self._preroll.clear()
+                run_start = i + 1
+        if self.active and run_start is not None and run_start < n:
+            self._emit(events, frames[run_start:n])
+        return events
+
+    def _emit(self, events: list, frames: np.ndarray):
+        if len(frames):
+            self.frames_passed += len(frames)
+            events.append((AUDIO, frames.reshape(-1)))
+
+    @property
+    def silence_samples(self) -> int:
+        """Samples seen after the last speech frame, including the unclassified remainder."""
+        return self._since_speech + len(self._rest)
+
+    @property
+    def gated_fraction(self) -> float:
+        """Share of the audio seen so far that was not passed to the recognizer."""
+        return 1.0 - self.frames_passed / self.frames_total if self.frames_total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames_total,
+            "passed": self.frames_passed,
+            "segments": self.segments,
+            "forced_ends": self.forced_ends,
+            "gated_fraction": round(self.gated_fraction, 3),
+            "noise_dbfs": round(self.noise_db, 1),
+        }
@@ -0,0 +1,118 @@
+# assistant/utils/vosk_models.py
+"""
+Process-wide registry of Vosk models.
+
+A vosk.Model holds the acoustic model and graph (hundreds of MB) and is safe
+to share; a KaldiRecognizer is cheap and holds per-stream decoding state.
+Every agent asks the registry for its own recognizer, and each model
+directory is loaded only once, however many agents use it.
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from assistant.config.settings import settings
+from assistant.utils.logger import get_logger
+from assistant.utils.procfs import rss_kb
+
+log = get_logger(__name__)
+
+
+@dataclass
+class LoadedModel:
+    path: str
+    model: Any
+    load_s: float
+    rss_delta_kb: int       # resident memory added by the load (approximate if loads overlap)
+    recognizers: int = 0
+
+
+class VoskModelRegistry:
+    def __init__(self):
+        self._models: dict[str, LoadedModel] = {}
+        self._loading: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, model_dir: Optional[str]) -> LoadedModel:
+        path = os.path.realpath(model_dir or settings.VOSK_MODEL_DIR)
+        with self._lock:
+            entry = self._models.get(path)
+            if entry is not None:
+                return entry
+            # one lock per directory: the same model is loaded once, different ones in parallel
+            load_lock = self._loading.setdefault(path, threading.Lock())
+        with load_lock:
+            with self._lock:
+                entry = self._models.get(path)
+            if entry is not None:
+                return entry
+            from vosk import Model
+
+            before = rss_kb()
+            t0 = time.perf_counter()
+            model = Model(path)
+            entry = LoadedModel(path, model, time.perf_counter() - t0, max(0, rss_kb() - before))
+            log.info("[Vosk] Loaded %s in %.1fs (+%d MB resident)",
+                     path, entry.load_s, entry.rss_delta_kb // 1024)
+            with self._lock:
+                self._models[path] = entry
+            return entry
+
+    def get(self, model_dir: Optional[str] = None):
+        """The shared vosk.Model for model_dir (default VOSK_MODEL_DIR)."""
+        return self._entry(model_dir).model
+
+    def recognizer(self, model_dir: Optional[str] = None, samplerate: Optional[int] = None,
+                   grammar: Optional[list[str]] = None):
+        """A new KaldiRecognizer on the shared model, optionally restricted to a grammar."""
+        from vosk import KaldiRecognizer
+
+        entry = self._entry(model_dir)
+        samplerate = samplerate or settings.SAMPLE_RATE
+        with self._lock:
+            entry.recognizers += 1
+        if grammar is not None:
+            return KaldiRecognizer(entry.model, samplerate, json.dumps(grammar))
+        return KaldiRecognizer(entry.model, samplerate)
+
+    def footprint(self) -> dict[str, dict]:
+        """Per loaded model: load time, resident memory it added, recognizers handed out."""
+        with self._lock:
+            return {
+                e.path: {"load_s": round(e.load_s, 2), "rss_mb": e.rss_delta_kb // 1024, "recognizers": e.recognizers}
+                for e in self._models.values()
+            }
+
+
+def configure_endpointer(rec, mode: Optional[str] = None, silence_ms: Optional[int] = None) -> bool:
+    """
+    Apply VOICE_ENDPOINT_MODE / VOICE_ENDPOINT_SILENCE_MS to a recognizer.
+    Older vosk releases have no endpointer API; returns False there.
+    """
+    mode = settings.VOICE_ENDPOINT_MODE if mode is None else mode
+    silence_ms = settings.VOICE_ENDPOINT_SILENCE_MS if silence_ms is None else silence_ms
+    if not hasattr(rec, "SetEndpointerMode"):
+        return False
+    from vosk import EndpointerMode
+
+    if mode:
+        rec.SetEndpointerMode(getattr(EndpointerMode, mode.upper(), EndpointerMode.DEFAULT))
+    if silence_ms:
+        # (max leading silence, trailing silence, max utterance length), seconds
+        rec.SetEndpointerDelays(5.0, silence_ms / 1000.0, 20.0)
+    return True
+
+
+_registry: Optional[VoskModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_vosk_registry() -> VoskModelRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = VoskModelRegistry()
+        return _registry